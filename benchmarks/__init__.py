@@ -0,0 +1,9 @@
+"""
+Benchmarks for the pyxform conversion stages, using synthetic XLSForms.
+
+Run the suite and save the results, then compare later results to that baseline:
+
+    python -m benchmarks run --output baseline.json
+    python -m benchmarks run --output current.json
+    python -m benchmarks compare baseline.json current.json
+"""
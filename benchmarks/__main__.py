@@ -0,0 +1,106 @@
+"""
+Command line interface for the benchmarks. See `python -m benchmarks --help`.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.compare import compare, format_comparison
+from benchmarks.runner import FORMATS, SUITE, run_suite
+
+
+def _create_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and save the results.")
+    run.add_argument(
+        "--output", help="Path to save the JSON results to. Defaults to stdout."
+    )
+    run.add_argument(
+        "--case",
+        action="append",
+        choices=sorted(SUITE),
+        help="A case to run (repeatable). Defaults to all cases.",
+    )
+    run.add_argument(
+        "--format",
+        action="append",
+        choices=sorted(FORMATS),
+        help="An XLSForm file format to use (repeatable). Defaults to xlsx.",
+    )
+    run.add_argument(
+        "--repeat", type=int, default=5, help="Number of timed runs per case."
+    )
+    run.add_argument(
+        "--memory",
+        action="store_true",
+        help="Also measure the peak memory for each stage (with an extra run).",
+    )
+    run.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for the size of each case, e.g. 0.1 for a quick run.",
+    )
+
+    comp = commands.add_parser(
+        "compare",
+        help="Compare results to a baseline, and fail if there are regressions.",
+    )
+    comp.add_argument("baseline", help="Path to the baseline JSON results.")
+    comp.add_argument("current", help="Path to the JSON results to check.")
+    comp.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Ratio of change to report, e.g. 0.1 (the default) for +/-10%%.",
+    )
+    comp.add_argument(
+        "--min_time",
+        type=float,
+        default=0.005,
+        help="Minimum time difference to report, in seconds.",
+    )
+    return parser
+
+
+def main(argv=None) -> int:
+    args = _create_parser().parse_args(argv)
+    if args.command == "run":
+        if args.repeat < 1:
+            raise SystemExit("The number of --repeat runs must be at least 1.")
+        cases = {k: v for k, v in SUITE.items() if not args.case or k in args.case}
+        results = run_suite(
+            cases=cases,
+            formats=tuple(args.format or ("xlsx",)),
+            repeat=args.repeat,
+            memory=args.memory,
+            scale=args.scale,
+            progress=lambda name: print(f"Done: {name}", file=sys.stderr),
+        )
+        content = json.dumps(results, indent=2)
+        if args.output is None:
+            print(content)
+        else:
+            with open(args.output, mode="w", encoding="utf-8") as f:
+                f.write(content)
+        return 0
+    else:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+        comparison = compare(
+            baseline=baseline,
+            current=current,
+            threshold=args.threshold,
+            min_time=args.min_time,
+        )
+        print(format_comparison(comparison))
+        return 1 if comparison.regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
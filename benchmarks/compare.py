@@ -0,0 +1,115 @@
+"""
+Compare benchmark results to a baseline, to find regressions.
+"""
+
+from typing import NamedTuple
+
+# The stage timings are compared using the median, which is less affected by outliers.
+TIME_METRIC = "wall_median"
+MEMORY_METRIC = "memory_peak"
+
+
+class Change(NamedTuple):
+    result: str
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+class Comparison(NamedTuple):
+    regressions: list[Change]
+    improvements: list[Change]
+    unchanged: list[Change]
+    missing: list[str]
+
+
+def _classify(
+    change: Change, threshold: float, min_delta: float, comparison: Comparison
+) -> None:
+    delta = change.current - change.baseline
+    if abs(delta) < min_delta:
+        comparison.unchanged.append(change)
+    elif change.current > change.baseline * (1 + threshold):
+        comparison.regressions.append(change)
+    elif change.current < change.baseline * (1 - threshold):
+        comparison.improvements.append(change)
+    else:
+        comparison.unchanged.append(change)
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float = 0.1,
+    min_time: float = 0.005,
+    min_memory: int = 1 << 20,
+) -> Comparison:
+    """
+    Compare the stage times (and memory peaks, if in both) of each benchmark result.
+
+    A change is only reported if it's bigger than the threshold ratio and the minimum
+    absolute difference, so that noise in very quick stages isn't reported.
+
+    :param baseline: The results to compare against, from `run_suite`.
+    :param current: The results to check, from `run_suite`.
+    :param threshold: The ratio of change to report, e.g. 0.1 for +/-10%.
+    :param min_time: The minimum time difference to report, in seconds.
+    :param min_memory: The minimum memory difference to report, in bytes.
+    """
+    comparison = Comparison(regressions=[], improvements=[], unchanged=[], missing=[])
+    for name, base_result in baseline["results"].items():
+        current_result = current["results"].get(name)
+        if current_result is None:
+            comparison.missing.append(name)
+            continue
+        for stage, base_stage in base_result["stages"].items():
+            current_stage = current_result["stages"].get(stage)
+            if current_stage is None:
+                comparison.missing.append(f"{name}:{stage}")
+                continue
+            for metric, min_delta in (
+                (TIME_METRIC, min_time),
+                (MEMORY_METRIC, min_memory),
+            ):
+                base_value = base_stage.get(metric)
+                current_value = current_stage.get(metric)
+                if base_value is None or current_value is None:
+                    continue
+                change = Change(
+                    result=name,
+                    stage=stage,
+                    metric=metric,
+                    baseline=base_value,
+                    current=current_value,
+                )
+                _classify(
+                    change=change,
+                    threshold=threshold,
+                    min_delta=min_delta,
+                    comparison=comparison,
+                )
+    return comparison
+
+
+def format_comparison(comparison: Comparison) -> str:
+    """Describe the comparison results as text."""
+    lines = []
+    for title, changes in (
+        ("Regressions", comparison.regressions),
+        ("Improvements", comparison.improvements),
+    ):
+        lines.append(f"{title}: {len(changes)}")
+        for c in sorted(changes, key=lambda c: c.ratio, reverse=True):
+            lines.append(
+                f"  {c.result} {c.stage} {c.metric}: "
+                f"{c.baseline:.4g} -> {c.current:.4g} ({c.ratio:.2f}x)"
+            )
+    lines.append(f"Unchanged: {len(comparison.unchanged)}")
+    if comparison.missing:
+        lines.append(f"Missing from current results: {', '.join(comparison.missing)}")
+    return "\n".join(lines)
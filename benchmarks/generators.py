@@ -0,0 +1,123 @@
+"""
+Generate synthetic XLSForms of a given size and shape.
+"""
+
+from dataclasses import dataclass
+from io import BytesIO
+
+from pyxform.xls2json_backends import md_table_to_workbook
+
+# Valid IANA subtags, so that the languages don't add warnings.
+LANGUAGES = (
+    ("English", "en"),
+    ("French", "fr"),
+    ("Spanish", "es"),
+    ("Portuguese", "pt"),
+    ("Swahili", "sw"),
+    ("Arabic", "ar"),
+    ("Hindi", "hi"),
+    ("Chinese", "zh"),
+    ("Russian", "ru"),
+    ("German", "de"),
+    ("Amharic", "am"),
+    ("Bengali", "bn"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class FormSpec:
+    """
+    The size and shape of a synthetic XLSForm.
+
+    :param questions: The number of questions.
+    :param choice_lists: The number of choice lists. If more than 0, every second
+      question is a select_one that uses one of the choice lists.
+    :param options: The number of options in each choice list.
+    :param repeat_depth: The number of nested repeats. The questions are split evenly
+      between the top level and each repeat level.
+    :param languages: The number of label languages, or 0 for no translations.
+    :param references: The number of `${}` references to earlier questions in each
+      question's relevant expression.
+    """
+
+    questions: int
+    choice_lists: int = 0
+    options: int = 0
+    repeat_depth: int = 0
+    languages: int = 0
+    references: int = 0
+
+    def __post_init__(self):
+        if self.languages > len(LANGUAGES):
+            raise ValueError(f"At most {len(LANGUAGES)} languages are supported.")
+        if self.choice_lists and self.options < 1:
+            raise ValueError("Choice lists must have at least 1 option.")
+
+
+def _md_row(cells) -> str:
+    return "".join(("|  | ", " | ".join(cells), " |"))
+
+
+def _label_columns(spec: FormSpec) -> list[str]:
+    if spec.languages == 0:
+        return ["label"]
+    return [f"label::{name} ({code})" for name, code in LANGUAGES[: spec.languages]]
+
+
+def _labels(spec: FormSpec, text: str) -> list[str]:
+    if spec.languages == 0:
+        return [text]
+    return [f"{text} {code}" for _, code in LANGUAGES[: spec.languages]]
+
+
+def _survey_rows(spec: FormSpec):
+    label_columns = _label_columns(spec)
+    yield "| survey |"
+    yield _md_row(["type", "name", *label_columns, "relevant"])
+    # Split the questions between the top level and each repeat level.
+    levels = spec.repeat_depth + 1
+    per_level, extra = divmod(spec.questions, levels)
+    index = 0
+    for level in range(levels):
+        if level > 0:
+            yield _md_row(["begin repeat", f"r{level}", *_labels(spec, f"R{level}"), ""])
+        for _ in range(per_level + (1 if level < extra else 0)):
+            if spec.choice_lists and index % 2 == 0:
+                q_type = f"select_one c{(index // 2) % spec.choice_lists}"
+            else:
+                q_type = "text"
+            # Reference the prior questions, which are at the same or an outer level.
+            relevant = " and ".join(
+                f"${{q{i}}} != ''" for i in range(max(0, index - spec.references), index)
+            )
+            yield _md_row([q_type, f"q{index}", *_labels(spec, f"Q{index}"), relevant])
+            index += 1
+    for level in range(spec.repeat_depth, 0, -1):
+        yield _md_row(["end repeat", f"r{level}", *([""] * len(label_columns)), ""])
+
+
+def _choices_rows(spec: FormSpec):
+    yield "| choices |"
+    yield _md_row(["list_name", "name", *_label_columns(spec)])
+    for c in range(spec.choice_lists):
+        for o in range(spec.options):
+            yield _md_row([f"c{c}", f"o{o}", *_labels(spec, f"O{o}")])
+
+
+def make_markdown(spec: FormSpec) -> str:
+    """Generate the XLSForm as a Markdown table."""
+    rows = list(_survey_rows(spec))
+    if spec.choice_lists:
+        rows.extend(_choices_rows(spec))
+    rows.append("| settings |")
+    rows.append(_md_row(["form_title", "form_id"]))
+    rows.append(_md_row(["Benchmark", "benchmark"]))
+    return "\n".join(rows)
+
+
+def make_xlsx(spec: FormSpec) -> bytes:
+    """Generate the XLSForm as XLSX file content."""
+    workbook = md_table_to_workbook(make_markdown(spec))
+    data = BytesIO()
+    workbook.save(data)
+    return data.getvalue()
@@ -0,0 +1,146 @@
+"""
+Run the benchmark cases and collect the per-stage results.
+"""
+
+import platform
+import statistics
+import time
+from dataclasses import asdict
+from io import BytesIO
+
+import pyxform
+from pyxform.xls2json_backends import SupportedFileTypes
+from pyxform.xls2xform import convert
+
+from benchmarks.generators import FormSpec, make_markdown, make_xlsx
+
+# Each case varies one dimension of the form shape, except "combined".
+SUITE = {
+    "questions": FormSpec(questions=2000),
+    "choices": FormSpec(questions=500, choice_lists=250, options=20),
+    "nested_repeats": FormSpec(questions=1000, repeat_depth=10),
+    "languages": FormSpec(questions=1000, choice_lists=100, options=5, languages=10),
+    "references": FormSpec(questions=1000, references=5),
+    "combined": FormSpec(
+        questions=1000,
+        choice_lists=50,
+        options=10,
+        repeat_depth=3,
+        languages=3,
+        references=2,
+    ),
+}
+FORMATS = {
+    "md": (make_markdown, SupportedFileTypes.md.value),
+    "xlsx": (make_xlsx, SupportedFileTypes.xlsx.value),
+}
+TOTAL = "total"
+
+
+def scale_spec(spec: FormSpec, scale: float) -> FormSpec:
+    """Scale the number of questions and choice lists, e.g. for a quick run."""
+    return FormSpec(
+        questions=max(1, round(spec.questions * scale)),
+        choice_lists=max(1, round(spec.choice_lists * scale)) if spec.choice_lists else 0,
+        options=spec.options,
+        repeat_depth=spec.repeat_depth,
+        languages=spec.languages,
+        references=spec.references,
+    )
+
+
+def _convert(data: str | bytes, file_type: str, **kwargs):
+    if isinstance(data, bytes):
+        data = BytesIO(data)
+    return convert(xlsform=data, file_type=file_type, **kwargs)
+
+
+def run_case(spec: FormSpec, file_format: str, repeat: int, memory: bool) -> dict:
+    """
+    Convert the form `repeat` times, and summarise the time used by each stage.
+
+    The form is generated and converted once before timing starts, so that one-off
+    setup costs in pyxform (such as building the expression lexer) aren't included.
+
+    :param spec: The form to generate.
+    :param file_format: The XLSForm file format, "md" or "xlsx".
+    :param repeat: The number of timed conversions.
+    :param memory: If True, do an extra conversion to measure the memory peaks.
+    """
+    make, file_type = FORMATS[file_format]
+    data = make(spec)
+    _convert(data, file_type)
+
+    wall_times = {}
+    cpu_times = {}
+    for _ in range(repeat):
+        profile = _convert(data, file_type, profile=True).profile
+        for p in profile:
+            wall_times.setdefault(p.name, []).append(p.wall_time)
+            cpu_times.setdefault(p.name, []).append(p.cpu_time)
+        wall_times.setdefault(TOTAL, []).append(sum(p.wall_time for p in profile))
+        cpu_times.setdefault(TOTAL, []).append(sum(p.cpu_time for p in profile))
+
+    memory_peaks = {}
+    if memory:
+        profile = _convert(data, file_type, trace_memory=True).profile
+        memory_peaks = {p.name: p.memory_peak for p in profile}
+        memory_peaks[TOTAL] = max(memory_peaks.values())
+
+    stages = {
+        name: {
+            "wall_min": min(times),
+            "wall_median": statistics.median(times),
+            "cpu_median": statistics.median(cpu_times[name]),
+            "memory_peak": memory_peaks.get(name),
+        }
+        for name, times in wall_times.items()
+    }
+    return {
+        "spec": asdict(spec),
+        "format": file_format,
+        "repeat": repeat,
+        "input_size": len(data),
+        "stages": stages,
+    }
+
+
+def run_suite(
+    cases: dict[str, FormSpec],
+    formats: tuple[str, ...] = ("xlsx",),
+    repeat: int = 5,
+    memory: bool = False,
+    scale: float = 1.0,
+    progress=None,
+) -> dict:
+    """
+    Run the benchmark cases, returning JSON-compatible results.
+
+    :param cases: The cases to run, by name.
+    :param formats: The XLSForm file formats to run each case with.
+    :param repeat: The number of timed conversions per case.
+    :param memory: If True, also measure the memory peaks.
+    :param scale: Multiplier for the size of each case.
+    :param progress: If provided, called with the name of each result as it's done.
+    """
+    results = {}
+    for name, spec in cases.items():
+        spec = scale_spec(spec, scale) if scale != 1.0 else spec
+        for file_format in formats:
+            key = f"{name}[{file_format}]"
+            results[key] = run_case(
+                spec=spec, file_format=file_format, repeat=repeat, memory=memory
+            )
+            if progress is not None:
+                progress(key)
+    return {
+        "meta": {
+            "pyxform_version": pyxform.__version__,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "repeat": repeat,
+            "scale": scale,
+        },
+        "results": results,
+    }
@@ -43,6 +43,12 @@ class Detail:
         self.msg: str = msg
 
     def format(self, **kwargs):
+        # str.format is much faster, and gives the same result if no values are missing.
+        if None not in kwargs.values():
+            try:
+                return self.msg.format(**kwargs)
+            except KeyError:
+                pass
         return _ERROR_FORMATTER.format(self.msg, **kwargs)
 
 
@@ -221,6 +227,14 @@ class ErrorCode(Enum):
             "or update pyxform."
         ),
     )
+    HEADER_006: Detail = Detail(
+        name="Headers - both form_id and id_string in the settings sheet",
+        msg=(
+            "The form_id and id_string column headers are both specified in the settings "
+            "sheet provided. This may cause errors during conversion. In future, its best "
+            "to avoid specifying both column headers in the settings sheet."
+        ),
+    )
     INTERNAL_001: Detail = Detail(
         name="Internal error - incorrectly processed question trigger data",
         msg=(
@@ -245,6 +259,10 @@ class ErrorCode(Enum):
             "Learn more: https://xlsform.org/en/#setting-up-your-worksheets"
         ),
     )
+    LABEL_002: Detail = Detail(
+        name="Labels - missing label for a group or repeat",
+        msg="[row : {row}] {type} has no label: {value}",
+    )
     NAMES_001: Detail = Detail(
         name="Names - invalid duplicate name in same context",
         msg=(
@@ -360,6 +378,15 @@ class ErrorCode(Enum):
             "Entity lists must have a name."
         ),
     )
+    NAMES_016: Detail = Detail(
+        name="Names - possible sheet name misspelling, for an optional sheet",
+        msg=(
+            "When looking for a sheet named '{sheet}', the following sheets with "
+            "similar names were found: {candidates}. If you do not mean to include a "
+            "sheet, to suppress this message, prefix the sheet name with an underscore. "
+            "For example 'setting' becomes '_setting'."
+        ),
+    )
     PYREF_001: Detail = Detail(
         name="PyXForm reference - parsing failed",
         msg=(
@@ -551,6 +578,48 @@ class ErrorCode(Enum):
             "The 'allow-mock-accuracy' parameter must be either 'true' or 'false'."
         ),
     )
+    SURVEY_010: Detail = Detail(
+        name="Survey sheet - comment row skipped",
+        msg="[row : {row}] Row without name, text, or label is being skipped:\n{value}",
+    )
+    SURVEY_011: Detail = Detail(
+        name="Survey sheet - disabled column deprecated",
+        msg=(
+            "[row : {row}] The 'disabled' column header is not part of the current spec. "
+            "We recommend using relevant instead."
+        ),
+    )
+    SURVEY_012: Detail = Detail(
+        name="Survey sheet - deprecated device ID metadata type",
+        msg=(
+            "[row : {row}] {type} is no longer supported on most devices. "
+            "Only old versions of Collect on Android versions older than 11 still "
+            "support it."
+        ),
+    )
+    SURVEY_013: Detail = Detail(
+        name="Survey sheet - select_one_external without a choice_filter",
+        msg="[row : {row}] select one external is only meant for filtered selects.",
+    )
+    SURVEY_014: Detail = Detail(
+        name="Survey sheet - image question without max-pixels parameter",
+        msg=(
+            "[row : {row}] Use the max-pixels parameter to speed up submission sending "
+            "and save storage space. Learn more: https://xlsform.org/#image"
+        ),
+    )
+    TRANSLATIONS_001: Detail = Detail(
+        name="Translations - missing translation columns",
+        msg="{missing}",
+    )
+    TRANSLATIONS_002: Detail = Detail(
+        name="Translations - or_other with translations",
+        msg=(
+            "This form uses or_other and translations, which is not recommended. "
+            "An untranslated input question label and choice label is generated "
+            "for 'other'. Learn more: https://xlsform.org/en/#specify-other)."
+        ),
+    )
 
 
 class PyXFormError(Exception):
@@ -585,6 +654,56 @@ class PyXFormError(Exception):
             return super().__repr__()
 
 
+class PyXFormWarning:
+    """
+    A conversion warning, which is only formatted as a message when it's read.
+
+    Warnings are usually only read once the conversion is complete, if at all, so
+    keeping the code and context until then avoids formatting messages that are dropped.
+    """
+
+    __slots__ = ("code", "column", "context", "row", "sheet")
+
+    def __init__(
+        self,
+        code: ErrorCode,
+        row: int | None = None,
+        sheet: str | None = None,
+        column: str | None = None,
+        context: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        :param code: Used for the warning message template.
+        :param row: The XLSForm row number that the warning is about, if any.
+        :param sheet: The XLSForm sheet name that the warning is about, if any.
+        :param column: The XLSForm column name that the warning is about, if any.
+        :param context: Other values used to format the warning message template.
+        """
+        self.code: ErrorCode = code
+        self.row: int | None = row
+        self.sheet: str | None = sheet
+        self.column: str | None = column
+        self.context: dict = context if context else {}
+
+    def __str__(self):
+        fields = {
+            k: v
+            for k, v in (
+                ("row", self.row),
+                ("sheet", self.sheet),
+                ("column", self.column),
+            )
+            if v is not None
+        }
+        return self.code.value.format(**fields, **self.context)
+
+    def __repr__(self):
+        return (
+            f"PyXFormWarning({self.code.name}, row={self.row!r}, sheet={self.sheet!r}, "
+            f"column={self.column!r}, context={self.context!r})"
+        )
+
+
 class ValidationError(PyXFormError):
     """Common base class for pyxform validation exceptions."""
 
@@ -1,12 +1,12 @@
 import re
-from collections.abc import Container, Sequence
+from collections.abc import Callable, Container, Iterable, Iterator, Sequence
 from itertools import chain, islice
-from typing import Any
+from typing import Any, Protocol
 
 from pyxform import constants
 from pyxform.errors import ErrorCode, PyXFormError
 from pyxform.parsing.expression import maybe_strip
-from pyxform.xls2json_backends import RE_WHITESPACE
+from pyxform.xls2json_backends import RE_WHITESPACE, ColumnarSheet
 
 SMART_QUOTES = {"\u2018": "'", "\u2019": "'", "\u201c": '"', "\u201d": '"'}
 RE_SMART_QUOTES = re.compile(r"|".join(re.escape(old) for old in SMART_QUOTES))
@@ -72,6 +72,34 @@ def list_to_nested_dict(lst: Sequence) -> dict:
         return lst[0]
 
 
+class SheetVisitor(Protocol):
+    """
+    A check that inspects each cell while the sheet is processed.
+
+    This lets sheet-level checks share the one pass over the sheet data, rather than
+    each walking the data again. The cells are the original header and value.
+    """
+
+    def visit(self, row_number: int, column: str, value: Any) -> None: ...
+
+
+def _get_visit(
+    visitors: Sequence[SheetVisitor] | None,
+) -> Callable[[int, str, Any], None] | None:
+    """Get one function to visit a cell with all the visitors, or None if no visitors."""
+    if not visitors:
+        return None
+    elif len(visitors) == 1:
+        return visitors[0].visit
+    visits = tuple(v.visit for v in visitors)
+
+    def visit(row_number: int, column: str, value: Any) -> None:
+        for v in visits:
+            v(row_number, column, value)
+
+    return visit
+
+
 class DealiasAndGroupHeadersResult:
     __slots__ = ("data", "headers")
 
@@ -173,58 +201,145 @@ def process_row(
     :param strip_whitespace: If True, collapse sequences of whitespace to a single space
     :param add_row_number: If True, add a "__row" key with the row number from the input data.
     """
+    return _process_items(
+        sheet_name=sheet_name,
+        items=row.items(),
+        header_plan=_compile_header_plan(header_key=header_key),
+        row_number=row_number,
+        default_language=default_language,
+        strip_whitespace=strip_whitespace,
+        add_row_number=add_row_number,
+        visit=None,
+    )
+
+
+def _compile_header_plan(
+    header_key: dict[str, tuple[str, ...]],
+) -> dict[str, tuple[str, tuple[str, ...]]]:
+    """
+    Get the mapping of original headers to the row key, and the path of keys within it.
+
+    The path is empty for headers that are not grouped, e.g.
+    {"label::English (en)": ("label", ("English (en)",)), "name": ("name", ())}.
+
+    :param header_key: Mapping from original headers to headers split on a delimiter.
+    """
+    return {h: (tokens[0], tokens[1:]) for h, tokens in header_key.items() if tokens}
+
+
+def _process_items(
+    sheet_name: str,
+    items: Iterable[tuple[str, str]],
+    header_plan: dict[str, tuple[str, tuple[str, ...]]],
+    row_number: int,
+    default_language: str,
+    strip_whitespace: bool,
+    add_row_number: bool,
+    visit: Callable[[int, str, Any], None] | None,
+) -> dict[str, str]:
+    """Like `process_row`, but for the (header, value) pairs of the row."""
     out_row = {}
-    for header, val in row.items():
+    # Merging also replaces any empty values already in the row with None (see
+    # merge_dicts), so in that case every grouped value is merged, as it always was.
+    has_empty = False
+    for header, val in items:
+        if visit is not None:
+            visit(row_number, header, val)
         val = clean_text_values(value=val, strip_whitespace=strip_whitespace)
-        tokens = header_key.get(header, None)
-        if not tokens:
+        plan = header_plan.get(header, None)
+        if plan is None:
             raise PyXFormError(
                 ErrorCode.HEADER_001.value.format(sheet_name=sheet_name, header=header)
             )
-        elif len(tokens) == 1:
-            out_row[tokens[0]] = val
+        key, path = plan
+        if not path:
+            out_row[key] = val
+        elif has_empty or not val:
+            new_value = list_to_nested_dict((*path, val))
+            out_row = merge_dicts(out_row, {key: new_value}, default_language)
         else:
-            new_value = list_to_nested_dict((*tokens[1:], val))
-            out_row = merge_dicts(out_row, {tokens[0]: new_value}, default_language)
+            current = out_row.get(key)
+            if current is None:
+                out_row[key] = list_to_nested_dict((*path, val))
+            elif (
+                len(path) == 1
+                and isinstance(current, dict)
+                and current.get(path[0]) is None
+            ):
+                # The most common case, e.g. another language for the label.
+                current[path[0]] = val
+            elif not _add_to_group(group=current, path=path, value=val):
+                new_value = list_to_nested_dict((*path, val))
+                out_row[key] = merge_dicts(current, new_value, default_language)
+        if not has_empty and not val:
+            has_empty = True
     if add_row_number:
         out_row["__row"] = row_number
     return out_row
 
 
-def dealias_and_group_headers(
+def _add_to_group(group: Any, path: tuple[str, ...], value: Any) -> bool:
+    """
+    Add the value to the nested group dict, if that doesn't conflict with existing keys.
+
+    This has the same result as `merge_dicts` would in that case, without copying the
+    group. Returns False if there is a conflict, which `merge_dicts` must resolve.
+    """
+    if not isinstance(group, dict):
+        return False
+    last = len(path) - 1
+    for i, key in enumerate(path):
+        node = group.get(key)
+        if node is None:
+            group[key] = (
+                list_to_nested_dict((*path[i + 1 :], value)) if i < last else value
+            )
+            return True
+        elif i == last or not isinstance(node, dict):
+            return False
+        group = node
+    return False
+
+
+def _process_rows(
+    sheet_name: str,
+    sheet_data: Iterable[dict[str, str]],
+    header_key: dict[str, tuple[str, ...]],
+    default_language: str,
+    strip_whitespace: bool,
+    add_row_number: bool,
+    visitors: Sequence[SheetVisitor] | None = None,
+) -> Iterator[dict[str, str]]:
+    """Process each row. Data by column is processed without creating the row dicts."""
+    header_plan = _compile_header_plan(header_key=header_key)
+    visit = _get_visit(visitors=visitors)
+    if isinstance(sheet_data, ColumnarSheet):
+        rows = sheet_data.iter_items()
+    else:
+        rows = (row.items() for row in sheet_data)
+    for row_number, items in enumerate(rows, start=2):
+        yield _process_items(
+            sheet_name=sheet_name,
+            items=items,
+            header_plan=header_plan,
+            row_number=row_number,
+            default_language=default_language,
+            strip_whitespace=strip_whitespace,
+            add_row_number=add_row_number,
+            visit=visit,
+        )
+
+
+def _dealias_headers(
     sheet_name: str,
     sheet_data: Sequence[dict[str, str]],
     sheet_header: Sequence[dict[str, Any]],
     header_aliases: dict[str, str],
     header_columns: set[str],
-    headers_required: set[str] | None = None,
-    default_language: str = constants.DEFAULT_LANGUAGE_VALUE,
-    strip_whitespace: bool = False,
-    add_row_number: bool = False,
-) -> DealiasAndGroupHeadersResult:
+) -> tuple[dict[str, tuple[str, ...]], dict[tuple[str, ...], str]]:
     """
-    Normalise headers and group keys that contain a delimiter.
-
-    For example a row:
-        {"text::english": "hello", "text::french" : "bonjour"}
-    Becomes
-        {"text": {"english": "hello", "french" : "bonjour"}.
-
-    Dealiasing is done to the first token (the first term separated by the delimiter).
-
-    :param sheet_name: Name of the sheet data being processed.
-    :param sheet_data: The sheet data.
-    :param sheet_header: The sheet column names (headers).
-    :param header_aliases: Mapping of allowed column aliases (backwards compatibility).
-    :param header_columns: Expected columns for the sheet.
-    :param headers_required: Required columns for the sheet.
-    :param default_language: Default translation language for the form, used to group
-      used to group labels/hints/etc without a language specified with localized versions.
-    :param strip_whitespace: If True, collapse sequences of whitespace to a single space
-      in the data rows.
-    :param add_row_number: If True, add a "__row" key with the row number from the input data.
+    Get the mapping of original headers to (possibly split) tokens, and the reverse.
     """
-
     header_key: dict[str, tuple[str, ...]] = {}
     tokens_key: dict[tuple[str, ...], str] = {}
 
@@ -259,18 +374,61 @@ def dealias_and_group_headers(
                     )
                 header_key[header] = tokens
                 tokens_key[tokens] = header
+    return header_key, tokens_key
+
+
+def dealias_and_group_headers(
+    sheet_name: str,
+    sheet_data: Sequence[dict[str, str]],
+    sheet_header: Sequence[dict[str, Any]],
+    header_aliases: dict[str, str],
+    header_columns: set[str],
+    headers_required: set[str] | None = None,
+    default_language: str = constants.DEFAULT_LANGUAGE_VALUE,
+    strip_whitespace: bool = False,
+    add_row_number: bool = False,
+    visitors: Sequence[SheetVisitor] | None = None,
+) -> DealiasAndGroupHeadersResult:
+    """
+    Normalise headers and group keys that contain a delimiter.
+
+    For example a row:
+        {"text::english": "hello", "text::french" : "bonjour"}
+    Becomes
+        {"text": {"english": "hello", "french" : "bonjour"}.
+
+    Dealiasing is done to the first token (the first term separated by the delimiter).
 
+    :param sheet_name: Name of the sheet data being processed.
+    :param sheet_data: The sheet data.
+    :param sheet_header: The sheet column names (headers).
+    :param header_aliases: Mapping of allowed column aliases (backwards compatibility).
+    :param header_columns: Expected columns for the sheet.
+    :param headers_required: Required columns for the sheet.
+    :param default_language: Default translation language for the form, used to group
+      used to group labels/hints/etc without a language specified with localized versions.
+    :param strip_whitespace: If True, collapse sequences of whitespace to a single space
+      in the data rows.
+    :param add_row_number: If True, add a "__row" key with the row number from the input data.
+    :param visitors: Checks to run on each cell, as the rows are processed.
+    """
+    header_key, tokens_key = _dealias_headers(
+        sheet_name=sheet_name,
+        sheet_data=sheet_data,
+        sheet_header=sheet_header,
+        header_aliases=header_aliases,
+        header_columns=header_columns,
+    )
     data = tuple(
-        process_row(
+        _process_rows(
             sheet_name=sheet_name,
-            row=row,
+            sheet_data=sheet_data,
             header_key=header_key,
-            row_number=row_number,
             default_language=default_language,
             strip_whitespace=strip_whitespace,
             add_row_number=add_row_number,
+            visitors=visitors,
         )
-        for row_number, row in enumerate(sheet_data, start=2)
     )
     if headers_required and (data or sheet_name == constants.SURVEY):
         missing = {h for h in headers_required if h not in {h[0] for h in tokens_key}}
@@ -281,3 +439,47 @@ def dealias_and_group_headers(
                 )
             )
     return DealiasAndGroupHeadersResult(headers=tuple(tokens_key), data=data)
+
+
+def iter_dealias_and_group_headers(
+    sheet_name: str,
+    sheet_data: Iterable[dict[str, str]],
+    sheet_header: Sequence[dict[str, Any]] | None,
+    header_aliases: dict[str, str],
+    header_columns: set[str],
+    default_language: str = constants.DEFAULT_LANGUAGE_VALUE,
+) -> Iterator[dict]:
+    """
+    Like `dealias_and_group_headers`, but process the rows as they are iterated.
+
+    This is for sheets that may be too large to keep in memory, and don't have any
+    required headers. As with `dealias_and_group_headers`, header errors are only
+    raised if there is data. The parameters are as for `dealias_and_group_headers`.
+    """
+    if isinstance(sheet_data, ColumnarSheet):
+        if not sheet_data:
+            return
+    else:
+        sheet_data = iter(sheet_data)
+        first_row = next(sheet_data, None)
+        if first_row is None:
+            return
+        sheet_data = chain((first_row,), sheet_data)
+        if not sheet_header:
+            # The headers are guessed from the data, so it's used more than once.
+            sheet_data = list(sheet_data)
+    header_key, _ = _dealias_headers(
+        sheet_name=sheet_name,
+        sheet_data=sheet_data,
+        sheet_header=sheet_header,
+        header_aliases=header_aliases,
+        header_columns=header_columns,
+    )
+    yield from _process_rows(
+        sheet_name=sheet_name,
+        sheet_data=sheet_data,
+        header_key=header_key,
+        default_language=default_language,
+        strip_whitespace=False,
+        add_row_number=False,
+    )
@@ -0,0 +1,100 @@
+"""
+Optional measurement of the time and memory used by each stage of a conversion.
+"""
+
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+
+_NULL_CONTEXT = nullcontext()
+
+
+@dataclass(slots=True)
+class StageProfile:
+    """
+    Measurements for one conversion stage.
+
+    :param name: The stage name, e.g. "workbook_to_json".
+    :param wall_time: Elapsed time, in seconds.
+    :param cpu_time: CPU time used by the converting thread, in seconds. This excludes
+      time spent in other processes, such as the external validators.
+    :param memory_peak: If memory tracing was requested, the peak memory allocated by
+      Python during the stage, in bytes, over the amount allocated at the stage start.
+    :param ok: False if the stage raised an error.
+    """
+
+    name: str
+    wall_time: float
+    cpu_time: float
+    memory_peak: int | None
+    ok: bool
+
+
+StageHook = Callable[[StageProfile], None]
+
+
+class Profiler:
+    """
+    Collects a StageProfile for each stage, and passes each to the hook (if any).
+
+    Memory tracing uses `tracemalloc`, which slows down Python considerably, and which
+    traces all threads, so the peak may include allocations by other threads.
+    """
+
+    __slots__ = ("enabled", "hook", "stages", "trace_memory")
+
+    def __init__(
+        self, enabled: bool, trace_memory: bool = False, hook: StageHook | None = None
+    ):
+        """
+        :param enabled: If False, the stages are not measured.
+        :param trace_memory: If True, measure the peak memory allocated in each stage.
+        :param hook: If provided, called with the StageProfile at the end of each stage.
+        """
+        self.enabled: bool = enabled or trace_memory or hook is not None
+        self.trace_memory: bool = trace_memory
+        self.hook: StageHook | None = hook
+        self.stages: list[StageProfile] = []
+
+    def stage(self, name: str):
+        """Context manager to measure a stage, if profiling is enabled."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._measure(name=name)
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        started_tracing = False
+        memory_start = None
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        ok = False
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+            ok = True
+        finally:
+            cpu_time = time.thread_time() - cpu_start
+            wall_time = time.perf_counter() - wall_start
+            memory_peak = None
+            if memory_start is not None:
+                memory_peak = max(0, tracemalloc.get_traced_memory()[1] - memory_start)
+                if started_tracing:
+                    tracemalloc.stop()
+            profile = StageProfile(
+                name=name,
+                wall_time=wall_time,
+                cpu_time=cpu_time,
+                memory_peak=memory_peak,
+                ok=ok,
+            )
+            self.stages.append(profile)
+            if self.hook is not None:
+                self.hook(profile)
@@ -3,9 +3,9 @@ XForm Survey element classes for different question types.
 """
 
 import os.path
-from collections.abc import Callable, Generator, Iterable
+from collections.abc import Callable, Generator, Iterable, Iterator
 from itertools import chain
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from pyxform import constants
 from pyxform.constants import (
@@ -18,7 +18,7 @@ from pyxform.constants import (
 from pyxform.elements import action
 from pyxform.errors import PyXFormError
 from pyxform.parsing.expression import maybe_strip
-from pyxform.question_type_dictionary import QUESTION_TYPE_DICT
+from pyxform.question_type_dictionary import QUESTION_TYPE_DICT, ReadOnlyDict
 from pyxform.survey_element import SURVEY_ELEMENT_FIELDS, SurveyElement
 from pyxform.utils import (
     DetachableElement,
@@ -55,6 +55,10 @@ QUESTION_EXTRA_FIELDS = (
     constants.TYPE,
 )
 QUESTION_FIELDS = (*SURVEY_ELEMENT_FIELDS, *QUESTION_EXTRA_FIELDS)
+# Fields that may hold a question type default dict, shared by questions of that type.
+_SHARED_DEFAULT_FIELDS = frozenset(
+    (constants.BIND, constants.CONTROL, constants.PARAMETERS)
+)
 
 ITEMSET_QUESTION_EXTRA_FIELDS = (
     "_itemset_has_ref",
@@ -75,10 +79,44 @@ OPTION_EXTRA_FIELDS = (
     "sms_option",
 )
 OPTION_FIELDS = (*SURVEY_ELEMENT_FIELDS, *OPTION_EXTRA_FIELDS)
+_OPTION_COLUMNS = {constants.NAME, constants.LABEL, constants.MEDIA, "sms_option"}
+
+
+class _SharedDefault:
+    """
+    A Question attribute that may hold a question type default, shared with others.
+
+    The value is kept in the private slot (e.g. `_bind`), and internal code reads it
+    with `_get_shared`. Reading the public attribute (e.g. `bind`) first replaces a
+    shared default with a copy for the question, so that changes only apply to it.
+    """
+
+    __slots__ = ("slot",)
+
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if isinstance(value, ReadOnlyDict):
+            value = dict(value)
+            setattr(instance, self.slot, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
 
 
 class Question(SurveyElement):
-    __slots__ = QUESTION_EXTRA_FIELDS
+    __slots__ = (
+        *(f for f in QUESTION_EXTRA_FIELDS if f not in _SHARED_DEFAULT_FIELDS),
+        *(f"_{f}" for f in _SHARED_DEFAULT_FIELDS),
+    )
+    bind = _SharedDefault()
+    control = _SharedDefault()
+    parameters = _SharedDefault()
 
     @staticmethod
     def get_slot_names() -> tuple[str, ...]:
@@ -118,19 +156,21 @@ class Question(SurveyElement):
 
         # Keeping original qtd_kwargs is only needed if output of QTD data is not
         # acceptable in to_json_dict() i.e. to exclude default bind/control values.
+        # QTD dicts are shared by all questions of the type that don't add to them, rather
+        # than copied for each question, so they are read-only.
         self._qtd_defaults = qtd.get(type_arg)
         qtd_kwargs = None
         for k, v in self._qtd_defaults.items():
-            if isinstance(v, dict):
-                template = v.copy()
-                if k in kwargs:
-                    template.update(kwargs[k])
-                    if qtd_kwargs is None:
-                        qtd_kwargs = {}
-                    qtd_kwargs[k] = kwargs[k]
-                kwargs[k] = template
-            elif k not in kwargs:
+            if k not in kwargs:
+                if isinstance(v, dict) and not isinstance(v, ReadOnlyDict):
+                    # From a custom QTD, so it may be modified elsewhere.
+                    v = ReadOnlyDict(v)
                 kwargs[k] = v
+            elif isinstance(v, dict):
+                if qtd_kwargs is None:
+                    qtd_kwargs = {}
+                qtd_kwargs[k] = kwargs[k]
+                kwargs[k] = {**v, **kwargs[k]}
 
         if qtd_kwargs:
             self._qtd_kwargs = qtd_kwargs
@@ -154,7 +194,7 @@ class Question(SurveyElement):
 
     def xml_control(self, survey: "Survey"):
         if self.type == "calculate" or (
-            ((self.bind is not None and "calculate" in self.bind) or self.trigger)
+            ((self._bind is not None and "calculate" in self._bind) or self.trigger)
             and not (self.label or self.hint)
         ):
             nested_setvalues = survey.setvalues_by_triggering_ref.get(self.name)
@@ -230,7 +270,7 @@ class Question(SurveyElement):
         """
         Initial control node result for further processing depending on Question type.
         """
-        control_dict = self.control
+        control_dict = self._control
         result = node(
             control_dict["tag"],
             *self.xml_label_and_hint(survey=survey),
@@ -247,6 +287,17 @@ class Question(SurveyElement):
     def build_xml(self, survey: "Survey") -> DetachableElement | None:
         return None
 
+    def _get_shared(self, key: str) -> Any:
+        if key in _SHARED_DEFAULT_FIELDS:
+            return getattr(self, f"_{key}")
+        return super()._get_shared(key)
+
+    def copy(self) -> dict[str, Any]:
+        return {
+            k: getattr(self, f"_{k}") if k in _SHARED_DEFAULT_FIELDS else self[k]
+            for k in self
+        }
+
     def to_json_dict(self, delete_keys: Iterable[str] | None = None) -> dict:
         to_delete = (k for k in self.get_slot_names() if k.startswith("_"))
         if self._qtd_defaults:
@@ -329,34 +380,117 @@ class Option(SurveyElement):
 
 
 class Itemset:
-    """Itemset details and metadata detection."""
+    """
+    Itemset details and metadata detection.
 
-    __slots__ = ("name", "options", "requires_itext", "used_by_search")
+    Choice lists may be very large, so the choices are stored by column rather than as an
+    Option per choice. A column that no choice has a value for is None. Options are only
+    created if the Itemset is iterated (or `options` is read), and then kept, so changes
+    to them are not lost.
+    """
+
+    __slots__ = (
+        "_options",
+        "extra_data",
+        "labels",
+        "media",
+        "name",
+        "names",
+        "requires_itext",
+        "sms_options",
+        "used_by_search",
+    )
 
     def __init__(self, name: str, choices: Iterable[dict]):
         self.requires_itext: bool = False
         self.used_by_search: bool = False
         self.name: str = name
-        self.options: tuple[Option, ...] = tuple(o for o in self.get_options(choices))
-
-    def get_options(self, choices: Iterable[dict]) -> Generator[Option, None, None]:
+        self.names: list[str] = []
+        self.labels: list[str | dict | None] = []
+        self.media: list[dict | None] | None = None
+        self.sms_options: list[str | None] | None = None
+        # Any other choice columns, as the column names and values for each choice.
+        self.extra_data: list[tuple[tuple[str, ...], tuple] | None] | None = None
+        self._options: tuple[Option, ...] | None = None
+        self._add_choices(choices)
+
+    def _add_choices(self, choices: Iterable[dict]) -> None:
         requires_itext = False
+        names = self.names
+        labels = self.labels
+        media = []
+        sms_options = []
+        extra_data = []
+        has_media = has_sms_options = has_extra_data = False
+        # Choices from the same sheet have the same extra columns, so share the names.
+        extra_keys = {}
         for c in choices:
-            option = Option(**c)
+            known = 1
+            names.append(c[constants.NAME])
+            choice_label = c.get(constants.LABEL)
+            labels.append(choice_label)
+            if constants.LABEL in c:
+                known += 1
+            choice_media = c.get(constants.MEDIA)
+            media.append(choice_media)
+            if constants.MEDIA in c:
+                known += 1
+                has_media = True
+            sms_options.append(c.get("sms_option"))
+            if "sms_option" in c:
+                known += 1
+                has_sms_options = True
+            if len(c) > known:
+                keys = tuple(k for k in c if k not in _OPTION_COLUMNS)
+                keys = extra_keys.setdefault(keys, keys)
+                extra_data.append((keys, tuple(c[k] for k in keys)))
+                has_extra_data = True
+            else:
+                extra_data.append(None)
+
             if not requires_itext:
                 # Media: dict of image, audio, etc. Defaults to None.
-                if option.media:
+                if choice_media:
+                    requires_itext = True
+                # Multi-language: dict of labels etc per language. Can be just a string.
+                elif isinstance(choice_label, dict):
+                    requires_itext = True
+                # Dynamic label: string contains a pyxform reference.
+                elif choice_label and has_pyxform_reference(choice_label):
                     requires_itext = True
-                else:
-                    choice_label = option.label
-                    # Multi-language: dict of labels etc per language. Can be just a string.
-                    if isinstance(choice_label, dict):
-                        requires_itext = True
-                    # Dynamic label: string contains a pyxform reference.
-                    elif choice_label and has_pyxform_reference(choice_label):
-                        requires_itext = True
-            yield option
         self.requires_itext = requires_itext
+        if has_media:
+            self.media = media
+        if has_sms_options:
+            self.sms_options = sms_options
+        if has_extra_data:
+            self.extra_data = extra_data
+
+    def _create_options(self) -> Generator[Option, None, None]:
+        media = self.media
+        sms_options = self.sms_options
+        extra_data = self.extra_data
+        for idx, name in enumerate(self.names):
+            kwargs = {}
+            if extra_data is not None and extra_data[idx] is not None:
+                kwargs.update(zip(*extra_data[idx], strict=True))
+            yield Option(
+                name=name,
+                label=self.labels[idx],
+                media=None if media is None else media[idx],
+                sms_option=None if sms_options is None else sms_options[idx],
+                **kwargs,
+            )
+
+    def __iter__(self) -> Iterator[Option]:
+        return iter(self.options)
+
+    @property
+    def options(self) -> tuple[Option, ...]:
+        options = self._options
+        if options is None:
+            options = self._options = tuple(self._create_options())
+        return options
 
 
 class ItemsetNode:
@@ -443,7 +577,7 @@ class _SupportsItemset(Question):
                 value_ref = DEFAULT_ITEMSET_VALUE_REF
                 label_ref = DEFAULT_ITEMSET_LABEL_REF
 
-            params = question.parameters
+            params = question._get_shared(constants.PARAMETERS)
             if params is not None:
                 value_ref = params.get(
                     constants.ParametersSelectFromFile.VALUE, value_ref
@@ -505,7 +639,7 @@ class _SupportsItemset(Question):
         itemset_node: ItemsetNode, question: "Question", survey: "Survey"
     ):
         """Wrap the existing nodeset in a randomize() call, optionally with a seed."""
-        params = question.parameters
+        params = question._get_shared(constants.PARAMETERS)
         if (
             params
             and constants.ParametersSelect.RANDOMIZE in params
@@ -561,7 +695,7 @@ class MultipleChoiceQuestion(_SupportsItemset):
         super().__init__(**kwargs)
 
     def build_xml(self, survey: "Survey"):
-        if self.bind["type"] not in {"string", "odk:rank"}:
+        if self._bind["type"] not in {"string", "odk:rank"}:
             raise PyXFormError("""Invalid value for `self.bind["type"]`.""")
 
         result = self._build_xml(survey=survey)
@@ -579,7 +713,7 @@ class MultipleChoiceQuestion(_SupportsItemset):
                 result.appendChild(itemset_node)
         elif choices:
             # Options processing specific to XLSForms using the "search()" function.
-            # The _choice_itext_ref is prepared by Survey._redirect_is_search_itext.
+            # The _choice_itext_ref is set by Survey._redirect_is_search_itext.
             if choices.used_by_search:
                 for option in choices.options:
                     if choices.requires_itext:
@@ -8,6 +8,27 @@ from typing import Any
 
 from pyxform import constants as co
 
+
+class ReadOnlyDict(dict):
+    """
+    A dict that can't be modified, for defaults that are shared rather than copied.
+
+    It's still a dict, so it can be read, pickled, and dumped as JSON like one. Copies
+    made with `copy()`, `dict()`, or `{**d}` are plain (modifiable) dicts.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"'{type(self).__name__}' object does not support modification.")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
 _QUESTION_TYPE_DICT = {
     "q picture": {
         "control": {"tag": "upload", "mediatype": "image/*"},
@@ -386,8 +407,18 @@ _QUESTION_TYPE_DICT = {
     },
 }
 
-# Read-only view of the types.
-QUESTION_TYPE_DICT = MappingProxyType(_QUESTION_TYPE_DICT)
+# Read-only view of the types. Questions share these defaults rather than copying them.
+QUESTION_TYPE_DICT = MappingProxyType(
+    {
+        type_name: ReadOnlyDict(
+            {
+                k: ReadOnlyDict(v) if isinstance(v, dict) else v
+                for k, v in defaults.items()
+            }
+        )
+        for type_name, defaults in _QUESTION_TYPE_DICT.items()
+    }
+)
 
 
 def get_meta_group(children: Sequence[dict[str, Any]]) -> dict[str, Any]:
@@ -5,7 +5,6 @@ Section survey element module.
 from collections.abc import Callable, Generator, Iterable
 from itertools import chain
 from typing import TYPE_CHECKING
-from xml.dom.minidom import Attr
 
 from pyxform import constants
 from pyxform.external_instance import ExternalInstance
@@ -154,8 +153,8 @@ class Section(SurveyElement):
                 child_instance = child.xml_instance(
                     survey=survey, append_template=append_template
                 )
-                if isinstance(child_instance, Attr):
-                    result.setAttributeNode(child_instance)
+                if isinstance(child_instance, tuple):
+                    result.setAttribute(*child_instance)
                 else:
                     result.appendChild(child_instance)
             if append_template and repeating_template:
@@ -9,8 +9,10 @@ import xml.etree.ElementTree as ETree
 from collections import defaultdict
 from collections.abc import Generator, Iterable
 from datetime import datetime
+from io import StringIO
 from itertools import chain
 from pathlib import Path
+from typing import TextIO
 
 from pyxform import aliases, constants
 from pyxform.constants import EXTERNAL_INSTANCE_EXTENSIONS, NSMAP
@@ -29,13 +31,14 @@ from pyxform.utils import (
     escape_text_for_xml,
     node,
 )
-from pyxform.validators import enketo_validate, odk_validate
+from pyxform.validators import check
 from pyxform.validators.pyxform import unique_names
 from pyxform.validators.pyxform.iana_subtags.validation import get_languages_with_bad_tags
 from pyxform.validators.pyxform.pyxform_reference import (
     has_pyxform_reference_with_last_saved,
     is_pyxform_reference_candidate,
 )
+from pyxform.validators.util import stdin_path_supported
 
 RE_BRACKET = re.compile(r"\[([^]]+)\]")
 RE_FUNCTION_ARGS = re.compile(r"\b[^()]+\((.*)\)$")
@@ -303,7 +306,7 @@ class Survey(Section):
         return node(
             "h:html",
             node("h:head", node("h:title", self.title), self.xml_model()),
-            node("h:body", *self.xml_control(survey=self), **body_kwargs),
+            node("h:body", self.xml_control(survey=self), **body_kwargs),
             **nsmap,
         )
 
@@ -314,25 +317,32 @@ class Survey(Section):
         Generate <instance> elements for static data (e.g. choices for selects)
         """
 
-        def choice_nodes(idx, choice):
+        requires_itext = itemset.requires_itext
+        labels = itemset.labels
+        extra_data = itemset.extra_data
+        sms_options = itemset.sms_options
+
+        def choice_nodes(idx, name):
             # Add a unique id to the choice element in case there are itext references
-            if itemset.requires_itext:
+            if requires_itext:
                 yield node("itextId", f"{list_name}-{idx}")
-            yield node(constants.NAME, choice.name)
-            choice_label = choice.label
-            if not itemset.requires_itext and isinstance(choice_label, str):
+            yield node(constants.NAME, name)
+            choice_label = labels[idx]
+            if not requires_itext and isinstance(choice_label, str):
                 yield node(constants.LABEL, choice_label)
-            choice_extra_data = choice.extra_data
-            if choice_extra_data and isinstance(choice_extra_data, dict):
-                for k, v in choice_extra_data.items():
-                    yield node(k, v)
-            choice_sms_option = choice.sms_option
-            if choice_sms_option and isinstance(choice_sms_option, str):
-                yield node("sms_option", choice_sms_option)
-
-        def instance_nodes(choices):
-            for idx, choice in enumerate(choices):
-                yield node("item", choice_nodes(idx, choice))
+            if extra_data is not None:
+                choice_extra_data = extra_data[idx]
+                if choice_extra_data is not None:
+                    for k, v in zip(*choice_extra_data, strict=True):
+                        yield node(k, v)
+            if sms_options is not None:
+                choice_sms_option = sms_options[idx]
+                if choice_sms_option and isinstance(choice_sms_option, str):
+                    yield node("sms_option", choice_sms_option)
+
+        def instance_nodes(names):
+            for idx, name in enumerate(names):
+                yield node("item", choice_nodes(idx, name))
 
         return InstanceInfo(
             type="choice",
@@ -341,7 +351,7 @@ class Survey(Section):
             src=None,
             instance=node(
                 "instance",
-                node("root", instance_nodes(itemset.options)),
+                node("root", instance_nodes(itemset.names)),
                 id=list_name,
             ),
         )
@@ -402,11 +412,9 @@ class Survey(Section):
             functions_present = []
             for formula_name in constants.EXTERNAL_INSTANCES:
                 if (
-                    hasattr(element, "bind")
-                    and element.bind is not None
-                    and "pulldata(" in str(element["bind"].get(formula_name))
-                ):
-                    functions_present.append(element["bind"][formula_name])
+                    bind := element._get_shared("bind")
+                ) is not None and "pulldata(" in str(bind.get(formula_name)):
+                    functions_present.append(bind[formula_name])
             if (
                 hasattr(element, constants.CHOICE_FILTER)
                 and element.choice_filter is not None
@@ -475,10 +483,11 @@ class Survey(Section):
             element.choice_filter
         ):
             return True
-        if element.bind:
+        bind = element._get_shared("bind")
+        if bind:
             # Assuming average len(bind) < 10 and len(EXTERNAL_INSTANCES) = 5 and the
             # current has_last_saved implementation, iterating bind keys is fastest.
-            for k, v in element.bind.items():
+            for k, v in bind.items():
                 if (
                     k in constants.EXTERNAL_INSTANCES
                     and v
@@ -710,7 +719,7 @@ class Survey(Section):
         """
         is_search = False
         try:
-            appearance = element.control[constants.APPEARANCE]
+            appearance = element._get_shared("control")[constants.APPEARANCE]
             if appearance and len(appearance) > 7:
                 is_search = bool(SEARCH_FUNCTION_REGEX.search(appearance))
         except (KeyError, TypeError):
@@ -743,10 +752,9 @@ class Survey(Section):
         setup media and itext functions
         """
 
-        def get_choice_content(name, idx, choice):
+        def get_choice_content(name, idx, choice_label, choice_media):
             itext_id = f"{name}-{idx}"
 
-            choice_label = choice.label
             if choice_label:
                 if isinstance(choice_label, dict):
                     for lang, value in choice_label.items():
@@ -758,7 +766,6 @@ class Survey(Section):
                 else:
                     yield ([self.default_language, itext_id, "long"], choice_label)
 
-            choice_media = choice.media
             if choice_media:
                 for media, value in choice_media.items():
                     if isinstance(value, dict):
@@ -770,8 +777,12 @@ class Survey(Section):
         def get_choices():
             for name, itemset in self.choices.items():
                 if itemset.requires_itext:
-                    for idx, choice in enumerate(itemset.options):
-                        yield from get_choice_content(name, idx, choice)
+                    media = itemset.media
+                    for idx, choice_label in enumerate(itemset.labels):
+                        choice_media = None if media is None else media[idx]
+                        yield from get_choice_content(
+                            name, idx, choice_label, choice_media
+                        )
 
         if self.choices:
             for path, value in get_choices():
@@ -914,13 +925,8 @@ class Survey(Section):
         itext nodes are localized images/audio/video/text
         @see http://code.google.com/p/opendatakit/wiki/XFormDesignGuidelines
         """
-        result = []
-        for lang, translation in self._translations.items():
-            if lang == self.default_language:
-                result.append(node("translation", lang=lang, default="true()"))
-            else:
-                result.append(node("translation", lang=lang))
 
+        def text_nodes(translation):
             for label_name, content in translation.items():
                 itext_nodes = []
                 label_type = label_name.partition(":")[-1]
@@ -981,20 +987,53 @@ class Survey(Section):
                             )
                         )
 
-                result[-1].appendChild(node("text", *itext_nodes, id=label_name))
+                yield node("text", *itext_nodes, id=label_name)
+
+        def translation_nodes():
+            for lang, translation in self._translations.items():
+                if lang == self.default_language:
+                    yield node(
+                        "translation",
+                        text_nodes(translation),
+                        lang=lang,
+                        default="true()",
+                    )
+                else:
+                    yield node("translation", text_nodes(translation), lang=lang)
 
-        return node("itext", *result)
+        return node("itext", translation_nodes())
 
     def date_stamp(self):
         """Returns a date string with the format of %Y_%m_%d."""
         return self._created.strftime("%Y_%m_%d")
 
+    def write_xml(self, writer: TextIO, pretty_print: bool = True) -> None:
+        """
+        Write the XForm to a text sink, such as a file or StringIO.
+
+        Elements are generated as they are written, rather than building the full
+        document tree in memory first.
+
+        :param writer: The object to write() the XForm text to.
+        :param pretty_print: If True, format the XML with newlines and indentation.
+        """
+        if pretty_print:
+            writer.write("""<?xml version="1.0"?>\n""")
+            self.xml().writexml(writer, "", "  ", "\n")
+        else:
+            writer.write("""<?xml version="1.0"?>""")
+            self.xml().writexml(writer, "", "", "")
+
     def _to_ugly_xml(self) -> str:
-        return f"""<?xml version="1.0"?>{self.xml().toxml()}"""
+        writer = StringIO()
+        self.write_xml(writer=writer, pretty_print=False)
+        return writer.getvalue()
 
     def _to_pretty_xml(self) -> str:
         """Get the XForm with human readable formatting."""
-        return f"""<?xml version="1.0"?>\n{self.xml().toprettyxml(indent="  ")}"""
+        writer = StringIO()
+        self.write_xml(writer=writer, pretty_print=True)
+        return writer.getvalue()
 
     def _setup_xpath_dictionary(self):
         if self._xpath:
@@ -1221,6 +1260,20 @@ class Survey(Section):
         else:
             return text, False
 
+    def _check_language_tags(self, warnings: list[str]) -> None:
+        """Warn if one or more translation is missing a valid IANA subtag."""
+        translations = self._translations
+        if translations:
+            bad_languages = get_languages_with_bad_tags(translations)
+            if bad_languages:
+                warnings.append(
+                    "The following language declarations do not contain "
+                    "valid machine-readable codes: "
+                    + ", ".join(bad_languages)
+                    + ". "
+                    + "Learn more: http://xlsform.org#multiple-language-support"
+                )
+
     def print_xform_to_file(
         self, path=None, validate=True, pretty_print=True, warnings=None, enketo=False
     ) -> str:
@@ -1243,35 +1296,50 @@ class Survey(Section):
             if os.path.exists(path):
                 os.unlink(path)
             raise
-        if validate:
-            warnings.extend(odk_validate.check_xform(path))
-        if enketo:
-            warnings.extend(enketo_validate.check_xform(path))
+        if validate or enketo:
+            warnings.extend(check.check_xform(path, odk=validate, enketo=enketo))
 
-        # Warn if one or more translation is missing a valid IANA subtag
-        translations = self._translations
-        if translations:
-            bad_languages = get_languages_with_bad_tags(translations)
-            if bad_languages:
-                warnings.append(
-                    "The following language declarations do not contain "
-                    "valid machine-readable codes: "
-                    + ", ".join(bad_languages)
-                    + ". "
-                    + "Learn more: http://xlsform.org#multiple-language-support"
-                )
+        self._check_language_tags(warnings=warnings)
         return xml
 
-    def to_xml(self, validate=True, pretty_print=True, warnings=None, enketo=False):
+    def to_xml(
+        self,
+        validate=True,
+        pretty_print=True,
+        warnings=None,
+        enketo=False,
+        validate_via_stdin=False,
+    ):
         """
         Generates the XForm XML.
         validate is True by default - pass the XForm XML through ODK Validator.
         pretty_print is True by default - formats the XML for readability.
         warnings - if a list is passed it stores all warnings generated
         enketo - pass the XForm XML though Enketo Validator.
+        validate_via_stdin - if supported by the OS, pipe the XForm XML to the
+          validators via stdin, instead of writing it to a temporary file.
+
+        The XForm is only written to a file if a validator is run and it can't be
+        piped to the validator.
 
         Return XForm XML string.
         """
+        if warnings is None:
+            warnings = []
+        if not (validate or enketo) or (validate_via_stdin and stdin_path_supported()):
+            if pretty_print:
+                xml = self._to_pretty_xml()
+            else:
+                xml = self._to_ugly_xml()
+            if validate or enketo:
+                xform_data = xml.encode("utf-8")
+                # this will throw an exception if the xml is not valid
+                warnings.extend(
+                    check.check_xform(xform_data=xform_data, odk=validate, enketo=enketo)
+                )
+            self._check_language_tags(warnings=warnings)
+            return xml
+
         # On Windows, NamedTemporaryFile must be opened exclusively.
         # So it must be explicitly created, opened, closed, and removed.
         tmp = tempfile.NamedTemporaryFile(delete=False)
@@ -12,6 +12,7 @@ from pyxform import aliases as alias
 from pyxform import constants as const
 from pyxform.errors import ErrorCode, PyXFormError
 from pyxform.parsing.expression import is_xml_tag
+from pyxform.question_type_dictionary import ReadOnlyDict
 from pyxform.utils import (
     DetachableElement,
     node,
@@ -130,9 +131,8 @@ class SurveyElement(Mapping):
         # options for selects in a field-list and might want blank labels for
         # themselves.
         if (
-            hasattr(self, "control")
-            and self.control
-            and self.control.get("appearance") == "label"
+            (control := self._get_shared("control"))
+            and control.get("appearance") == "label"
             and not self.label
         ):
             self.label = " "
@@ -142,6 +142,15 @@ class SurveyElement(Mapping):
     def name_for_xpath(self) -> str:
         return self.name
 
+    def _get_shared(self, key: str) -> Any:
+        """
+        Get the attribute (or None) for reading, without copying a shared default.
+
+        Don't modify the result, since it may be shared with other elements. Use the
+        attribute itself to get a value that can be modified (see `Question`).
+        """
+        return getattr(self, key, None)
+
     def validate(self):
         if not is_xml_tag(self.name):
             raise PyXFormError(ErrorCode.NAMES_009.value.format(name=const.NAME))
@@ -285,7 +294,8 @@ class SurveyElement(Mapping):
             dictionary.pop(key, None)
 
         for value in dictionary.values():
-            if isinstance(value, dict):
+            # Shared defaults (e.g. a question type's bind) have no such keys to delete.
+            if isinstance(value, dict) and not isinstance(value, ReadOnlyDict):
                 self._delete_keys_from_dict(value, keys)
 
     def copy(self) -> dict[str, Any]:
@@ -361,7 +371,7 @@ class SurveyElement(Mapping):
         Returns translations used by this element so they can be included in
         the <itext> block. @see survey._setup_translations
         """
-        bind_dict = self.bind
+        bind_dict = self._get_shared("bind")
         if bind_dict and isinstance(bind_dict, dict):
             constraint_msg = bind_dict.get("jr:constraintMsg")
             if isinstance(constraint_msg, dict):
@@ -528,14 +538,15 @@ class SurveyElement(Mapping):
         """
         Return the binding(s) for this survey element.
         """
-        if not hasattr(self, "bind") or self.get("bind") is None:
+        shared_bind = self._get_shared("bind")
+        if shared_bind is None:
             return None
         if hasattr(self, "flat") and self.get("flat"):
             # Don't generate bind element for flat groups.
             return None
 
         bind_dict = {}
-        for k, v in self.bind.items():
+        for k, v in shared_bind.items():
             # the expression goes in a setvalue action
             if hasattr(self, "trigger") and self.trigger and k == "calculate":
                 continue
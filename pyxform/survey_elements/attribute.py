@@ -1,7 +1,6 @@
 from collections.abc import Generator
 from itertools import chain
 from typing import TYPE_CHECKING
-from xml.dom.minidom import Attr
 
 from pyxform import constants as const
 from pyxform.elements import action
@@ -43,10 +42,9 @@ class Attribute(SurveyElement):
     def name_for_xpath(self) -> str:
         return f"@{self.name}"
 
-    def xml_instance(self, survey: "Survey", **kwargs):
-        attr = Attr(self.name)
-        attr.value = self.value
-        return attr
+    def xml_instance(self, survey: "Survey", **kwargs) -> tuple[str, str]:
+        """The (name, value) pair to set on the parent instance element."""
+        return self.name, self.value
 
     def xml_actions(
         self, survey: "Survey", in_repeat: bool = False
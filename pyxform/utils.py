@@ -6,13 +6,13 @@ import copy
 import csv
 import json
 import sys
-from collections.abc import Generator, Iterable
+from collections.abc import Generator, Iterable, Iterator
 from functools import lru_cache
 from io import StringIO
 from itertools import chain
 from json.decoder import JSONDecodeError
+from typing import TextIO
 from xml.dom import Node
-from xml.dom.minidom import Element, Text
 
 from defusedxml.minidom import parseString
 
@@ -28,51 +28,141 @@ XML_TEXT_SUBS = {"&": "&amp;", "<": "&lt;", ">": "&gt;"}
 XML_TEXT_TABLE = str.maketrans(XML_TEXT_SUBS)
 
 
-class DetachableElement(Element):
+class DetachableElement:
     """
-    Element classes are not meant to be instantiated directly.   This
-    restriction was not strictly enforced in Python 2, but is effectively
-    enforced in Python 3 via http://bugs.python.org/issue15290.
-
-    A simple workaround (for now) is to set an extra attribute on the Element
-    class.  The long term fix will probably be to rewrite node() to use
-    document.createElement rather than Element.
+    A lightweight XML element for writing XForm output.
+
+    This supports the subset of the xml.dom.minidom.Element interface that pyxform
+    uses, but without an ownerDocument, Attr nodes, or sibling pointers. Children that
+    are provided as generators are not consumed until the element is written (or its
+    childNodes are read), so when the tree is written out, each element's generator
+    children are created, then written to the sink and released in turn. As a
+    consequence, writing an element consumes its pending generator children, so write
+    it once.
     """
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.ownerDocument = None
+    __slots__ = ("_children", "_has_text", "_pending", "attributes", "tagName")
+
+    nodeType = Node.ELEMENT_NODE
+
+    def __init__(self, tagName: str):
+        self.tagName: str = tagName
+        self.attributes: dict[str, str] = {}
+        self._children: list = []
+        self._pending: list[Iterator] = []
+        self._has_text: bool = False
+
+    @property
+    def nodeName(self) -> str:
+        return self.tagName
+
+    @property
+    def childNodes(self) -> list:
+        if self._pending:
+            self._children.extend(self._pull_pending())
+        return self._children
+
+    def _pull_pending(self) -> list:
+        """Consume the pending children, noting whether any of them are text."""
+        pulled = []
+        while self._pending:
+            source = self._pending.pop(0)
+            for e in source:
+                if e is not None:
+                    if e.nodeType in NODE_TYPE_TEXT:
+                        self._has_text = True
+                    pulled.append(e)
+        return pulled
+
+    @property
+    def lastChild(self):
+        child_nodes = self.childNodes
+        return child_nodes[-1] if child_nodes else None
+
+    def _get_lastChild(self):
+        return self.lastChild
+
+    def getAttribute(self, name: str) -> str:
+        return self.attributes.get(name, "")
+
+    def setAttribute(self, name: str, value: str) -> None:
+        self.attributes[name] = value
+
+    def appendChild(self, child):
+        if child.nodeType in NODE_TYPE_TEXT:
+            self._has_text = True
+        if self._pending:
+            self._pending.append(iter((child,)))
+        else:
+            self._children.append(child)
+        return child
+
+    def appendChildren(self, children: Iterable) -> None:
+        """Add children from an iterable, which is not consumed until needed."""
+        self._pending.append(iter(children))
+
+    def insertBefore(self, child, ref_child):
+        if ref_child is None:
+            return self.appendChild(child)
+        child_nodes = self.childNodes
+        child_nodes.insert(child_nodes.index(ref_child), child)
+        if child.nodeType in NODE_TYPE_TEXT:
+            self._has_text = True
+        return child
 
     def writexml(self, writer, indent="", addindent="", newl=""):
         # indent = current indentation
         # addindent = indentation to add to higher levels
         # newl = newline string
-        writer.write(f"{indent}<{self.tagName}")
+        write = writer.write
+        write(f"{indent}<{self.tagName}")
 
-        if self._attrs:
-            for k, v in self._attrs.items():
+        if self.attributes:
+            for k, v in self.attributes.items():
                 # First space prefix separates attr from tagName, then it separates attrs.
-                writer.write(f' {k}="{escape_text_for_xml(v.value, attribute=True)}"')
-        if self.childNodes:
-            writer.write(">")
-            # For text or mixed content, write without adding indents or newlines.
-            if any(c.nodeType in NODE_TYPE_TEXT for c in self.childNodes):
-                # Conditions to match old Survey.py regex for remaining whitespace.
-                child_nodes = len(self.childNodes)
-                for idx, cnode in enumerate(self.childNodes):
-                    if 1 < child_nodes and idx == 0 and cnode.nodeType in NODE_TYPE_TEXT:
-                        writer.write(" ")
-                    cnode.writexml(writer, "", "", "")
-                    if 1 < child_nodes and (idx + 1) == child_nodes:
-                        writer.write(" ")
-            else:
-                writer.write(newl)
-                for cnode in self.childNodes:
-                    cnode.writexml(writer, f"{indent}{addindent}", addindent, newl)
-                writer.write(indent)
-            writer.write(f"</{self.tagName}>{newl}")
-        else:
-            writer.write(f"/>{newl}")
+                write(f' {k}="{escape_text_for_xml(v, attribute=True)}"')
+
+        # Pending children may include text, which must be known before writing any.
+        pulled = self._pull_pending() if self._pending else None
+
+        # For text or mixed content, write without adding indents or newlines.
+        if self._has_text:
+            if pulled:
+                self._children.extend(pulled)
+            child_nodes = self._children
+            write(">")
+            # Conditions to match old Survey.py regex for remaining whitespace.
+            n_child_nodes = len(child_nodes)
+            for idx, cnode in enumerate(child_nodes):
+                if 1 < n_child_nodes and idx == 0 and cnode.nodeType in NODE_TYPE_TEXT:
+                    write(" ")
+                cnode.writexml(writer, "", "", "")
+                if 1 < n_child_nodes and (idx + 1) == n_child_nodes:
+                    write(" ")
+            write(f"</{self.tagName}>{newl}")
+            return
+
+        if not self._children and not pulled:
+            write(f"/>{newl}")
+            return
+        write(f">{newl}")
+        child_indent = f"{indent}{addindent}"
+        for cnode in self._children:
+            cnode.writexml(writer, child_indent, addindent, newl)
+        if pulled:
+            # Release each pending child once it's written.
+            pulled.reverse()
+            while pulled:
+                pulled.pop().writexml(writer, child_indent, addindent, newl)
+        write(f"{indent}</{self.tagName}>{newl}")
+
+    def toprettyxml(self, indent="\t", newl="\n") -> str:
+        writer = StringIO()
+        self.writexml(writer, "", indent, newl)
+        return writer.getvalue()
+
+    def toxml(self) -> str:
+        return self.toprettyxml(indent="", newl="")
 
 
 @lru_cache(maxsize=64)
@@ -85,9 +175,22 @@ def escape_text_for_xml(text: str, attribute: bool = False) -> str:
     return text
 
 
-class PatchedText(Text):
+class PatchedText:
+    """A text node that escapes only the characters necessary for text content."""
+
+    __slots__ = ("data",)
+
+    nodeType = Node.TEXT_NODE
+
+    def __init__(self, data: str = ""):
+        self.data: str = data
+
+    @property
+    def nodeValue(self) -> str:
+        return self.data
+
     def writexml(self, writer, indent="", addindent="", newl=""):
-        """Same as original but no replacing double quotes with '&quot;'."""
+        """Same as minidom Text but no replacing double quotes with '&quot;'."""
         data = f"{indent}{self.data}{newl}"
         if data:
             data = escape_text_for_xml(text=data)
@@ -98,6 +201,9 @@ def node(tag: str, *args, toParseString: bool = False, **kwargs) -> DetachableEl
     """
     Create an Element, with attached child elements (args) and attributes (kwargs).
 
+    Generator args are attached as pending children, which are consumed when the
+    Element is written. Other args are attached immediately.
+
     :param tag: The Element XML tag name.
     :param toParseString: If True, parse the first text arg as XML and add it to the tag.
     """
@@ -115,23 +221,17 @@ def node(tag: str, *args, toParseString: bool = False, **kwargs) -> DetachableEl
             for child in parsed_node.childNodes:
                 result.appendChild(child.cloneNode(deep=False))
         else:
-            text_node = PatchedText()
-            text_node.data = unicode_args[0]
-            result.appendChild(text_node)
+            result.appendChild(PatchedText(unicode_args[0]))
 
-    # Convert the kwargs xml attribute dictionary to a xml.dom.minidom.Element.
-    for k, v in kwargs.items():
-        result.setAttribute(k, v)
+    # Convert the kwargs xml attribute dictionary to Element attributes.
+    if kwargs:
+        result.attributes.update(kwargs)
 
     for n in args:
         if isinstance(n, int | float | bytes):
-            text_node = PatchedText()
-            text_node.data = str(n)
-            result.appendChild(text_node)
+            result.appendChild(PatchedText(str(n)))
         elif isinstance(n, Generator):
-            for e in n:
-                if e is not None:
-                    result.appendChild(e)
+            result.appendChildren(n)
         elif not isinstance(n, str):
             result.appendChild(n)
     return result
@@ -170,6 +270,35 @@ def flatten(li):
         yield from subli
 
 
+def write_external_choices_csv(workbook_dict: DefinitionData, sink: TextIO) -> bool:
+    """
+    Write the 'external_choices' sheet data to the sink as CSV.
+
+    If the sheet isn't already loaded, the rows are read from the workbook as they are
+    written, so that the whole sheet isn't kept in memory.
+
+    :param workbook_dict: The result from xls2json.workbook_to_json.
+    :param sink: Where to write the CSV, e.g. a file opened with newline="".
+    :return: False if the sheet is missing or empty, in which case nothing is written.
+    """
+    rows, header = workbook_dict.iter_sheet(sheet_name=const.EXTERNAL_CHOICES)
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        return False
+    try:
+        header = header[0]
+    except (IndexError, KeyError, TypeError):
+        rows = [first_row, *rows]
+        header = {k for d in rows for k in d}
+    else:
+        rows = chain((first_row,), rows)
+    csv_writer = csv.writer(sink, quoting=csv.QUOTE_ALL)
+    csv_writer.writerow(header)
+    csv_writer.writerows(row.values() for row in rows)
+    return True
+
+
 def external_choices_to_csv(
     workbook_dict: DefinitionData, warnings: list | None = None
 ) -> str | None:
@@ -180,24 +309,66 @@ def external_choices_to_csv(
     :param warnings: The conversions warnings list.
     """
     warnings = coalesce(warnings, [])
-    if not workbook_dict.external_choices:
+    itemsets = StringIO(newline="")
+    if not write_external_choices_csv(workbook_dict=workbook_dict, sink=itemsets):
         warnings.append(
             f"Could not export itemsets.csv, the '{const.EXTERNAL_CHOICES}' sheet is missing."
         )
         return None
-
-    itemsets = StringIO(newline="")
-    csv_writer = csv.writer(itemsets, quoting=csv.QUOTE_ALL)
-    try:
-        header = workbook_dict.external_choices_header[0]
-    except (IndexError, KeyError, TypeError):
-        header = {k for d in workbook_dict.external_choices for k in d}
-    csv_writer.writerow(header)
-    for row in workbook_dict.external_choices:
-        csv_writer.writerow(row.values())
     return itemsets.getvalue()
 
 
+class ItemsetsCSV:
+    """
+    The 'external_choices' sheet data, to be written as CSV when it's needed.
+
+    The CSV is not kept in memory. The workbook is kept open until the CSV is written,
+    and the rows are read from it as they are written (unless the sheet is already
+    loaded). The workbook is closed after writing, so write the CSV once, or call
+    `close` if it won't be written.
+    """
+
+    __slots__ = ("workbook_dict",)
+
+    def __init__(self, workbook_dict: DefinitionData):
+        """
+        :param workbook_dict: The result from xls2json.workbook_to_json.
+        """
+        self.workbook_dict: DefinitionData | None = workbook_dict
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Close the workbook, if it's still open."""
+        workbook_dict = self.workbook_dict
+        if workbook_dict is not None:
+            self.workbook_dict = None
+            workbook_dict.close()
+
+    def write(self, sink: TextIO) -> None:
+        """
+        Write the CSV to the sink, then close the workbook.
+
+        :param sink: Where to write the CSV, e.g. a file opened with newline="".
+        """
+        if self.workbook_dict is None:
+            raise PyXFormError("The itemsets CSV was already written or closed.")
+        try:
+            write_external_choices_csv(workbook_dict=self.workbook_dict, sink=sink)
+        finally:
+            self.close()
+
+    def getvalue(self) -> str:
+        """Get the CSV as a string."""
+        itemsets = StringIO(newline="")
+        self.write(sink=itemsets)
+        return itemsets.getvalue()
+
+
 def has_external_choices(json_struct):
     """
     Returns true if a select one external prompt is used in the survey.
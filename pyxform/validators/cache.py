@@ -0,0 +1,190 @@
+"""
+An on-disk cache of external validator results, keyed by the XForm content.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+from pyxform.errors import PyXFormError
+
+# Result text that relates to the validator run rather than the XForm, so don't cache.
+UNCACHEABLE_WARNINGS = {
+    "XForm took to long to completely validate.",
+    "Bad return code from ODK Validate.",
+    "Bad return code from Enketo Validate.",
+}
+# The validators exit with this code if the XForm is invalid. Other codes are crashes.
+INVALID_XFORM_RETURN_CODE = 1
+# Error text that means the validator process failed, rather than the XForm being invalid.
+UNCACHEABLE_ERRORS = (
+    "Error: Unable to access jarfile",
+    "Error occurred during initialization of VM",
+    "A fatal error has been detected by the Java Runtime Environment",
+    "java.lang.OutOfMemoryError",
+    "java.lang.StackOverflowError",
+    "JavaScript heap out of memory",
+)
+
+
+class CacheEntry(NamedTuple):
+    """A validator result: the warnings if the XForm is valid, or the error if not."""
+
+    warnings: list[str]
+    error: str | None
+
+
+def is_cacheable_error(error: Exception) -> bool:
+    """
+    Check if the validator error is about the XForm, so the result can be cached.
+
+    That is, the validator ran to completion and reported why the XForm is invalid,
+    rather than the validator process crashing, running out of memory, etc.
+
+    :param error: The error raised by the validator check.
+    """
+    # The message is a heading line, then the validator output.
+    message = str(error)
+    return (
+        getattr(error, "return_code", None) == INVALID_XFORM_RETURN_CODE
+        and bool(message.partition("\n")[2].strip())
+        and not any(e in message for e in UNCACHEABLE_ERRORS)
+    )
+
+
+@lru_cache(maxsize=8)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    """Hash the file content. The mtime and size are args so a changed file misses."""
+    digest = hashlib.sha256()
+    with open(path, mode="rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_validator_version(bin_file_path: str) -> str | None:
+    """
+    Get an identifier for the installed validator version, or None if not installed.
+
+    :param bin_file_path: Path to the validator jar or executable.
+    """
+    try:
+        stat = os.stat(bin_file_path)
+    except OSError:
+        return None
+    return _file_digest(bin_file_path, stat.st_mtime_ns, stat.st_size)
+
+
+class ValidationCache:
+    """
+    Validator results stored as one JSON file per key, with least recently used eviction.
+
+    The key is a hash of the validator name, the validator version, and the XForm
+    content. So a result is re-used only if the same validator checks identical XForm
+    content. Reading an entry marks it as recently used, and when the total size of the
+    cache files is over `max_size` then the least recently used entries are removed.
+
+    The total size is tracked as entries are stored, and the directory is only scanned
+    when that total is unknown or over `max_size`. Other processes using the same
+    directory aren't counted until the next scan.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str], max_size: int = 100 << 20):
+        """
+        :param directory: Where to store the cache files. Created if it doesn't exist.
+        :param max_size: The maximum total size of the cache files, in bytes.
+        """
+        if max_size < 1:
+            raise PyXFormError("The validation cache max_size must be at least 1.")
+        self.directory: Path = Path(directory)
+        self.max_size: int = max_size
+        self._lock: threading.Lock = threading.Lock()
+        # Total size of the cache files, or None if not yet scanned.
+        self._size: int | None = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(validator_name: str, validator_version: str, xform_data: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(validator_name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(validator_version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(xform_data)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get the cached result, if any."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            entry = CacheEntry(warnings=data["warnings"], error=data["error"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        try:
+            os.utime(path)  # Mark as recently used.
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store the result, then evict old results if the cache is too large."""
+        content = json.dumps({"warnings": entry.warnings, "error": entry.error})
+        data = content.encode("utf-8")
+        path = self._path(key)
+        # Write to a temporary file then rename, so readers never see a partial file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, mode="wb") as f:
+                f.write(data)
+            with self._lock:
+                try:
+                    replaced_size = path.stat().st_size
+                except OSError:
+                    replaced_size = 0
+                os.replace(tmp_path, path)
+                if self._size is not None:
+                    self._size += len(data) - replaced_size
+                needs_evict = self._size is None or self.max_size < self._size
+        except OSError:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        if needs_evict:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache is within max_size."""
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+                total += stat.st_size
+            if self.max_size < total:
+                entries.sort()
+                for _, size, path in entries:
+                    path.unlink(missing_ok=True)
+                    total -= size
+                    if total <= self.max_size:
+                        break
+            self._size = total
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+            self._size = 0
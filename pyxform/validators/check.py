@@ -0,0 +1,173 @@
+"""
+Run the external XForm validators (ODK Validate and Enketo Validate).
+"""
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from pyxform.errors import PyXFormError
+from pyxform.validators import enketo_validate, odk_validate
+from pyxform.validators.cache import (
+    UNCACHEABLE_WARNINGS,
+    CacheEntry,
+    ValidationCache,
+    get_validator_version,
+    is_cacheable_error,
+)
+
+_validator_slots: threading.BoundedSemaphore | None = None
+_cache: ValidationCache | None = None
+
+
+class _Validator(NamedTuple):
+    name: str
+    check: Callable[..., list[str]]
+    bin_file_path: str
+    error_type: type[Exception]
+
+
+def set_cache(cache: ValidationCache | None) -> None:
+    """
+    Use a cache of validator results, so that identical XForms aren't re-validated.
+
+    :param cache: The cache to use, or None to stop using a cache.
+    """
+    global _cache  # noqa: PLW0603
+
+    _cache = cache
+
+
+def set_concurrency_limit(limit: int | None) -> None:
+    """
+    Limit the number of validator processes that may run at the same time.
+
+    The limit applies across all threads in this Python process, e.g. when converting
+    many forms at once, so that the host isn't overloaded by validators.
+
+    :param limit: The maximum number of validator processes, or None for no limit.
+    """
+    global _validator_slots  # noqa: PLW0603
+
+    if limit is None:
+        _validator_slots = None
+    elif limit < 1:
+        raise PyXFormError("The validator concurrency limit must be at least 1.")
+    else:
+        _validator_slots = threading.BoundedSemaphore(limit)
+
+
+def _run_limited(func: Callable[..., list[str]], **kwargs) -> list[str]:
+    """Run the validator function, waiting first for a slot if there is a limit."""
+    slots = _validator_slots
+    if slots is None:
+        return func(**kwargs)
+    with slots:
+        return func(**kwargs)
+
+
+def _run_cached(
+    validator: _Validator,
+    cache: ValidationCache | None,
+    cache_data: bytes | None,
+    path_to_xform=None,
+    xform_data: bytes | None = None,
+) -> list[str]:
+    """
+    Get the validator result from the cache, or run the validator and cache it.
+
+    Only completed runs are cached: the XForm is valid, or the validator reported why it
+    is invalid. Process failures such as a crash, timeout, or missing Java are not.
+    """
+    key = None
+    if cache is not None:
+        version = get_validator_version(bin_file_path=validator.bin_file_path)
+        if version is not None:
+            key = cache.make_key(
+                validator_name=validator.name,
+                validator_version=version,
+                xform_data=cache_data,
+            )
+            entry = cache.get(key=key)
+            if entry is not None:
+                if entry.error is not None:
+                    raise validator.error_type(entry.error)
+                return list(entry.warnings)
+
+    try:
+        warnings = _run_limited(
+            validator.check, path_to_xform=path_to_xform, xform_data=xform_data
+        )
+    except validator.error_type as e:
+        if key is not None and is_cacheable_error(error=e):
+            cache.put(key=key, entry=CacheEntry(warnings=[], error=str(e)))
+        raise
+    if key is not None and not any(w in UNCACHEABLE_WARNINGS for w in warnings):
+        cache.put(key=key, entry=CacheEntry(warnings=warnings, error=None))
+    return warnings
+
+
+def check_xform(
+    path_to_xform=None,
+    xform_data: bytes | None = None,
+    odk: bool = True,
+    enketo: bool = False,
+    use_cache: bool = True,
+) -> list[str]:
+    """
+    Check the XForm with ODK Validate and/or Enketo Validate.
+
+    If both validators are requested, they are run at the same time. The warnings are
+    returned in a consistent order (ODK Validate first), and if both validators raise
+    an error, the ODK Validate error is raised.
+
+    :param path_to_xform: Path to the XForm to be validated.
+    :param xform_data: If provided, the XForm to pipe to the validators via stdin,
+      instead of reading it from `path_to_xform`.
+    :param odk: If True, check the XForm with ODK Validate.
+    :param enketo: If True, check the XForm with Enketo Validate.
+    :param use_cache: If False, bypass the results cache (if any, see `set_cache`).
+    :return: The warnings from the validators.
+    """
+    validators = []
+    if odk:
+        validators.append(
+            _Validator(
+                name="odk_validate",
+                check=odk_validate.check_xform,
+                bin_file_path=odk_validate.ODK_VALIDATE_PATH,
+                error_type=odk_validate.ODKValidateError,
+            )
+        )
+    if enketo:
+        validators.append(
+            _Validator(
+                name="enketo_validate",
+                check=enketo_validate.check_xform,
+                bin_file_path=enketo_validate.ENKETO_VALIDATE_PATH,
+                error_type=enketo_validate.EnketoValidateError,
+            )
+        )
+
+    cache = _cache if use_cache else None
+    cache_data = xform_data
+    if cache is not None and cache_data is None and validators:
+        # The cache key is based on the XForm content.
+        with open(path_to_xform, mode="rb") as f:
+            cache_data = f.read()
+    kwargs = {
+        "cache": cache,
+        "cache_data": cache_data,
+        "path_to_xform": path_to_xform,
+        "xform_data": xform_data,
+    }
+    warnings = []
+    if len(validators) == 1:
+        warnings.extend(_run_cached(validators[0], **kwargs))
+    elif validators:
+        with ThreadPoolExecutor(max_workers=len(validators)) as executor:
+            futures = [executor.submit(_run_cached, v, **kwargs) for v in validators]
+            for future in futures:
+                warnings.extend(future.result())
+    return warnings
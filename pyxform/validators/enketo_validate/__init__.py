@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 
 from pyxform.validators.error_cleaner import ErrorCleaner
 from pyxform.validators.util import (
+    STDIN_PATH,
     XFORM_SPEC_PATH,
     check_readable,
     decode_stream,
@@ -24,6 +25,11 @@ ENKETO_VALIDATE_PATH = os.path.join(CURRENT_DIRECTORY, "bin", "validate")
 class EnketoValidateError(Exception):
     """Common base class for Enketo validate exceptions."""
 
+    def __init__(self, *args, return_code: int | None = None):
+        super().__init__(*args)
+        # The validator process exit code, if the error is from a validator run.
+        self.return_code: int | None = return_code
+
 
 def install_exists():
     """
@@ -32,8 +38,12 @@ def install_exists():
     return os.path.exists(ENKETO_VALIDATE_PATH)
 
 
-def _call_validator(path_to_xform, bin_file_path=ENKETO_VALIDATE_PATH) -> "PopenResult":
-    return run_popen_with_timeout([bin_file_path, path_to_xform], 100)
+def _call_validator(
+    path_to_xform, bin_file_path=ENKETO_VALIDATE_PATH, xform_data: bytes | None = None
+) -> "PopenResult":
+    return run_popen_with_timeout(
+        [bin_file_path, path_to_xform], 100, input_data=xform_data
+    )
 
 
 def install_ok(bin_file_path=ENKETO_VALIDATE_PATH):
@@ -50,7 +60,7 @@ def install_ok(bin_file_path=ENKETO_VALIDATE_PATH):
         return True
 
 
-def check_xform(path_to_xform):
+def check_xform(path_to_xform=None, xform_data: bytes | None = None):
     """
     Check the form with the Enketo validator.
 
@@ -58,6 +68,8 @@ def check_xform(path_to_xform):
     - return code 0: append warning with the stdout content (possibly none).
 
     :param path_to_xform: Path to the XForm to be validated.
+    :param xform_data: If provided, the XForm to pipe to the validator via stdin,
+      instead of reading it from `path_to_xform`.
     :return: warnings or List[str]
     """
     if not install_exists():
@@ -66,7 +78,11 @@ def check_xform(path_to_xform):
             "Please use the updater tool to install the latest version."
         )
 
-    returncode, timeout, stdout, stderr = _call_validator(path_to_xform=path_to_xform)
+    if xform_data is not None:
+        path_to_xform = STDIN_PATH
+    returncode, timeout, stdout, stderr = _call_validator(
+        path_to_xform=path_to_xform, xform_data=xform_data
+    )
     warnings = []
     stderr = decode_stream(stderr)
     stdout = decode_stream(stdout)
@@ -75,7 +91,8 @@ def check_xform(path_to_xform):
         return ["XForm took to long to completely validate."]
     elif returncode > 0:  # Error invalid
         raise EnketoValidateError(
-            "Enketo Validate Errors:\n" + ErrorCleaner.enketo_validate(stderr)
+            "Enketo Validate Errors:\n" + ErrorCleaner.enketo_validate(stderr),
+            return_code=returncode,
         )
     elif returncode == 0:
         if stdout:
@@ -3,6 +3,7 @@ odk_validate.py
 A python wrapper around ODK Validate
 """
 
+import atexit
 import logging
 import os
 import shutil
@@ -11,9 +12,12 @@ from typing import TYPE_CHECKING
 
 from pyxform.validators.error_cleaner import ErrorCleaner
 from pyxform.validators.util import (
+    STDIN_PATH,
     XFORM_SPEC_PATH,
+    WarmProcessPool,
     check_readable,
     run_popen_with_timeout,
+    stdin_path_supported,
 )
 
 if TYPE_CHECKING:
@@ -22,23 +26,82 @@ if TYPE_CHECKING:
 
 CURRENT_DIRECTORY = os.path.dirname(os.path.realpath(__file__))
 ODK_VALIDATE_PATH = os.path.join(CURRENT_DIRECTORY, "bin", "ODK_Validate.jar")
+ODK_VALIDATE_TIMEOUT = 100
+
+_worker_pool: WarmProcessPool | None = None
 
 
 class ODKValidateError(Exception):
     """ODK Validation exception error."""
 
+    def __init__(self, *args, return_code: int | None = None):
+        super().__init__(*args)
+        # The validator process exit code, if the error is from a validator run.
+        self.return_code: int | None = return_code
+
 
 def install_exists():
     """Returns True if ODK_VALIDATE_PATH exists."""
     return os.path.exists(ODK_VALIDATE_PATH)
 
 
-def _call_validator(path_to_xform, bin_file_path=ODK_VALIDATE_PATH) -> "PopenResult":
+def _get_command(path_to_xform, bin_file_path=ODK_VALIDATE_PATH) -> list[str]:
+    return ["java", "-Djava.awt.headless=true", "-jar", bin_file_path, path_to_xform]
+
+
+def _call_validator(
+    path_to_xform, bin_file_path=ODK_VALIDATE_PATH, xform_data: bytes | None = None
+) -> "PopenResult":
     return run_popen_with_timeout(
-        ["java", "-Djava.awt.headless=true", "-jar", bin_file_path, path_to_xform], 100
+        _get_command(path_to_xform=path_to_xform, bin_file_path=bin_file_path),
+        ODK_VALIDATE_TIMEOUT,
+        input_data=xform_data,
     )
 
 
+def start_worker_pool(
+    size: int = 2, timeout: float = ODK_VALIDATE_TIMEOUT, bin_file_path=ODK_VALIDATE_PATH
+) -> WarmProcessPool:
+    """
+    Start a pool of ODK Validate processes, which `check_xform` will then use.
+
+    Each process starts its JVM and waits to read an XForm from stdin, so that the JVM
+    start up time is not spent while the caller waits for a validation result. Call
+    `stop_worker_pool` when finished. Starting a new pool stops any existing pool.
+
+    :param size: The number of ODK Validate processes to keep waiting for XForms.
+    :param timeout: The number of seconds to wait for a validation result.
+    :param bin_file_path: The path to the ODK Validate jar file.
+    """
+    global _worker_pool  # noqa: PLW0603
+
+    check_java_available()
+    if not stdin_path_supported():
+        raise OSError(
+            "The ODK Validate worker pool is not supported on this OS, because it "
+            "requires passing the XForm to ODK Validate via stdin."
+        )
+    stop_worker_pool()
+    _worker_pool = WarmProcessPool(
+        command=_get_command(path_to_xform=STDIN_PATH, bin_file_path=bin_file_path),
+        size=size,
+        timeout=timeout,
+    )
+    return _worker_pool
+
+
+def stop_worker_pool() -> None:
+    """Stop the ODK Validate worker pool, if any."""
+    global _worker_pool  # noqa: PLW0603
+
+    if _worker_pool is not None:
+        _worker_pool.close()
+        _worker_pool = None
+
+
+atexit.register(stop_worker_pool)
+
+
 def install_ok(bin_file_path=ODK_VALIDATE_PATH):
     """
     Check if ODK Validate functions as expected.
@@ -69,12 +132,18 @@ def check_java_available():
     raise OSError(msg)
 
 
-def check_xform(path_to_xform):
+def check_xform(path_to_xform=None, xform_data: bytes | None = None):
     """Run ODK Validate against the XForm in `path_to_xform`.
 
     Returns an array of warnings if the form is valid.
     Throws an exception if it is not
     Does not do a LBYL check for compatible java version as per pyxform/#481
+
+    If `xform_data` is provided, it is piped to ODK Validate via stdin instead of being
+    read from a file. See `pyxform.validators.util.stdin_path_supported`.
+
+    If a worker pool was started with `start_worker_pool`, the XForm is passed to one of
+    the waiting ODK Validate processes.
     """
     # check for available java version
     check_java_available()
@@ -85,14 +154,24 @@ def check_xform(path_to_xform):
     # appear and can be ignored.
     # stderr is treated as a warning if the form is valid or an error
     # if it is invalid.
-    result = _call_validator(path_to_xform=path_to_xform)
+    pool = _worker_pool
+    if pool is not None:
+        if xform_data is None:
+            with open(path_to_xform, mode="rb") as f:
+                xform_data = f.read()
+        result = pool.run(input_data=xform_data)
+    else:
+        if xform_data is not None:
+            path_to_xform = STDIN_PATH
+        result = _call_validator(path_to_xform=path_to_xform, xform_data=xform_data)
     warnings = []
 
     if result.timeout:
         return ["XForm took to long to completely validate."]
     elif result.return_code > 0:  # Error invalid
         raise ODKValidateError(
-            "ODK Validate Errors:\n" + ErrorCleaner.odk_validate(result.stderr)
+            "ODK Validate Errors:\n" + ErrorCleaner.odk_validate(result.stderr),
+            return_code=result.return_code,
         )
     elif result.return_code == 0:
         if result.stderr:
@@ -1,22 +1,28 @@
 from pyxform import constants as co
-from pyxform.errors import ErrorCode, PyXFormError
+from pyxform.errors import ErrorCode, PyXFormError, PyXFormWarning
 
 
 def validate_headers(
-    headers: tuple[tuple[str, ...], ...], warnings: list[str]
+    headers: tuple[tuple[str, ...], ...], warnings: list[PyXFormWarning | str]
 ) -> tuple[str, ...]:
     def check():
         for header in headers:
             header = header[0]
             if header != co.LIST_NAME_S and (" " in header or header == ""):
-                warnings.append(ErrorCode.HEADER_004.value.format(column=header))
+                warnings.append(
+                    PyXFormWarning(
+                        code=ErrorCode.HEADER_004, sheet=co.CHOICES, column=header
+                    )
+                )
                 yield header
 
     return tuple(check())
 
 
 def validate_choice_list(
-    options: list[dict], warnings: list[str], allow_duplicates: bool = False
+    options: list[dict],
+    warnings: list[PyXFormWarning | str],
+    allow_duplicates: bool = False,
 ) -> None:
     seen_options = set()
     duplicate_errors = []
@@ -24,7 +30,14 @@ def validate_choice_list(
         if co.NAME not in option:
             raise PyXFormError(ErrorCode.NAMES_006.value.format(row=option["__row"]))
         elif co.LABEL not in option:
-            warnings.append(ErrorCode.LABEL_001.value.format(row=option["__row"]))
+            warnings.append(
+                PyXFormWarning(
+                    code=ErrorCode.LABEL_001,
+                    row=option["__row"],
+                    sheet=co.CHOICES,
+                    column=co.LABEL,
+                )
+            )
 
         if not allow_duplicates:
             name = option[co.NAME]
@@ -41,7 +54,7 @@ def validate_choice_list(
 
 def validate_and_clean_choices(
     choices: dict[str, list[dict]],
-    warnings: list[str],
+    warnings: list[PyXFormWarning | str],
     headers: tuple[tuple[str, ...], ...],
     allow_duplicates: bool = False,
 ) -> dict[str, list[dict]]:
@@ -13,7 +13,7 @@ c) how likely is it that a large variety of unique strings are present in a XLSF
 from collections import Counter
 from collections.abc import Generator, Sequence
 from functools import lru_cache
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from pyxform import aliases
 from pyxform import constants as co
@@ -164,12 +164,95 @@ def parse_pyxform_references(
     return tuple(_parse(value=value, match_limit=match_limit, match_full=match_full))
 
 
+class ReferenceCollector:
+    """
+    Collect the pyxform references in a sheet's cells, to validate them later.
+
+    References can only be checked once all the survey element names are known, so the
+    cells are visited while the sheet is read for other processing (see
+    `sheet_headers.SheetVisitor`), rather than walking the sheet data again afterwards.
+    Any parsing error is kept until then too, so that errors are raised in the same
+    order as if the sheet was checked all at once.
+    """
+
+    __slots__ = ("cells", "sheet_name")
+
+    def __init__(self, sheet_name: str):
+        """
+        :param sheet_name: The XLSForm sheet the cells are from.
+        """
+        self.sheet_name: str = sheet_name
+        # (row_number, column, references or parsing error), for the cells with either.
+        self.cells: list[tuple[int, str, tuple[ParsedReference, ...] | Exception]] = []
+
+    def visit(self, row_number: int, column: str, value: Any) -> None:
+        """Parse the cell's pyxform references, if any."""
+        if isinstance(value, str) and not is_pyxform_reference_candidate(value):
+            return
+        try:
+            refs = parse_pyxform_references(value=value)
+        except Exception as e:
+            # Raised by validate, unless the column is not checked.
+            self.cells.append((row_number, column, e))
+        else:
+            if refs:
+                self.cells.append((row_number, column, refs))
+
+    def validate(
+        self,
+        element_names: Counter,
+        limit_to_columns: set[str] | None = None,
+        ignore_columns: set[str] | None = None,
+    ) -> None:
+        """
+        Raise an error if any collected references are malformed or invalid.
+
+        :param element_names: The names in the 'survey' sheet 'name' column.
+        :param limit_to_columns: Only check values in these columns.
+        :param ignore_columns: Do not check values in these columns.
+        """
+        for row_number, column, refs in self.cells:
+            if limit_to_columns and column not in limit_to_columns:
+                continue
+            if ignore_columns and column in ignore_columns:
+                continue
+            if isinstance(refs, Exception):
+                if isinstance(refs, PyXFormError):
+                    refs.context.update(
+                        sheet=self.sheet_name, column=column, row=row_number
+                    )
+                raise refs
+            for ref in refs:
+                element_count = element_names.get(ref.name, None)
+                if element_count is None:
+                    raise PyXFormError(
+                        code=ErrorCode.PYREF_003,
+                        context={
+                            "row": row_number,
+                            "sheet": self.sheet_name,
+                            "column": column,
+                            "q": ref.name,
+                        },
+                    )
+                elif 1 != element_count:
+                    raise PyXFormError(
+                        code=ErrorCode.PYREF_004,
+                        context={
+                            "row": row_number,
+                            "sheet": self.sheet_name,
+                            "column": column,
+                            "q": ref.name,
+                        },
+                    )
+
+
 def validate_pyxform_reference_syntax(
     sheet_name: str,
     sheet_data: Sequence[dict[str, str]],
     element_names: Counter,
     limit_to_columns: set[str] | None = None,
     ignore_columns: set[str] | None = None,
+    references: ReferenceCollector | None = None,
 ) -> None:
     """
     Parse all pyxform references, and raise an error if any are malformed or invalid.
@@ -179,44 +262,22 @@ def validate_pyxform_reference_syntax(
     :param ignore_columns: Do not parse values in these columns.
     :param sheet_data: The XLSForm sheet data.
     :param element_names: The names in the 'survey' sheet 'name' column.
+    :param references: The references already collected from the sheet data, if any.
+      Otherwise, the sheet data is read to find them.
     """
     if not sheet_data:
         return
 
-    for row_number, row in enumerate(sheet_data, start=2):
-        for column, value in row.items():
-            if limit_to_columns and column not in limit_to_columns:
-                continue
-            if ignore_columns and column in ignore_columns:
-                continue
-            try:
-                refs = parse_pyxform_references(value=value)
-            except PyXFormError as e:
-                e.context.update(sheet=sheet_name, column=column, row=row_number)
-                raise
-            if refs:
-                for ref in refs:
-                    element_count = element_names.get(ref.name, None)
-                    if element_count is None:
-                        raise PyXFormError(
-                            code=ErrorCode.PYREF_003,
-                            context={
-                                "row": row_number,
-                                "sheet": sheet_name,
-                                "column": column,
-                                "q": ref.name,
-                            },
-                        )
-                    elif 1 != element_count:
-                        raise PyXFormError(
-                            code=ErrorCode.PYREF_004,
-                            context={
-                                "row": row_number,
-                                "sheet": sheet_name,
-                                "column": column,
-                                "q": ref.name,
-                            },
-                        )
+    if references is None:
+        references = ReferenceCollector(sheet_name=sheet_name)
+        for row_number, row in enumerate(sheet_data, start=2):
+            for column, value in row.items():
+                references.visit(row_number=row_number, column=column, value=value)
+    references.validate(
+        element_names=element_names,
+        limit_to_columns=limit_to_columns,
+        ignore_columns=ignore_columns,
+    )
 
 
 def validate_pyxform_references_in_workbook(
@@ -224,6 +285,7 @@ def validate_pyxform_references_in_workbook(
     survey_headers: tuple[tuple[str, ...], ...],
     choices_headers: tuple[tuple[str, ...], ...],
     element_names: Counter,
+    references: dict[str, ReferenceCollector] | None = None,
 ) -> None:
     """
     Parse pyxform references, and raise an error if any are malformed or invalid.
@@ -247,12 +309,17 @@ def validate_pyxform_references_in_workbook(
     :param survey_headers: The parsed column headers for the survey sheet.
     :param choices_headers: The parsed column headers for the choices sheet.
     :param element_names: The names in the 'survey' sheet 'name' column.
+    :param references: The references already collected from each sheet's data, by
+      sheet name, if any. Otherwise, the sheet data is read to find them.
     """
+    if references is None:
+        references = {}
     # In order of likely smallest to largest.
     validate_pyxform_reference_syntax(
         sheet_name=co.SETTINGS,
         sheet_data=workbook_dict.settings,
         element_names=element_names,
+        references=references.get(co.SETTINGS),
     )
     # Avoids circular import.
     from pyxform.entities.entities_parsing import EC
@@ -262,6 +329,7 @@ def validate_pyxform_references_in_workbook(
         sheet_data=workbook_dict.entities,
         element_names=element_names,
         ignore_columns={co.LIST_NAME_S, co.LIST_NAME_U, EC.REPEAT},
+        references=references.get(co.ENTITIES),
     )
 
     # type is validated against the question_type_dict.
@@ -287,6 +355,7 @@ def validate_pyxform_references_in_workbook(
         sheet_data=workbook_dict.survey,
         element_names=element_names,
         ignore_columns=survey_ignore_columns,
+        references=references.get(co.SURVEY),
     )
 
     if workbook_dict.choices_header:
@@ -308,4 +377,5 @@ def validate_pyxform_references_in_workbook(
         sheet_data=workbook_dict.choices,
         element_names=element_names,
         limit_to_columns=choices_limit_to_columns,
+        references=references.get(co.CHOICES),
     )
@@ -1,10 +1,27 @@
 from collections.abc import Iterable
 
 from pyxform import constants
-from pyxform.errors import ErrorCode
+from pyxform.errors import ErrorCode, PyXFormWarning
 from pyxform.utils import levenshtein_distance
 
 
+def _find_candidates(key: str, keys: Iterable | None) -> str | None:
+    """Get the quoted names of sheets that look like misspellings of the key, if any."""
+    if not keys:
+        return None
+    candidates = tuple(
+        _k  # thanks to black
+        for _k in keys
+        if 2 >= levenshtein_distance(_k.lower(), key)
+        and _k not in constants.SUPPORTED_SHEET_NAMES
+        and not _k.startswith("_")
+    )
+    if 0 < len(candidates):
+        return ", ".join(f"'{c}'" for c in candidates)
+    else:
+        return None
+
+
 def find_sheet_misspellings(key: str, keys: Iterable) -> "str | None":
     """
     Find possible sheet name misspellings to warn the user about.
@@ -16,18 +33,22 @@ def find_sheet_misspellings(key: str, keys: Iterable) -> "str | None":
     :param key: The sheet name to look for.
     :param keys: The workbook sheet names.
     """
-    if not keys:
+    candidates = _find_candidates(key=key, keys=keys)
+    if candidates is None:
         return None
-    candidates = tuple(
-        _k  # thanks to black
-        for _k in keys
-        if 2 >= levenshtein_distance(_k.lower(), key)
-        and _k not in constants.SUPPORTED_SHEET_NAMES
-        and not _k.startswith("_")
-    )
-    if 0 < len(candidates):
-        return ErrorCode.NAMES_013.value.format(
-            sheet=key, candidates=str(", ".join(f"'{c}'" for c in candidates))
-        )
-    else:
+    return ErrorCode.NAMES_013.value.format(sheet=key, candidates=candidates)
+
+
+def find_sheet_misspellings_warning(key: str, keys: Iterable) -> PyXFormWarning | None:
+    """
+    Find possible misspellings of an optional sheet's name, as a warning.
+
+    The warning includes how to suppress it. Parameters are as for
+    `find_sheet_misspellings`.
+    """
+    candidates = _find_candidates(key=key, keys=keys)
+    if candidates is None:
         return None
+    return PyXFormWarning(
+        code=ErrorCode.NAMES_016, sheet=key, context={"candidates": candidates}
+    )
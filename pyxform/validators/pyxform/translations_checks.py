@@ -3,20 +3,16 @@ from typing import TYPE_CHECKING
 
 from pyxform import aliases
 from pyxform import constants as const
-from pyxform.errors import PyXFormError
+from pyxform.errors import ErrorCode, PyXFormError, PyXFormWarning
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
     SheetData = tuple[tuple[str, ...], ...]
-    Warnings = list[str]
+    Warnings = list[PyXFormWarning | str]
 
 
-OR_OTHER_WARNING = (
-    "This form uses or_other and translations, which is not recommended. "
-    "An untranslated input question label and choice label is generated "
-    "for 'other'. Learn more: https://xlsform.org/en/#specify-other)."
-)
+OR_OTHER_WARNING = ErrorCode.TRANSLATIONS_002.value.msg
 
 
 def format_missing_translations_msg(
@@ -60,6 +56,21 @@ def format_missing_translations_msg(
     return "\n".join(messages)
 
 
+class MissingTranslations:
+    """The missing translations data, which is only formatted as a message when read."""
+
+    __slots__ = ("missing",)
+
+    def __init__(self, missing: "dict[str, dict[str, Sequence]]"):
+        """
+        :param missing: As for the `format_missing_translations_msg` parameter `_in`.
+        """
+        self.missing: dict[str, dict[str, Sequence]] = missing
+
+    def __str__(self):
+        return format_missing_translations_msg(_in=self.missing) or ""
+
+
 class Translations:
     """
     Sheet-level container for translations info.
@@ -149,11 +160,14 @@ class SheetTranslations:
     def missing_check(self, warnings: "Warnings") -> "Warnings":
         """Add a warning if survey or choices have missing translations."""
         if 0 < len(self.survey.missing) or 0 < len(self.choices.missing):
-            msg = format_missing_translations_msg(
-                _in={"survey": self.survey.missing, "choices": self.choices.missing}
+            missing = MissingTranslations(
+                {const.SURVEY: self.survey.missing, const.CHOICES: self.choices.missing}
+            )
+            warnings.append(
+                PyXFormWarning(
+                    code=ErrorCode.TRANSLATIONS_001, context={"missing": missing}
+                )
             )
-            if msg is not None:
-                warnings.append(msg)
         return warnings
 
     def or_other_check(self, warnings: "Warnings") -> "Warnings":
@@ -161,5 +175,5 @@ class SheetTranslations:
         if self.or_other_seen and (
             not self.survey.seen_default_only() or not self.choices.seen_default_only()
         ):
-            warnings.append(OR_OTHER_WARNING)
+            warnings.append(PyXFormWarning(code=ErrorCode.TRANSLATIONS_002))
         return warnings
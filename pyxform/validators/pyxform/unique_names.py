@@ -1,12 +1,12 @@
 from pyxform import constants as const
-from pyxform.errors import ErrorCode, PyXFormError
+from pyxform.errors import ErrorCode, PyXFormError, PyXFormWarning
 
 
 def validate_question_group_repeat_name(
     name: str | None,
     seen_names: set[str],
     seen_names_lower: set[str],
-    warnings: list[str],
+    warnings: list[PyXFormWarning | str],
     row_number: int | None = None,
     check_reserved: bool = True,
 ):
@@ -42,7 +42,15 @@ def validate_question_group_repeat_name(
     question_name_lower = name.lower()
     if question_name_lower in seen_names_lower:
         # No case-insensitive warning for 'meta' since it's not an exported data table.
-        warnings.append(ErrorCode.NAMES_002.value.format(row=row_number, value=name))
+        warnings.append(
+            PyXFormWarning(
+                code=ErrorCode.NAMES_002,
+                row=row_number,
+                sheet=const.SURVEY,
+                column=const.NAME,
+                context={"value": name},
+            )
+        )
     seen_names_lower.add(question_name_lower)
 
 
@@ -9,6 +9,7 @@ import subprocess
 import tempfile
 import threading
 import time
+from collections import deque
 from contextlib import closing
 from subprocess import PIPE, Popen
 from typing import NamedTuple
@@ -19,6 +20,8 @@ from pyxform.errors import PyXFormError
 
 HERE = os.path.abspath(os.path.dirname(__file__))
 XFORM_SPEC_PATH = os.path.join(HERE, "xlsform_spec_test.xml")
+# Path that a validator can read from to receive the XForm written to its stdin.
+STDIN_PATH = "/dev/stdin"
 
 
 class PopenResult:
@@ -33,21 +36,8 @@ class PopenResult:
         self.stderr: str = decode_stream(stream=stderr)
 
 
-# Adapted from:
-# http://betabug.ch/blogs/ch-athens/1093
-def run_popen_with_timeout(command, timeout) -> "PopenResult":
-    """
-    Run a sub-program in subprocess.Popen, pass it the input_data,
-    kill it if the specified timeout has passed.
-    returns a tuple of resultcode, timeout, stdout, stderr
-    """
-    kill_check = threading.Event()
-
-    def _kill_process_after_a_timeout(pid):
-        os.kill(pid, signal.SIGTERM)
-        kill_check.set()  # tell the main routine that we had to kill
-        # use SIGKILL if hard to kill...
-
+def _popen(command) -> Popen:
+    """Start the command in a subprocess with pipes for stdin, stdout, and stderr."""
     startup_info = None
     env = None
     if os.name == "nt":
@@ -69,12 +59,30 @@ def run_popen_with_timeout(command, timeout) -> "PopenResult":
             for k, v in {k: os.environ.get(k) for k in ("TEMP", "TMP", "TMPDIR")}.items()
         }
 
-    p = Popen(
+    return Popen(
         command, env=env, stdin=PIPE, stdout=PIPE, stderr=PIPE, startupinfo=startup_info
     )
+
+
+def _communicate_with_timeout(
+    p: Popen, timeout, input_data: bytes | None = None
+) -> "PopenResult":
+    """
+    Pass the input_data to the process, kill it if the specified timeout has passed.
+    """
+    kill_check = threading.Event()
+
+    def _kill_process_after_a_timeout(pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return  # Already exited.
+        kill_check.set()  # tell the main routine that we had to kill
+        # use SIGKILL if hard to kill...
+
     watchdog = threading.Timer(timeout, _kill_process_after_a_timeout, args=(p.pid,))
     watchdog.start()
-    (stdout, stderr) = p.communicate()
+    (stdout, stderr) = p.communicate(input=input_data)
     watchdog.cancel()  # if it's still waiting to run
     timeout = kill_check.is_set()
     kill_check.clear()
@@ -83,6 +91,110 @@ def run_popen_with_timeout(command, timeout) -> "PopenResult":
     )
 
 
+# Adapted from:
+# http://betabug.ch/blogs/ch-athens/1093
+def run_popen_with_timeout(
+    command, timeout, input_data: bytes | None = None
+) -> "PopenResult":
+    """
+    Run a sub-program in subprocess.Popen, pass it the input_data,
+    kill it if the specified timeout has passed.
+    returns a tuple of resultcode, timeout, stdout, stderr
+    """
+    return _communicate_with_timeout(
+        p=_popen(command), timeout=timeout, input_data=input_data
+    )
+
+
+class WarmProcessPool:
+    """
+    A pool of pre-started processes, which each wait to read one input from stdin.
+
+    For validators like ODK Validate, starting the process (e.g. the JVM) and loading
+    classes usually takes longer than the validation itself. This pool keeps `size`
+    processes started ahead of time, each blocked on reading its stdin. A request is
+    passed to a waiting process, and that process is then replaced in the background.
+    Since each process handles only one request, a process that crashes or times out
+    does not affect any other requests. Processes that exit while waiting (e.g. they
+    crashed on start up) are restarted when next requested.
+
+    The command must read its input from stdin, e.g. via STDIN_PATH. Usage:
+
+    with WarmProcessPool(command=["java", "-jar", "x.jar", STDIN_PATH]) as pool:
+        result = pool.run(input_data=b"<h:html>...")
+    """
+
+    def __init__(self, command: list[str], size: int = 2, timeout: float = 100):
+        """
+        :param command: The command to run, which reads the input data from stdin.
+        :param size: The number of processes to keep waiting for requests.
+        :param timeout: The default number of seconds to wait for a request result.
+        """
+        if size < 1:
+            raise PyXFormError("The process pool size must be at least 1.")
+        self.command: list[str] = command
+        self.size: int = size
+        self.timeout: float = timeout
+        self._lock: threading.Lock = threading.Lock()
+        self._processes: deque[Popen] = deque()
+        self._closed: bool = False
+        with self._lock:
+            for _ in range(size):
+                self._processes.append(_popen(command))
+
+    def __enter__(self) -> "WarmProcessPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _acquire(self) -> Popen:
+        """Take a waiting process, and start another to replace it."""
+        with self._lock:
+            if self._closed:
+                raise PyXFormError("The process pool is closed.")
+            p = self._processes.popleft()
+            if p.poll() is not None:
+                # Exited before it was used, so clean up and try a new one.
+                p.communicate()
+                p = _popen(self.command)
+            self._processes.append(_popen(self.command))
+        return p
+
+    def run(self, input_data: bytes, timeout: float | None = None) -> "PopenResult":
+        """
+        Pass the input data to a waiting process and get the result.
+
+        :param input_data: The data to write to the process stdin.
+        :param timeout: The number of seconds to wait for the result before killing the
+          process. If not provided, uses the pool default.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        return _communicate_with_timeout(
+            p=self._acquire(), timeout=timeout, input_data=input_data
+        )
+
+    def close(self) -> None:
+        """Stop all the waiting processes."""
+        with self._lock:
+            self._closed = True
+            while self._processes:
+                p = self._processes.popleft()
+                if p.poll() is None:
+                    p.kill()
+                p.communicate()
+
+
+def stdin_path_supported() -> bool:
+    """
+    Check if validators can read the XForm from stdin via STDIN_PATH.
+
+    This is the case on POSIX-like systems, but not on Windows.
+    """
+    return os.name != "nt" and os.path.exists(STDIN_PATH)
+
+
 def decode_stream(stream):
     """
     Decode a stream, e.g. stdout or stderr.
@@ -6,14 +6,12 @@ import os
 import re
 import sys
 from collections import Counter
-from typing import IO, Any
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, NamedTuple, Self
 
 from pyxform import aliases, constants
-from pyxform.constants import (
-    _MSG_SUPPRESS_SPELLING,
-    EXTERNAL_INSTANCE_EXTENSIONS,
-    ROW_FORMAT_STRING,
-)
+from pyxform.constants import EXTERNAL_INSTANCE_EXTENSIONS, ROW_FORMAT_STRING
 from pyxform.elements import action as action_module
 from pyxform.entities.entities_parsing import (
     ContainerPath,
@@ -22,10 +20,14 @@ from pyxform.entities.entities_parsing import (
     get_entity_references_by_question,
     get_entity_variable_references,
 )
-from pyxform.errors import ErrorCode, PyXFormError
+from pyxform.errors import ErrorCode, PyXFormError, PyXFormWarning
 from pyxform.parsing.expression import is_xml_tag
 from pyxform.parsing.parameters import parse as parameters_parse
-from pyxform.parsing.sheet_headers import dealias_and_group_headers
+from pyxform.parsing.sheet_headers import (
+    SheetVisitor,
+    dealias_and_group_headers,
+    iter_dealias_and_group_headers,
+)
 from pyxform.question_type_dictionary import get_meta_group
 from pyxform.utils import (
     coalesce,
@@ -39,13 +41,17 @@ from pyxform.validators.pyxform import settings as validate_settings
 from pyxform.validators.pyxform.android_package_name import validate_android_package_name
 from pyxform.validators.pyxform.choices import validate_and_clean_choices
 from pyxform.validators.pyxform.pyxform_reference import (
+    ReferenceCollector,
     has_pyxform_reference,
     is_pyxform_reference,
     validate_pyxform_references_in_workbook,
 )
 from pyxform.validators.pyxform.question_types import geo as qt_geo
 from pyxform.validators.pyxform.question_types import range as qt_range
-from pyxform.validators.pyxform.sheet_misspellings import find_sheet_misspellings
+from pyxform.validators.pyxform.sheet_misspellings import (
+    find_sheet_misspellings,
+    find_sheet_misspellings_warning,
+)
 from pyxform.validators.pyxform.translations_checks import SheetTranslations
 from pyxform.xls2json_backends import DefinitionData, get_xlsform
 
@@ -68,6 +74,88 @@ RE_OSM = re.compile(
 )
 
 
+class _Warnings:
+    """
+    Conversion warnings, as PyXFormWarning or str, with an optional limit.
+
+    Warnings past the limit are counted but not kept. The warnings are only formatted as
+    messages by render(), once the conversion is complete. Warnings can only be added
+    with append, extend, or +=, so that the limit always applies.
+    """
+
+    __slots__ = ("_items", "dropped", "limit")
+
+    def __init__(self, limit: int | None = None):
+        self._items: list[PyXFormWarning | str] = []
+        self.limit: int | None = limit
+        self.dropped: int = 0
+
+    def __iter__(self) -> Iterator[PyXFormWarning | str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iadd__(self, items: Iterable[PyXFormWarning | str]) -> Self:
+        self.extend(items)
+        return self
+
+    def append(self, item: PyXFormWarning | str) -> None:
+        if self.limit is None or len(self._items) < self.limit:
+            self._items.append(item)
+        else:
+            self.dropped += 1
+
+    def extend(self, items: Iterable[PyXFormWarning | str]) -> None:
+        for item in items:
+            self.append(item)
+
+    def render(self) -> list[str]:
+        rendered = [str(w) for w in self._items]
+        if self.dropped and self.limit:
+            rendered.append(
+                f"{self.dropped} more warning(s) not shown, "
+                f"as the limit of {self.limit} was reached."
+            )
+        return rendered
+
+
+class RowType(NamedTuple):
+    """
+    The parsed survey sheet row type, e.g. "begin group" or "select_one l1".
+
+    Each part is None if the type isn't of that kind, otherwise the regex match groups.
+    """
+
+    settings_type: str | None
+    begin_control: dict[str, str | None] | None
+    end_control: dict[str, str | None] | None
+    select: dict[str, str | None] | None
+    osm: dict[str, str | None] | None
+
+
+def _groups(match: re.Match | None) -> dict[str, str | None] | None:
+    return None if match is None else match.groupdict()
+
+
+def parse_row_type(question_type: str) -> RowType:
+    """
+    Parse the survey sheet row type.
+
+    Forms usually only use a few distinct types, so the result can be reused for each
+    row with the same type. The parts must not be modified.
+
+    :param question_type: The row type, e.g. "begin group" or "select_one l1".
+    """
+    return RowType(
+        settings_type=aliases.settings_header.get(question_type),
+        begin_control=_groups(RE_BEGIN_CONTROL.search(question_type)),
+        end_control=_groups(RE_END_CONTROL.search(question_type)),
+        select=_groups(RE_SELECT.search(question_type)),
+        osm=_groups(RE_OSM.search(question_type)),
+    )
+
+
 def dealias_types(dict_array):
     """
     Look at all the type values in a dict array and if any aliases are found,
@@ -195,12 +283,152 @@ def add_choices_info_to_question(
         question[constants.CHOICES] = choices[list_name]
 
 
+def _process_external_choices_sheet(
+    workbook_dict: DefinitionData, option_fields: set[str], default_language: str
+) -> set[str]:
+    """
+    Get the list names in the external_choices sheet.
+
+    Only the list names are needed here, so the rows are read one at a time rather than
+    all at once, since the sheet may be large. It's written to CSV later.
+    """
+    rows, header = workbook_dict.iter_sheet(sheet_name=constants.EXTERNAL_CHOICES)
+    return {
+        row[constants.LIST_NAME_S]
+        for row in iter_dealias_and_group_headers(
+            sheet_name=constants.EXTERNAL_CHOICES,
+            sheet_data=rows,
+            sheet_header=header,
+            header_aliases=aliases.list_header,
+            header_columns=option_fields,
+            default_language=default_language,
+        )
+        if constants.LIST_NAME_S in row
+    }
+
+
+def _process_choices_sheet(
+    workbook_dict: DefinitionData,
+    option_fields: set[str],
+    default_language: str,
+    allow_duplicates: bool,
+    warnings: list[PyXFormWarning | str],
+    visitors: Sequence[SheetVisitor] | None = None,
+) -> tuple[Any, dict[str, list[dict]]]:
+    """Get the choices sheet data, and the cleaned choices grouped by list name."""
+    choices_sheet = workbook_dict.choices
+    choices = {}
+    if choices_sheet:
+        choices_sheet = dealias_and_group_headers(
+            sheet_name=constants.CHOICES,
+            sheet_data=choices_sheet,
+            sheet_header=workbook_dict.choices_header,
+            header_aliases=aliases.list_header,
+            header_columns=option_fields,
+            headers_required={constants.NAME},
+            default_language=default_language,
+            add_row_number=True,
+            visitors=visitors,
+        )
+        choices = group_dictionaries_by_key(
+            list_of_dicts=choices_sheet.data, key=constants.LIST_NAME_S
+        )
+        # To combine the warning into one message, the check for missing choices translation
+        # columns is run with Survey sheet below.
+
+        # Warn and remove invalid headers in case the form uses headers for notes.
+        choices = validate_and_clean_choices(
+            choices=choices,
+            warnings=warnings,
+            headers=choices_sheet.headers,
+            allow_duplicates=allow_duplicates,
+        )
+    return choices_sheet, choices
+
+
+def _process_entities_sheet(
+    workbook_dict: DefinitionData,
+    warnings: list[PyXFormWarning | str],
+    visitors: Sequence[SheetVisitor] | None = None,
+) -> tuple[Any, Any]:
+    """Get the entity declarations and the variables they reference."""
+    if workbook_dict.entities:
+        entities_sheet = dealias_and_group_headers(
+            sheet_name=constants.ENTITIES,
+            sheet_data=workbook_dict.entities,
+            sheet_header=workbook_dict.entities_header,
+            header_aliases=aliases.entities_header,
+            header_columns={i.value for i in constants.EntityColumns.value_list()},
+            visitors=visitors,
+        )
+        entity_declarations = get_entity_declarations(entities_sheet=entities_sheet.data)
+        entity_variable_references = get_entity_variable_references(
+            entity_declarations=entity_declarations
+        )
+        return entity_declarations, entity_variable_references
+    else:
+        similar = find_sheet_misspellings_warning(
+            key=constants.ENTITIES, keys=workbook_dict.sheet_names
+        )
+        if similar is not None:
+            warnings.append(similar)
+        return None, None
+
+
+def _process_survey_sheet(
+    workbook_dict: DefinitionData,
+    default_language: str,
+    strip_whitespace: bool,
+    visitors: Sequence[SheetVisitor] | None = None,
+):
+    """Get the survey sheet data, with the headers and types dealiased."""
+    from pyxform.question import MultipleChoiceQuestion
+
+    survey_sheet = dealias_and_group_headers(
+        sheet_name=constants.SURVEY,
+        sheet_data=workbook_dict.survey,
+        sheet_header=workbook_dict.survey_header,
+        header_aliases=aliases.survey_header,
+        header_columns=set(MultipleChoiceQuestion.get_slot_names()),
+        headers_required={constants.TYPE},
+        default_language=default_language,
+        strip_whitespace=strip_whitespace,
+        visitors=visitors,
+    )
+    survey_sheet.data = dealias_types(dict_array=survey_sheet.data)
+    return survey_sheet
+
+
+def _process_osm_sheet(
+    workbook_dict: DefinitionData, option_fields: set[str]
+) -> dict[str, list[dict]] | None:
+    """
+    Get the OSM tags grouped by list name.
+
+    No spell check for OSM sheet (infrequently used, many spurious matches).
+    """
+    if workbook_dict.osm:
+        osm_sheet = dealias_and_group_headers(
+            sheet_data=workbook_dict.osm,
+            sheet_name=constants.OSM,
+            sheet_header=workbook_dict.osm_header,
+            header_aliases=aliases.list_header,
+            header_columns=option_fields,
+        )
+        return group_dictionaries_by_key(
+            list_of_dicts=osm_sheet.data, key=constants.LIST_NAME_S
+        )
+    return None
+
+
 def workbook_to_json(
     workbook_dict: DefinitionData,
     form_name: str | None = None,
     fallback_form_name: str | None = None,
     default_language: str | None = None,
     warnings: list[str] | None = None,
+    parallel_sheets: bool = False,
+    max_warnings: int | None = None,
 ) -> dict[str, Any]:
     """
     workbook_dict -- nested dictionaries representing a spreadsheet.
@@ -216,11 +444,38 @@ def workbook_to_json(
        If the default language is used as a suffix for media/labels/hints,
        then the suffixless version will be overwritten.
     warnings -- an optional list which warnings will be appended to
+    parallel_sheets -- if True, read and clean the choices, entities, survey, etc.
+        sheets in a thread pool, rather than one after another.
+    max_warnings -- if provided, the maximum number of warnings to add to the warnings
+        list, followed by a count of any more that were not added. If 0, no warnings
+        are added.
 
     returns a nested dictionary equivalent to the format specified in the
     json form spec.
     """
     warnings = coalesce(warnings, [])
+    sink = _Warnings(limit=max_warnings)
+    try:
+        return _workbook_to_json(
+            workbook_dict=workbook_dict,
+            form_name=form_name,
+            fallback_form_name=fallback_form_name,
+            default_language=default_language,
+            warnings=sink,
+            parallel_sheets=parallel_sheets,
+        )
+    finally:
+        warnings.extend(sink.render())
+
+
+def _workbook_to_json(
+    workbook_dict: DefinitionData,
+    form_name: str | None,
+    fallback_form_name: str | None,
+    default_language: str | None,
+    warnings: _Warnings,
+    parallel_sheets: bool,
+) -> dict[str, Any]:
     sheet_names = workbook_dict.sheet_names
     if not workbook_dict.survey and not workbook_dict.survey_header:
         msg = f"You must have a sheet named '{constants.SURVEY}'. "
@@ -237,6 +492,18 @@ def workbook_to_json(
     # Break the spreadsheet dict into easier to access objects
     # (settings, choices, survey_sheet):
 
+    # The pyxform references in each sheet, collected as the sheet is processed, and
+    # validated once all the element names are known.
+    references = {
+        name: ReferenceCollector(sheet_name=name)
+        for name in (
+            constants.SETTINGS,
+            constants.ENTITIES,
+            constants.SURVEY,
+            constants.CHOICES,
+        )
+    }
+
     # ########## Settings sheet ##########
     settings = {}
     if workbook_dict.settings:
@@ -255,11 +522,7 @@ def workbook_to_json(
                 settings_sheet_headers[0].pop(constants.ID_STRING, None)
                 settings_sheet[0].pop(constants.ID_STRING, None)
                 warnings.append(
-                    "The form_id and id_string column headers are both"
-                    " specified in the settings sheet provided."
-                    " This may cause errors during conversion."
-                    " In future, its best to avoid specifying both"
-                    " column headers in the settings sheet."
+                    PyXFormWarning(code=ErrorCode.HEADER_006, sheet=constants.SETTINGS)
                 )
         except IndexError:  # In case there is no settings sheet
             pass
@@ -272,13 +535,16 @@ def workbook_to_json(
             sheet_header=settings_sheet_headers,
             header_aliases=aliases.settings_header,
             header_columns=set(Survey.get_slot_names()),
+            visitors=(references[constants.SETTINGS],),
         )
         settings = settings_sheet.data[0]
         validate_settings.validate_name(name=settings.get(constants.NAME, None))
     else:
-        similar = find_sheet_misspellings(key=constants.SETTINGS, keys=sheet_names)
+        similar = find_sheet_misspellings_warning(
+            key=constants.SETTINGS, keys=sheet_names
+        )
         if similar is not None:
-            warnings.append(similar + _MSG_SUPPRESS_SPELLING)
+            warnings.append(similar)
 
     clean_text_values_enabled = aliases.yes_no.get(
         settings.get("clean_text_values", "yes"), True
@@ -320,88 +586,62 @@ def workbook_to_json(
 
     option_fields = set(Option.get_slot_names())
 
-    # ########## External Choices sheet ##########
-    external_choices = workbook_dict.external_choices
-    if external_choices:
-        external_choices = dealias_and_group_headers(
-            sheet_name=constants.EXTERNAL_CHOICES,
-            sheet_data=external_choices,
-            sheet_header=workbook_dict.external_choices_header,
-            header_aliases=aliases.list_header,
-            header_columns=option_fields,
+    # ########## Choices, Entities, Survey, OSM sheets ##########
+    # These sheets don't depend on each other, so they can be read and cleaned in
+    # parallel. Each sheet collects its own warnings, which are combined in sheet order
+    # so that the result doesn't depend on which sheet finishes first.
+    sheet_tasks = {
+        constants.EXTERNAL_CHOICES: lambda w: _process_external_choices_sheet(
+            workbook_dict=workbook_dict,
+            option_fields=option_fields,
             default_language=default_language,
-        )
-        external_choices = group_dictionaries_by_key(
-            list_of_dicts=external_choices.data, key=constants.LIST_NAME_S
-        )
-
-    # ########## Choices sheet ##########
-    choices_sheet = workbook_dict.choices
-    choices = {}
-    if choices_sheet:
-        choices_sheet = dealias_and_group_headers(
-            sheet_name=constants.CHOICES,
-            sheet_data=choices_sheet,
-            sheet_header=workbook_dict.choices_header,
-            header_aliases=aliases.list_header,
-            header_columns=option_fields,
-            headers_required={constants.NAME},
+        ),
+        constants.CHOICES: lambda w: _process_choices_sheet(
+            workbook_dict=workbook_dict,
+            option_fields=option_fields,
             default_language=default_language,
-            add_row_number=True,
-        )
-        choices = group_dictionaries_by_key(
-            list_of_dicts=choices_sheet.data, key=constants.LIST_NAME_S
-        )
-        # To combine the warning into one message, the check for missing choices translation
-        # columns is run with Survey sheet below.
-
-        # Warn and remove invalid headers in case the form uses headers for notes.
-        choices = validate_and_clean_choices(
-            choices=choices,
-            warnings=warnings,
-            headers=choices_sheet.headers,
             allow_duplicates=aliases.yes_no.get(
                 settings.get("allow_choice_duplicates", "no"), False
             ),
-        )
-        if choices:
-            json_dict[constants.CHOICES] = choices
-
-    # ########## Entities sheet ###########
-    entity_declarations = None
-    entity_variable_references = None
-    if workbook_dict.entities:
-        entities_sheet = dealias_and_group_headers(
-            sheet_name=constants.ENTITIES,
-            sheet_data=workbook_dict.entities,
-            sheet_header=workbook_dict.entities_header,
-            header_aliases=aliases.entities_header,
-            header_columns={i.value for i in constants.EntityColumns.value_list()},
-        )
-        entity_declarations = get_entity_declarations(entities_sheet=entities_sheet.data)
-        entity_variable_references = get_entity_variable_references(
-            entity_declarations=entity_declarations
-        )
+            warnings=w,
+            visitors=(references[constants.CHOICES],),
+        ),
+        constants.ENTITIES: lambda w: _process_entities_sheet(
+            workbook_dict=workbook_dict,
+            warnings=w,
+            visitors=(references[constants.ENTITIES],),
+        ),
+        constants.SURVEY: lambda w: _process_survey_sheet(
+            workbook_dict=workbook_dict,
+            default_language=default_language,
+            strip_whitespace=clean_text_values_enabled,
+            visitors=(references[constants.SURVEY],),
+        ),
+        constants.OSM: lambda w: _process_osm_sheet(
+            workbook_dict=workbook_dict, option_fields=option_fields
+        ),
+    }
+    sheet_warnings = {k: [] for k in sheet_tasks}
+    if parallel_sheets:
+        with ThreadPoolExecutor(max_workers=len(sheet_tasks)) as executor:
+            futures = {
+                k: executor.submit(task, sheet_warnings[k])
+                for k, task in sheet_tasks.items()
+            }
+            # Any error is raised for the first sheet in order, as if run one by one.
+            results = {k: f.result() for k, f in futures.items()}
     else:
-        similar = find_sheet_misspellings(key=constants.ENTITIES, keys=sheet_names)
-        if similar is not None:
-            warnings.append(similar + constants._MSG_SUPPRESS_SPELLING)
-
-    # ########## Survey sheet ###########
-    # Process the headers:
-    from pyxform.question import MultipleChoiceQuestion
-
-    survey_sheet = dealias_and_group_headers(
-        sheet_name=constants.SURVEY,
-        sheet_data=workbook_dict.survey,
-        sheet_header=workbook_dict.survey_header,
-        header_aliases=aliases.survey_header,
-        header_columns=set(MultipleChoiceQuestion.get_slot_names()),
-        headers_required={constants.TYPE},
-        default_language=default_language,
-        strip_whitespace=clean_text_values_enabled,
-    )
-    survey_sheet.data = dealias_types(dict_array=survey_sheet.data)
+        results = {k: task(sheet_warnings[k]) for k, task in sheet_tasks.items()}
+    for w in sheet_warnings.values():
+        warnings.extend(w)
+
+    external_choices = results[constants.EXTERNAL_CHOICES]
+    choices_sheet, choices = results[constants.CHOICES]
+    if choices:
+        json_dict[constants.CHOICES] = choices
+    entity_declarations, entity_variable_references = results[constants.ENTITIES]
+    survey_sheet = results[constants.SURVEY]
+    osm_tags = results[constants.OSM]
 
     # Check for missing translations. The choices sheet is checked here so that the
     # warning can be combined into one message.
@@ -415,21 +655,6 @@ def workbook_to_json(
     )
     sheet_translations.missing_check(warnings=warnings)
 
-    # ########## OSM sheet ###########
-    # No spell check for OSM sheet (infrequently used, many spurious matches).
-    osm_tags = None
-    if workbook_dict.osm:
-        osm_sheet = dealias_and_group_headers(
-            sheet_data=workbook_dict.osm,
-            sheet_name=constants.OSM,
-            sheet_header=workbook_dict.osm_header,
-            header_aliases=aliases.list_header,
-            header_columns=option_fields,
-        )
-        osm_tags = group_dictionaries_by_key(
-            list_of_dicts=osm_sheet.data, key=constants.LIST_NAME_S
-        )
-
     # #################################
 
     # Parse the survey sheet while generating a survey in our json format:
@@ -459,6 +684,8 @@ def workbook_to_json(
     secondary_instances: set[str] = set()
     repeat_names: set[str] = set()
     entity_references_by_question = {}
+    # The parsed row types, since the same types are usually used on many rows.
+    row_types: dict[str, RowType] = {}
 
     # row by row, validate questions, throwing errors and adding warnings where needed.
     for row_number, row in enumerate(survey_sheet.data, start=2):
@@ -471,9 +698,9 @@ def workbook_to_json(
         # so the attributes below can be disabled.
         if "disabled" in row:
             warnings.append(
-                ROW_FORMAT_STRING % row_number
-                + " The 'disabled' column header is not part of the current"
-                + " spec. We recommend using relevant instead."
+                PyXFormWarning(
+                    code=ErrorCode.SURVEY_011, row=row_number, sheet=constants.SURVEY
+                )
             )
             disabled = row.pop("disabled")
             if aliases.yes_no.get(disabled):
@@ -492,9 +719,12 @@ def workbook_to_json(
             # then its a comment row, and we skip it with warning
             if not (constants.NAME in row or constants.LABEL in row):
                 warnings.append(
-                    ROW_FORMAT_STRING % row_number
-                    + " Row without name, text, or label is being skipped:\n"
-                    + str(row)
+                    PyXFormWarning(
+                        code=ErrorCode.SURVEY_010,
+                        row=row_number,
+                        sheet=constants.SURVEY,
+                        context={"value": row},
+                    )
                 )
                 continue
             raise PyXFormError(
@@ -680,25 +910,28 @@ def workbook_to_json(
                 )
         if question_type in constants.DEPRECATED_DEVICE_ID_METADATA_FIELDS:
             warnings.append(
-                (ROW_FORMAT_STRING % row_number)
-                + " "
-                + question_type
-                + " is no longer supported on most devices. "
-                "Only old versions of Collect on Android versions older than 11 still support it."
+                PyXFormWarning(
+                    code=ErrorCode.SURVEY_012,
+                    row=row_number,
+                    sheet=constants.SURVEY,
+                    column=constants.TYPE,
+                    context={"type": question_type},
+                )
             )
         # Check if the question is actually a setting specified
         # on the survey sheet
-        settings_type = aliases.settings_header.get(question_type)
+        row_type = row_types.get(question_type)
+        if row_type is None:
+            row_type = row_types[question_type] = parse_row_type(question_type)
+        settings_type = row_type.settings_type
         if settings_type:
             json_dict[settings_type] = str(row.get(constants.NAME))
             continue
 
-        # Try to parse question as begin control statement
-        # (i.e. begin loop/repeat/group):
-        begin_control_parse = RE_BEGIN_CONTROL.search(question_type)
-        # Try to parse question as a end control statement
-        # (i.e. end loop/repeat/group):
-        end_control_parse = RE_END_CONTROL.search(question_type)
+        # Is the question a begin control statement (i.e. begin loop/repeat/group)?
+        begin_control_parse = row_type.begin_control
+        # Is the question an end control statement (i.e. end loop/repeat/group)?
+        end_control_parse = row_type.end_control
 
         # Make sure the row has a valid name
         question_name = None
@@ -741,8 +974,8 @@ def workbook_to_json(
             is_container_end=end_control_parse is not None,
         )
 
-        if end_control_parse:
-            parse_dict = end_control_parse.groupdict()
+        if end_control_parse is not None:
+            parse_dict = end_control_parse
             if parse_dict.get("end") and "type" in parse_dict:
                 control_type = aliases.control[parse_dict["type"]]
                 if prev_control_type != control_type or len(stack) == 1:
@@ -757,8 +990,8 @@ def workbook_to_json(
                 table_list = None
                 continue
 
-        if begin_control_parse:
-            parse_dict = begin_control_parse.groupdict()
+        if begin_control_parse is not None:
+            parse_dict = begin_control_parse
             if parse_dict.get("begin") and "type" in parse_dict:
                 # Create a new json dict with children, and the proper type,
                 # and add it to parent_children_array in place of a question.
@@ -789,8 +1022,16 @@ def workbook_to_json(
                     # Also means the error message text is stable for tests.
                     msg_dict = {"name": row.get("name"), "type": row.get("type")}
                     warnings.append(
-                        ROW_FORMAT_STRING % row_number
-                        + f" {control_type.capitalize()} has no label: {msg_dict}"
+                        PyXFormWarning(
+                            code=ErrorCode.LABEL_002,
+                            row=row_number,
+                            sheet=constants.SURVEY,
+                            column=constants.LABEL,
+                            context={
+                                "type": control_type.capitalize(),
+                                "value": msg_dict,
+                            },
+                        )
                     )
 
                 new_json_dict = row.copy()
@@ -889,9 +1130,9 @@ def workbook_to_json(
             secondary_instances.add(os.path.splitext(question_name)[0])
 
         # Try to parse question as a select:
-        select_parse = RE_SELECT.search(question_type)
-        if select_parse:
-            parse_dict = select_parse.groupdict()
+        select_parse = row_type.select
+        if select_parse is not None:
+            parse_dict = select_parse
             if parse_dict.get("select_command"):
                 select_type = aliases.select[parse_dict["select_command"]]
                 if (
@@ -899,8 +1140,12 @@ def workbook_to_json(
                     and constants.CHOICE_FILTER not in row
                 ):
                     warnings.append(
-                        ROW_FORMAT_STRING % row_number
-                        + " select one external is only meant for filtered selects."
+                        PyXFormWarning(
+                            code=ErrorCode.SURVEY_013,
+                            row=row_number,
+                            sheet=constants.SURVEY,
+                            column=constants.CHOICE_FILTER,
+                        )
                     )
                 list_name = parse_dict[constants.LIST_NAME_U]
                 instance_name, file_extension = os.path.splitext(list_name)
@@ -1130,9 +1375,9 @@ def workbook_to_json(
                 continue
 
         # Try to parse question as osm:
-        osm_parse = RE_OSM.search(question_type)
-        if osm_parse:
-            parse_dict = osm_parse.groupdict()
+        osm_parse = row_type.osm
+        if osm_parse is not None:
+            parse_dict = osm_parse
             new_dict = row.copy()
             new_dict["type"] = constants.OSM
 
@@ -1213,8 +1458,12 @@ def workbook_to_json(
                 )
             else:
                 warnings.append(
-                    (ROW_FORMAT_STRING % row_number)
-                    + f" Use the {qt_params.MAX_PIXELS.value} parameter to speed up submission sending and save storage space. Learn more: https://xlsform.org/#image"
+                    PyXFormWarning(
+                        code=ErrorCode.SURVEY_014,
+                        row=row_number,
+                        sheet=constants.SURVEY,
+                        column=constants.PARAMETERS,
+                    )
                 )
 
             if qt_params.APP in parameters:
@@ -1396,6 +1645,7 @@ def workbook_to_json(
         survey_headers=survey_sheet.headers,
         choices_headers=choices_headers,
         element_names=element_names,
+        references=references,
     )
 
     # print_pyobj_to_json(json_dict)
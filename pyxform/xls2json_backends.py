@@ -5,20 +5,23 @@ XLS-to-dict and csv-to-dict are essentially backends for xls2json.
 import csv
 import datetime
 import re
-from collections.abc import Callable, Iterable, Sequence
-from dataclasses import dataclass
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from enum import Enum
 from io import BytesIO, IOBase, StringIO
 from os import PathLike
 from pathlib import Path
 from typing import Any, BinaryIO
+from xml.parsers.expat import ExpatError
 from zipfile import BadZipFile
 
+from defusedxml.ElementTree import ParseError
 from openpyxl import open as pyxl_open
 from openpyxl.cell import Cell as pyxlCell
-from openpyxl.reader.excel import ExcelReader
 from openpyxl.workbook import Workbook as pyxlWorkbook
-from openpyxl.worksheet.worksheet import Worksheet as pyxlWorksheet
 from xlrd import XL_CELL_BOOLEAN, XL_CELL_DATE, XL_CELL_NUMBER, XLRDError
 from xlrd import open_workbook as xlrd_open
 from xlrd.book import Book as xlrdBook
@@ -28,6 +31,7 @@ from xlrd.xldate import XLDateAmbiguous, xldate_as_tuple
 
 from pyxform import constants
 from pyxform.errors import PyXFormError, PyXFormReadError
+from pyxform.xlsx_reader import XlsxSheet, XlsxWorkbook
 
 aCell = xlrdCell | pyxlCell
 XL_DATE_AMBIGOUS_MSG = (
@@ -37,8 +41,164 @@ XL_DATE_AMBIGOUS_MSG = (
 RE_WHITESPACE = re.compile(r"( )+")
 
 
+# The sheets that may be large, so they may be stored by column (see ColumnarSheet).
+COLUMNAR_SHEET_NAMES = {
+    constants.SURVEY,
+    constants.CHOICES,
+    constants.EXTERNAL_CHOICES,
+    constants.OSM,
+}
+# The columns that usually have few distinct values, repeated in many rows, so the
+# values are interned when read (see SheetLoader.intern).
+INTERNED_COLUMNS = {
+    constants.TYPE,
+    constants.LIST_NAME_S,
+    constants.LIST_NAME_U,
+    constants.APPEARANCE,
+    "required",
+    "control::appearance",
+    "bind::required",
+}
+
+
+class ColumnarSheet(Sequence):
+    """
+    Sheet data rows, stored as a list of values for each column.
+
+    For large sheets this uses much less memory than a dict for each row, since the
+    column names are stored once, and empty cells are stored as None (a shared
+    reference). It's a read-only sequence of row dicts, like the other sheet data, but
+    the row dicts are created when accessed, and only have keys for non-empty cells.
+    """
+
+    __slots__ = ("columns", "headers", "length")
+
+    def __init__(self, headers: tuple[str, ...], columns: tuple[list, ...], length: int):
+        """
+        :param headers: The column names.
+        :param columns: The values for each column, in the same order as the headers.
+          Each has a value (or None if empty) for each row.
+        :param length: The number of rows.
+        """
+        self.headers: tuple[str, ...] = headers
+        self.columns: tuple[list, ...] = columns
+        self.length: int = length
+
+    @classmethod
+    def from_rows(
+        cls, rows: Iterable[dict[str, Any]], headers: Iterable[str] = ()
+    ) -> "ColumnarSheet":
+        """
+        Collect the row dicts into columns.
+
+        :param rows: The sheet data rows.
+        :param headers: The column names, if known. Any other keys found in the rows are
+          added as columns after these ones.
+        """
+        index = {}
+        for h in headers:
+            index.setdefault(sys.intern(h) if isinstance(h, str) else h, len(index))
+        columns = [[] for _ in index]
+        keys = index.keys()
+        length = 0
+        for row in rows:
+            if not keys >= row.keys():
+                for h in row:
+                    if h not in index:
+                        index[sys.intern(h) if isinstance(h, str) else h] = len(columns)
+                        columns.append([None] * length)
+            get = row.get
+            for h, column in zip(index, columns, strict=True):
+                column.append(get(h))
+            length += 1
+        return cls(headers=tuple(index), columns=tuple(columns), length=length)
+
+    def column(self, header: str) -> list | None:
+        """Get the values for the column, or None if there is no such column."""
+        try:
+            return self.columns[self.headers.index(header)]
+        except ValueError:
+            return None
+
+    def iter_items(self) -> Iterator[Iterator[tuple[str, Any]]]:
+        """Yield the (header, value) pairs of the non-empty cells for each row."""
+        headers = self.headers
+        if not headers:
+            for _ in range(self.length):
+                yield iter(())
+            return
+        for values in zip(*self.columns, strict=True):
+            yield ((h, v) for h, v in zip(headers, values, strict=False) if v is not None)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        for items in self.iter_items():
+            yield dict(items)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(self.length)[i]]
+        i = range(self.length)[i]
+        return {
+            h: column[i]
+            for h, column in zip(self.headers, self.columns, strict=False)
+            if column[i] is not None
+        }
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other, strict=True)
+            )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(headers={self.headers!r}, length={self.length})"
+
+
+def to_columnar(
+    rows: Sequence[dict[str, Any]] | None, header: Sequence[dict[str, Any]] | None
+) -> ColumnarSheet | None:
+    """
+    Convert the sheet rows to a ColumnarSheet, using the header row for column order.
+
+    :param rows: The sheet data rows.
+    :param header: The sheet column names (headers).
+    """
+    if rows is None or isinstance(rows, ColumnarSheet):
+        return rows
+    return ColumnarSheet.from_rows(rows=rows, headers=header[0] if header else ())
+
+
+# The DefinitionData fields for the XLSForm sheets, which may be read on first access.
+_SHEET_FIELDS = frozenset(
+    f
+    for name in (
+        constants.SURVEY,
+        constants.CHOICES,
+        constants.SETTINGS,
+        constants.EXTERNAL_CHOICES,
+        constants.ENTITIES,
+        constants.OSM,
+    )
+    for f in (name, f"{name}_header")
+)
+
+
 @dataclass(slots=True)
 class DefinitionData:
+    """
+    The XLSForm definition sheets, and metadata about the definition.
+
+    If a `loader` is provided, each sheet that isn't provided is read when it is first
+    accessed, rather than all at once. Use `release` to drop the sheet data after it's
+    been used, and `close` to release the workbook once no more sheets are needed.
+    """
+
     # XLSForm definition sheets.
     # survey is optional to allow processing to proceed to warnings / spell checks.
     survey: Sequence[dict[str, str]] | None = None
@@ -57,6 +217,93 @@ class DefinitionData:
     # Extra metadata.
     sheet_names: Sequence[str] | None = None
     fallback_form_name: str | None = None
+    file_type: "SupportedFileTypes | None" = None
+    loader: "SheetLoader | None" = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        if self.loader is not None:
+            # Unset sheets are read by __getattr__ when they're first accessed.
+            for name in _SHEET_FIELDS:
+                if getattr(self, name) is None:
+                    delattr(self, name)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called if the attribute is unset, i.e. for a sheet that isn't loaded.
+        if name not in _SHEET_FIELDS:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        self.load(name.removesuffix("_header"))
+        return object.__getattribute__(self, name)
+
+    def _is_loaded(self, name: str) -> bool:
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def load(self, sheet_name: str) -> None:
+        """
+        Read the sheet data, if it's not already loaded.
+
+        :param sheet_name: The XLSForm sheet name, e.g. "survey".
+        """
+        if self._is_loaded(sheet_name):
+            return
+        rows = header = None
+        if self.loader is not None:
+            sheet = self.loader.read_sheet(sheet_name=sheet_name)
+            if sheet is not None:
+                rows, header = sheet
+        setattr(self, sheet_name, rows)
+        setattr(self, f"{sheet_name}_header", header)
+
+    def iter_sheet(
+        self, sheet_name: str
+    ) -> tuple[Iterable[dict[str, Any]], Sequence[dict[str, Any]] | None]:
+        """
+        Get the sheet rows and headers, without keeping the rows in memory.
+
+        If the sheet is already loaded, or if there is no loader, the loaded rows are
+        used. Otherwise, the rows are read from the workbook as they are iterated.
+
+        :param sheet_name: The XLSForm sheet name, e.g. "survey".
+        """
+        if self.loader is None or self._is_loaded(sheet_name):
+            rows = getattr(self, sheet_name)
+            return rows or (), getattr(self, f"{sheet_name}_header")
+        sheet = self.loader.iter_sheet(sheet_name=sheet_name)
+        if sheet is None:
+            return (), None
+        return sheet
+
+    def close(self) -> None:
+        """
+        Close the loader, if any, to release the workbook.
+
+        After this, only the sheets that are already loaded can be accessed.
+        """
+        loader = self.loader
+        if loader is not None:
+            self.loader = None
+            loader.close()
+
+    def release(self, *sheet_names: str) -> None:
+        """
+        Drop the data for the sheets, so that the memory can be reclaimed.
+
+        The sheets are read again if they are accessed later. If there is no loader to
+        read them again then the data is kept.
+
+        :param sheet_names: The XLSForm sheet names, e.g. "survey".
+        """
+        if self.loader is None:
+            return
+        for sheet_name in sheet_names:
+            for name in (sheet_name, f"{sheet_name}_header"):
+                if self._is_loaded(name):
+                    delattr(self, name)
 
 
 def _list_to_dict_list(list_items):
@@ -110,113 +357,307 @@ def get_excel_rows(
     cell_func: Callable[[aCell, int, str], Any],
 ) -> list[dict[str, Any]]:
     """Get rows of cleaned data; stop if there's a run of empty rows."""
-    max_adjacent_empty_rows = 60
-    col_header_enum = list(enumerate(headers))
-    adjacent_empty_rows = 0
-    result_rows = []
-    for row_n, row in enumerate(rows):
-        row_dict = {}
-        for col_n, key in col_header_enum:
-            if key is None:
-                continue
-            try:
+    return list(iter_excel_rows(headers=headers, rows=rows, cell_func=cell_func))
+
+
+def iter_excel_rows(
+    headers: Iterable[str | None],
+    rows: Iterable[tuple[aCell, ...]],
+    cell_func: Callable[[aCell, int, str], Any],
+) -> Iterator[dict[str, Any]]:
+    """Yield rows of cleaned data; stop if there's a run of empty rows."""
+    # Only read the columns that have a header.
+    col_header_enum = [
+        (col_n, key) for col_n, key in enumerate(headers) if key is not None
+    ]
+
+    def row_dicts():
+        for row_n, row in enumerate(rows):
+            row_dict = {}
+            row_len = len(row)
+            for col_n, key in col_header_enum:
+                if col_n >= row_len:
+                    break  # rows may not have values for every column
                 cell = row[col_n]
                 if not is_empty(cell.value):
                     row_dict[key] = cell_func(cell, row_n, key)
-            except IndexError:
-                pass  # rows may not have values for every column
+            yield row_dict
 
+    return iter_trimmed_rows(rows=row_dicts())
+
+
+def trim_empty_rows(rows: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Collect the rows of data; stop if there's a run of empty rows."""
+    return list(iter_trimmed_rows(rows=rows))
+
+
+def iter_trimmed_rows(rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Yield the rows of data; stop if there's a run of empty rows."""
+    max_adjacent_empty_rows = 60
+    adjacent_empty_rows = 0
+    for row_dict in rows:
         if 0 == len(row_dict):
             # After a run of empty rows, assume we've reached the end of the data.
             if max_adjacent_empty_rows == adjacent_empty_rows:
                 break
             adjacent_empty_rows += 1
         else:
+            # There may be some empty rows amongst the XLSForm data. These are included
+            # so that any warning messages that mention row numbers are accurate. Empty
+            # rows at the end are not included.
+            for _ in range(adjacent_empty_rows):
+                yield {}
             adjacent_empty_rows = 0
-
-        # There may be some empty rows amongst the XLSForm data. These are included
-        # so that any warning messages that mention row numbers are accurate.
-        result_rows.append(row_dict)
-
-    return trim_trailing_empty(result_rows, adjacent_empty_rows)
+            yield row_dict
 
 
-def xls_to_dict(path_or_file):
+class SheetLoader(ABC):
     """
-    Return a Python dictionary with a key for each worksheet
-    name. For each sheet there is a list of dictionaries, each
-    dictionary corresponds to a single row in the worksheet. A
-    dictionary has keys taken from the column headers and values
-    equal to the cell value for that row and column.
-    All the keys and leaf elements are unicode text.
+    Reads the XLSForm sheets from a workbook, one sheet at a time.
+
+    Subclasses open the workbook in `_open`, read a sheet in `_iter`, and list the
+    errors which mean that the data is not a valid workbook of their type. Errors that
+    only mean this when opening the workbook are listed in `open_errors`.
     """
 
-    def xls_clean_cell(
-        wb: xlrdBook, wb_sheet: xlrdSheet, cell: xlrdCell, row_n: int, col_key: str
+    file_type: str = ""
+    read_errors: tuple[type[Exception], ...] = ()
+    open_errors: tuple[type[Exception], ...] = ()
+
+    def __init__(
+        self,
+        definition: "str | PathLike[str] | bytes | BytesIO | Definition",
+        columnar: bool = False,
+    ):
+        """
+        :param definition: XLSForm definition data.
+        :param columnar: If True, read the sheets that may be large (see
+          COLUMNAR_SHEET_NAMES) as a ColumnarSheet, rather than a list of dicts.
+        """
+        self.columnar: bool = columnar
+        # The original sheet names, for spelling checks.
+        self.sheet_names: list[str] = []
+        # The sheet to read for each XLSForm sheet name.
+        self.sheets: dict[str, Any] = {}
+        # The intern table for the strings read from this workbook.
+        self.strings: dict[str, str] = {}
+        try:
+            self._open(definition=get_definition_data(definition=definition))
+        except (*self.read_errors, *self.open_errors) as read_err:
+            self.close()
+            raise PyXFormReadError(
+                f"Error reading {self.file_type} file: {read_err}"
+            ) from read_err
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __deepcopy__(self, memo):
+        # The open workbook can't be copied, so copies (e.g. by asdict) share it.
+        return self
+
+    @abstractmethod
+    def _open(self, definition: "Definition") -> None:
+        """Open the workbook, and add its sheets with `_add_sheets`."""
+
+    @abstractmethod
+    def _iter(self, sheet: Any) -> tuple[Iterator[dict[str, Any]], list[dict[str, Any]]]:
+        """Get an iterator of the sheet rows, and the sheet headers."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release any resources held by the workbook."""
+
+    def intern(self, value: str) -> str:
+        """Get the first copy read of an equal string, so that repeats share one object."""
+        return self.strings.setdefault(value, value)
+
+    def _get_headers(self, first_row: Iterable[Any]) -> tuple[list[str | None], set[int]]:
+        """Get the (interned) column headers, and the indexes of columns to intern."""
+        headers = [
+            None if h is None else self.intern(h)
+            for h in get_excel_column_headers(first_row=first_row)
+        ]
+        interned = {
+            i
+            for i, h in enumerate(headers)
+            if h is not None and h.lower() in INTERNED_COLUMNS
+        }
+        return headers, interned
+
+    def _add_sheets(self, sheets: Sequence[tuple[str, Any]]) -> None:
+        for name, sheet in sheets:
+            # Note original in sheet_names for spelling check.
+            self.sheet_names.append(name)
+            sheet_name = name.lower()
+            # Do not process sheets that have nothing to do with XLSForm.
+            if sheet_name in constants.SUPPORTED_SHEET_NAMES:
+                self.sheets[sheet_name] = sheet
+            elif len(sheets) == 1:
+                self.sheets[constants.SURVEY] = sheet
+
+    def iter_sheet(
+        self, sheet_name: str
+    ) -> tuple[Iterator[dict[str, Any]], list[dict[str, Any]]] | None:
+        """
+        Get the rows and headers of the sheet, or None if there is no such sheet.
+
+        The rows are read as they are iterated, rather than all at once.
+
+        :param sheet_name: The XLSForm sheet name, e.g. "survey".
+        """
+        sheet = self.sheets.get(sheet_name)
+        if sheet is None:
+            return None
+        try:
+            rows, header = self._iter(sheet=sheet)
+        except self.read_errors as read_err:
+            raise PyXFormReadError(
+                f"Error reading {self.file_type} file: {read_err}"
+            ) from read_err
+        return self._iter_read_errors(rows=rows), header
+
+    def _iter_read_errors(self, rows: Iterator[dict[str, Any]]):
+        try:
+            yield from rows
+        except self.read_errors as read_err:
+            raise PyXFormReadError(
+                f"Error reading {self.file_type} file: {read_err}"
+            ) from read_err
+
+    def read_sheet(
+        self, sheet_name: str
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]] | None:
+        """
+        Read the rows and headers of the sheet, or None if there is no such sheet.
+
+        :param sheet_name: The XLSForm sheet name, e.g. "survey".
+        """
+        sheet = self.iter_sheet(sheet_name=sheet_name)
+        if sheet is None:
+            return None
+        rows, header = sheet
+        if self.columnar and sheet_name in COLUMNAR_SHEET_NAMES:
+            return ColumnarSheet.from_rows(
+                rows=rows, headers=header[0] if header else ()
+            ), header
+        return list(rows), header
+
+    def to_dict(self) -> dict[str, Any]:
+        """Read all of the XLSForm sheets."""
+        result_book = {"sheet_names": self.sheet_names}
+        for sheet_name in self.sheets:
+            (
+                result_book[sheet_name],
+                result_book[f"{sheet_name}_header"],
+            ) = self.read_sheet(sheet_name=sheet_name)
+        return result_book
+
+
+class XlsSheetLoader(SheetLoader):
+    """Reads the XLSForm sheets from a XLS workbook."""
+
+    file_type = ".xls"
+    read_errors = (AttributeError, TypeError, XLRDError)
+
+    def _open(self, definition: "Definition") -> None:
+        # With on_demand, each sheet is only parsed when it's read (if the XLS version
+        # supports it), so the sheets that have nothing to do with XLSForm are skipped.
+        # With ragged rows, each row is only as long as its last cell with a value.
+        self.workbook: xlrdBook = xlrd_open(
+            file_contents=definition.data.getvalue(), on_demand=True, ragged_rows=True
+        )
+        # Loading and unloading sheets changes the workbook's read position, so sheets
+        # are loaded one at a time, in case they're read in parallel.
+        self.lock: threading.Lock = threading.Lock()
+        self._add_sheets([(name, name) for name in self.workbook.sheet_names()])
+
+    def close(self) -> None:
+        workbook = getattr(self, "workbook", None)
+        if workbook is not None:
+            workbook.release_resources()
+
+    def _clean_value(
+        self, sheet_name: str, value: Any, ctype: int, row_n: int, col_key: str
     ) -> str | None:
-        value = cell.value
         if isinstance(value, str):
             value = value.strip()
         if not is_empty(value):
             try:
-                return xls_value_to_unicode(value, cell.ctype, wb.datemode)
+                return xls_value_to_unicode(value, ctype, self.workbook.datemode)
             except XLDateAmbiguous as date_err:
                 raise PyXFormError(
-                    XL_DATE_AMBIGOUS_MSG % (wb_sheet.name, col_key, row_n)
+                    XL_DATE_AMBIGOUS_MSG % (sheet_name, col_key, row_n)
                 ) from date_err
 
         return None
 
-    def xls_to_dict_normal_sheet(wb: xlrdBook, wb_sheet: xlrdSheet):
+    def _iter_rows(
+        self, sheet: xlrdSheet, headers: list[str | None], interned: set[int]
+    ) -> Iterator[dict[str, Any]]:
+        # Only read the columns that have a header.
+        col_header_enum = [
+            (col_n, key) for col_n, key in enumerate(headers) if key is not None
+        ]
+        n_headers = len(headers)
+        intern = self.intern
+        try:
+            for row_n, r in enumerate(range(1, sheet.nrows)):
+                # Read up to the last header column, or the end of the row if shorter.
+                end = min(n_headers, sheet.row_len(r))
+                values = sheet.row_values(r, 0, end)
+                types = sheet.row_types(r, 0, end)
+                row_dict = {}
+                for col_n, key in col_header_enum:
+                    if col_n >= end:
+                        break  # rows may not have values for every column
+                    value = values[col_n]
+                    if not is_empty(value):
+                        value = self._clean_value(
+                            sheet_name=sheet.name,
+                            value=value,
+                            ctype=types[col_n],
+                            row_n=row_n,
+                            col_key=key,
+                        )
+                        if col_n in interned:
+                            value = intern(value)
+                        row_dict[key] = value
+                yield row_dict
+        finally:
+            # Free the parsed sheet once it's been read, or abandoned. It's parsed again
+            # if it's read again. Sheets can only be unloaded if loaded on demand.
+            if self.workbook.on_demand:
+                with self.lock:
+                    self.workbook.unload_sheet(sheet.name)
+
+    def _iter(self, sheet: str):
         # XLS format: max cols 256, max rows 65536
-        first_row = (c.value for c in next(wb_sheet.get_rows(), []))
-        headers = get_excel_column_headers(first_row=first_row)
-        row_iter = (
-            tuple(wb_sheet.cell(r, c) for c in range(len(headers)))
-            for r in range(1, wb_sheet.nrows)
+        with self.lock:
+            wb_sheet = self.workbook.sheet_by_name(sheet)
+        first_row = wb_sheet.row_values(0) if wb_sheet.nrows else []
+        headers, interned = self._get_headers(first_row=first_row)
+        rows = iter_trimmed_rows(
+            rows=self._iter_rows(sheet=wb_sheet, headers=headers, interned=interned)
         )
-
-        # Inject wb/sheet as closure since functools.partial isn't typing friendly.
-        def clean_func(cell: xlrdCell, row_n: int, col_key: str) -> str | None:
-            return xls_clean_cell(
-                wb=wb, wb_sheet=wb_sheet, cell=cell, row_n=row_n, col_key=col_key
-            )
-
-        rows = get_excel_rows(headers=headers, rows=row_iter, cell_func=clean_func)
         column_header_list = [key for key in headers if key is not None]
         return rows, _list_to_dict_list(column_header_list)
 
-    def process_workbook(wb: xlrdBook):
-        result_book = {"sheet_names": []}
-        for wb_sheet in wb.sheets():
-            # Note original in sheet_names for spelling check.
-            result_book["sheet_names"].append(wb_sheet.name)
-            sheet_name = wb_sheet.name.lower()
-            # Do not process sheets that have nothing to do with XLSForm.
-            if sheet_name not in constants.SUPPORTED_SHEET_NAMES:
-                if len(wb.sheets()) == 1:
-                    (
-                        result_book[constants.SURVEY],
-                        result_book[f"{constants.SURVEY}_header"],
-                    ) = xls_to_dict_normal_sheet(wb=wb, wb_sheet=wb_sheet)
-                else:
-                    continue
-            else:
-                (
-                    result_book[sheet_name],
-                    result_book[f"{sheet_name}_header"],
-                ) = xls_to_dict_normal_sheet(wb=wb, wb_sheet=wb_sheet)
-        return result_book
 
-    try:
-        wb_file = get_definition_data(definition=path_or_file)
-        workbook = xlrd_open(file_contents=wb_file.data.getvalue())
-        try:
-            return process_workbook(wb=workbook)
-        finally:
-            workbook.release_resources()
-    except (AttributeError, TypeError, XLRDError) as read_err:
-        raise PyXFormReadError(f"Error reading .xls file: {read_err}") from read_err
+def xls_to_dict(path_or_file):
+    """
+    Return a Python dictionary with a key for each worksheet
+    name. For each sheet there is a list of dictionaries, each
+    dictionary corresponds to a single row in the worksheet. A
+    dictionary has keys taken from the column headers and values
+    equal to the cell value for that row and column.
+    All the keys and leaf elements are unicode text.
+    """
+    with XlsSheetLoader(definition=path_or_file) as loader:
+        return loader.to_dict()
 
 
 def xls_value_to_unicode(value, value_type, datemode) -> str:
@@ -249,6 +690,78 @@ def xls_value_to_unicode(value, value_type, datemode) -> str:
         return str(value).replace(chr(160), " ")
 
 
+class XlsxSheetLoader(SheetLoader):
+    """Reads the XLSForm sheets from a XLSX workbook."""
+
+    file_type = ".xlsx"
+    read_errors = (
+        BadZipFile,
+        ExpatError,
+        KeyError,
+        OSError,
+        ParseError,
+    )
+    open_errors = (TypeError,)
+
+    def _open(self, definition: "Definition") -> None:
+        self.workbook: XlsxWorkbook = XlsxWorkbook(data=definition.data)
+        self._add_sheets([(s.name, s) for s in self.workbook.sheets])
+
+    def close(self) -> None:
+        workbook = getattr(self, "workbook", None)
+        if workbook is not None:
+            workbook.close()
+
+    @staticmethod
+    def _clean_value(value: Any) -> str:
+        if isinstance(value, str):
+            value = value.strip()
+        return xlsx_value_to_str(value)
+
+    def _iter(self, sheet: XlsxSheet):
+        # XLSX format: max cols 16384, max rows 1048576
+        # A new sheet, so that the columns filter only applies to this iteration.
+        sheet = XlsxSheet(workbook=sheet.workbook, name=sheet.name, path=sheet.path)
+        rows = iter(sheet)
+        try:
+            first_row = dict(next(rows, ()))
+            headers, interned = self._get_headers(
+                first_row=(
+                    first_row.get(i) for i in range(max(first_row, default=-1) + 1)
+                )
+            )
+        except BaseException:
+            rows.close()
+            raise
+        columns = {i: key for i, key in enumerate(headers) if key is not None}
+        if not columns:
+            rows.close()
+            return iter(()), []
+        # Only read the cells that have a column header. Rows already parsed in the
+        # same chunk as the header row may include other cells, so filter them too.
+        sheet.columns = columns
+        clean_value = self._clean_value
+        intern = self.intern
+
+        def clean_and_intern(value: Any) -> str:
+            return intern(clean_value(value))
+
+        cleaners = {
+            i: clean_and_intern if i in interned else clean_value for i in columns
+        }
+        result_rows = iter_trimmed_rows(
+            rows=(
+                {
+                    columns[col_n]: cleaners[col_n](value)
+                    for col_n, value in row
+                    if col_n in columns and not is_empty(value)
+                }
+                for row in rows
+            )
+        )
+        return result_rows, _list_to_dict_list(list(columns.values()))
+
+
 def xlsx_to_dict(path_or_file):
     """
     Return a Python dictionary with a key for each worksheet
@@ -258,58 +771,8 @@ def xlsx_to_dict(path_or_file):
     equal to the cell value for that row and column.
     All the keys and leaf elements are strings.
     """
-
-    def xlsx_clean_cell(cell: pyxlCell, row_n: int, col_key: str) -> str | None:
-        value = cell.value
-        if isinstance(value, str):
-            value = value.strip()
-        if not is_empty(value):
-            return xlsx_value_to_str(value)
-
-        return None
-
-    def xlsx_to_dict_normal_sheet(sheet: pyxlWorksheet):
-        # XLSX format: max cols 16384, max rows 1048576
-        first_row = (c.value for c in next(sheet.rows, []))
-        headers = get_excel_column_headers(first_row=first_row)
-        row_iter = sheet.iter_rows(min_row=2, max_col=len(headers))
-        rows = get_excel_rows(headers=headers, rows=row_iter, cell_func=xlsx_clean_cell)
-        column_header_list = [key for key in headers if key is not None]
-        return rows, _list_to_dict_list(column_header_list)
-
-    def process_workbook(wb: pyxlWorkbook):
-        result_book = {"sheet_names": []}
-        for sheetname in wb.sheetnames:
-            # Note original in sheet_names for spelling check.
-            result_book["sheet_names"].append(sheetname)
-            sheet_name = sheetname.lower()
-            # Do not process sheets that have nothing to do with XLSForm.
-            if sheet_name not in constants.SUPPORTED_SHEET_NAMES:
-                if len(wb.sheetnames) == 1:
-                    (
-                        result_book[constants.SURVEY],
-                        result_book[f"{constants.SURVEY}_header"],
-                    ) = xlsx_to_dict_normal_sheet(wb[sheetname])
-                else:
-                    continue
-            else:
-                (
-                    result_book[sheet_name],
-                    result_book[f"{sheet_name}_header"],
-                ) = xlsx_to_dict_normal_sheet(wb[sheetname])
-        return result_book
-
-    try:
-        wb_file = get_definition_data(definition=path_or_file)
-        reader = ExcelReader(wb_file.data, read_only=True, data_only=True)
-        reader.read()
-        try:
-            return process_workbook(wb=reader.wb)
-        finally:
-            reader.wb.close()
-            reader.archive.close()
-    except (BadZipFile, KeyError, OSError, TypeError) as read_err:
-        raise PyXFormReadError(f"Error reading .xlsx file: {read_err}") from read_err
+    with XlsxSheetLoader(definition=path_or_file) as loader:
+        return loader.to_dict()
 
 
 def xlsx_value_to_str(value) -> str:
@@ -705,6 +1168,15 @@ class SupportedFileTypes(Enum):
             SupportedFileTypes.csv: csv_to_dict,
         }
 
+    @staticmethod
+    def get_sheet_loaders() -> "dict[SupportedFileTypes, type[SheetLoader]]":
+        """The types that can be read one sheet at a time, rather than all at once."""
+        return {
+            SupportedFileTypes.xlsx: XlsxSheetLoader,
+            SupportedFileTypes.xlsm: XlsxSheetLoader,
+            SupportedFileTypes.xls: XlsSheetLoader,
+        }
+
 
 @dataclass(slots=True)
 class Definition:
@@ -713,34 +1185,92 @@ class Definition:
     file_path_stem: str | None
 
 
+# Signatures at the start of the binary file types. XLSX/XLSM are ZIP archives (the
+# second signature is an empty archive), and XLS is an OLE2 compound document.
+ZIP_SIGNATURES = (b"PK\x03\x04", b"PK\x05\x06")
+OLE2_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+def detect_file_types(data: BytesIO) -> list[SupportedFileTypes]:
+    """
+    Guess the file type(s) of the data by checking the start of it.
+
+    The binary types are identified by their file signatures, and the text types by
+    the same checks that their parsers use. Usually there is only one match. If the
+    data looks like both Markdown and CSV, both are returned (Markdown first). If there
+    is no match, all types are returned, so that the caller may try each of them.
+
+    :param data: The definition data. The stream position is not changed.
+    """
+    with data.getbuffer() as buffer:
+        start = bytes(buffer[:5000])
+    if start.startswith(ZIP_SIGNATURES):
+        return [SupportedFileTypes.xlsx]
+    if start.startswith(OLE2_SIGNATURE):
+        return [SupportedFileTypes.xls]
+    # Ignore errors since the 5KB may end part way through a multi-byte character.
+    text = start.decode("utf-8", errors="ignore")
+    text_types = []
+    if is_markdown_table(data=text):
+        text_types.append(SupportedFileTypes.md)
+    if is_csv(data=text):
+        text_types.append(SupportedFileTypes.csv)
+    return text_types or list(SupportedFileTypes)
+
+
 def definition_to_dict(
     definition: str | PathLike[str] | bytes | BytesIO | IOBase | Definition,
     file_type: str | None = None,
+    columnar: bool = False,
 ) -> DefinitionData:
     """
     Convert raw definition data to a dict ready for conversion to a XForm.
 
     :param definition: XLSForm definition data.
     :param file_type: If provided, attempt parsing the data only as this type. Otherwise,
-      parsing of supported data types will be attempted until one of them succeeds.
-    :return:
+      the type is detected from the data (see `detect_file_types`).
+    :param columnar: If True, store the sheets that may be large (see
+      COLUMNAR_SHEET_NAMES) as a ColumnarSheet, rather than a list of dicts.
+    :return: The definition data, including the type that it was parsed as.
     """
     supported = f"Must be one of: {', '.join(t.value for t in SupportedFileTypes)}"
     processors = SupportedFileTypes.get_processors()
+    loaders = SupportedFileTypes.get_sheet_loaders()
+    definition = get_definition_data(definition=definition)
     if file_type is not None:
         try:
-            ft = SupportedFileTypes(file_type)
+            file_types = [SupportedFileTypes(file_type)]
         except ValueError as err:
             raise PyXFormError(
                 f"Argument 'file_type' is not a supported type. {supported}"
             ) from err
-        else:
-            processors = {ft: processors[ft]}
+    elif definition.data is None:
+        file_types = list(SupportedFileTypes)
+    else:
+        file_types = detect_file_types(data=definition.data)
 
-    for func in processors.values():
+    for ft in file_types:
         try:
+            loader = loaders.get(ft)
+            if loader is None:
+                sheets = processors[ft](definition)
+                if columnar:
+                    for name in COLUMNAR_SHEET_NAMES.intersection(sheets):
+                        sheets[name] = to_columnar(
+                            rows=sheets[name], header=sheets.get(f"{name}_header")
+                        )
+                return DefinitionData(
+                    fallback_form_name=definition.file_path_stem,
+                    file_type=ft,
+                    **sheets,
+                )
+            # The workbook sheets are read when they're first needed.
+            loader = loader(definition=definition, columnar=columnar)
             return DefinitionData(
-                fallback_form_name=definition.file_path_stem, **func(definition)
+                sheet_names=loader.sheet_names,
+                fallback_form_name=definition.file_path_stem,
+                file_type=ft,
+                loader=loader,
             )
         except PyXFormReadError:  # noqa: PERF203
             continue
@@ -812,6 +1342,7 @@ def get_definition_data(
 def get_xlsform(
     xlsform: str | PathLike[str] | bytes | BytesIO | BinaryIO | dict,
     file_type: str | None = None,
+    columnar: bool = False,
 ) -> DefinitionData:
     if isinstance(xlsform, dict):
         workbook_dict = DefinitionData(**xlsform)
@@ -819,5 +1350,7 @@ def get_xlsform(
         definition = get_definition_data(definition=xlsform)
         if file_type is None:
             file_type = definition.file_type
-        workbook_dict = definition_to_dict(definition=definition, file_type=file_type)
+        workbook_dict = definition_to_dict(
+            definition=definition, file_type=file_type, columnar=columnar
+        )
     return workbook_dict
@@ -6,22 +6,40 @@ use with ODK Collect.
 import argparse
 import json
 import logging
+from collections.abc import Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from dataclasses import dataclass
 from io import BytesIO
-from os import PathLike
+from os import PathLike, cpu_count
 from os.path import splitext
 from pathlib import Path
-from typing import TYPE_CHECKING, BinaryIO, Optional
+from typing import TYPE_CHECKING, BinaryIO, Literal, Optional
 
+from pyxform import constants
 from pyxform.builder import create_survey_element_from_dict
+from pyxform.errors import PyXFormError
+from pyxform.parsing.expression import parse_expression
+from pyxform.profiling import Profiler, StageHook, StageProfile
 from pyxform.utils import (
+    ItemsetsCSV,
     coalesce,
     external_choices_to_csv,
     has_external_choices,
 )
 from pyxform.validators.odk_validate import ODKValidateError
+from pyxform.validators.pyxform.iana_subtags.validation import (
+    get_languages_with_bad_tags,
+)
 from pyxform.xls2json import workbook_to_json
-from pyxform.xls2json_backends import get_xlsform
+from pyxform.xls2json_backends import SupportedFileTypes, get_xlsform
 
 if TYPE_CHECKING:
     from pyxform.survey import Survey
@@ -49,8 +67,13 @@ class ConvertResult:
     :param xform: The result XForm
     :param warnings: Warnings raised during conversion.
     :param itemsets: If the XLSForm defined external itemsets, a CSV version of them.
+      If stream_itemsets was requested, this is None and `itemsets_csv` is used instead.
     :param _pyxform: Internal representation of the XForm, may change without notice.
     :param _survey: Internal representation of the XForm, may change without notice.
+    :param profile: If profiling was requested, the measurements for each stage.
+    :param itemsets_csv: If stream_itemsets was requested and the XLSForm defined
+      external itemsets, a handle to write the CSV version of them. This keeps the
+      XLSForm workbook open until the CSV is written (or the handle is closed).
     """
 
     xform: str
@@ -58,6 +81,8 @@ class ConvertResult:
     itemsets: str | None
     _pyxform: dict | None
     _survey: Optional["Survey"]
+    profile: list[StageProfile] | None = None
+    itemsets_csv: ItemsetsCSV | None = None
 
 
 def convert(
@@ -69,6 +94,14 @@ def convert(
     form_name: str | None = None,
     default_language: str | None = None,
     file_type: str | None = None,
+    validate_via_stdin: bool = False,
+    profile: bool = False,
+    trace_memory: bool = False,
+    stage_hook: StageHook | None = None,
+    stream_itemsets: bool = False,
+    columnar: bool = False,
+    parallel_sheets: bool = False,
+    max_warnings: int | None = None,
 ) -> ConvertResult:
     """
     Run the XLSForm to XForm conversion.
@@ -76,10 +109,11 @@ def convert(
     This function avoids result file IO so it is more suited to library usage of pyxform.
 
     If validate=True or Enketo=True, then the XForm will be written to a temporary file
-    to be checked by ODK Validate and/or Enketo Validate. These validators are run as
-    external processes. A recent version of ODK Validate is distributed with pyxform,
-    while Enketo Validate is not. A script to download or update these validators is
-    provided in `validators/updater.py`.
+    to be checked by ODK Validate and/or Enketo Validate, unless validate_via_stdin=True.
+    Otherwise, no files are written. These validators are run as external processes. A
+    recent version of ODK Validate is distributed with pyxform, while Enketo Validate is
+    not. A script to download or update these validators is provided in
+    `validators/updater.py`.
 
     :param xlsform: The input XLSForm file path or content. If the content is bytes or
       supports read (a class that has read() -> bytes) it's assumed to relate to the file
@@ -93,34 +127,87 @@ def convert(
     :param file_type: If provided, attempt parsing the data only as this type. Otherwise,
       parsing of supported data types will be attempted until one of them succeeds. If the
       xlsform is provided as a dict, then it is used directly and this argument is ignored.
+    :param validate_via_stdin: If True, and the OS supports it, pipe the XForm to the
+      validators via stdin instead of writing it to a temporary file.
+    :param profile: If True, measure the time used by each conversion stage, and include
+      the measurements in the result.
+    :param trace_memory: If True, also measure the peak memory used by each stage. This
+      implies profile=True, and makes the conversion much slower.
+    :param stage_hook: If provided, called with the measurements at the end of each
+      stage (including a stage that raises an error). This implies profile=True.
+    :param stream_itemsets: If True, rather than creating the external itemsets CSV as
+      a string, provide a handle to write it to a file later. The external choices
+      are read from the XLSForm as they're written, so the CSV is not kept in memory.
+    :param columnar: If True, store the sheets that may be large by column rather than
+      by row, which uses less memory. See `xls2json_backends.ColumnarSheet`.
+    :param parallel_sheets: If True, read and clean the XLSForm sheets that don't
+      depend on each other (such as the survey and choices sheets) in a thread pool.
+      This may be faster for large XLSForms with many sheets.
+    :param max_warnings: If provided, the maximum number of XLSForm warnings to keep,
+      followed by a count of any more that were not kept. If 0, the XLSForm warnings are
+      not kept at all, which saves formatting them.
     """
     warnings = coalesce(warnings, [])
-    workbook_dict = get_xlsform(xlsform=xlsform, file_type=file_type)
-    pyxform_data = workbook_to_json(
-        workbook_dict=workbook_dict,
-        form_name=form_name,
-        fallback_form_name=workbook_dict.fallback_form_name,
-        default_language=default_language,
-        warnings=warnings,
-    )
-    itemsets = None
-    if has_external_choices(json_struct=pyxform_data):
-        itemsets = external_choices_to_csv(workbook_dict=workbook_dict)
+    profiler = Profiler(enabled=profile, trace_memory=trace_memory, hook=stage_hook)
+    with profiler.stage("get_xlsform"):
+        workbook_dict = get_xlsform(
+            xlsform=xlsform, file_type=file_type, columnar=columnar
+        )
+    itemsets = itemsets_csv = None
+    try:
+        with profiler.stage("workbook_to_json"):
+            pyxform_data = workbook_to_json(
+                workbook_dict=workbook_dict,
+                form_name=form_name,
+                fallback_form_name=workbook_dict.fallback_form_name,
+                default_language=default_language,
+                warnings=warnings,
+                parallel_sheets=parallel_sheets,
+                max_warnings=max_warnings,
+            )
+        # Only the external_choices sheet may be needed from here on.
+        workbook_dict.release(
+            constants.SURVEY,
+            constants.CHOICES,
+            constants.SETTINGS,
+            constants.ENTITIES,
+            constants.OSM,
+        )
+        if has_external_choices(json_struct=pyxform_data):
+            if stream_itemsets:
+                # This closes the workbook once the CSV is written.
+                itemsets_csv = ItemsetsCSV(workbook_dict=workbook_dict)
+            else:
+                with profiler.stage("external_choices_to_csv"):
+                    itemsets = external_choices_to_csv(workbook_dict=workbook_dict)
+    finally:
+        if itemsets_csv is None:
+            workbook_dict.close()
     del workbook_dict
 
-    survey = create_survey_element_from_dict(pyxform_data)
-    xform = survey.to_xml(
-        validate=validate,
-        pretty_print=pretty_print,
-        warnings=warnings,
-        enketo=enketo,
-    )
+    try:
+        with profiler.stage("create_survey_element_from_dict"):
+            survey = create_survey_element_from_dict(pyxform_data)
+        with profiler.stage("to_xml"):
+            xform = survey.to_xml(
+                validate=validate,
+                pretty_print=pretty_print,
+                warnings=warnings,
+                enketo=enketo,
+                validate_via_stdin=validate_via_stdin,
+            )
+    except BaseException:
+        if itemsets_csv is not None:
+            itemsets_csv.close()
+        raise
     return ConvertResult(
         xform=xform,
         warnings=warnings,
         itemsets=itemsets,
         _pyxform=pyxform_data,
         _survey=survey,
+        profile=profiler.stages if profiler.enabled else None,
+        itemsets_csv=itemsets_csv,
     )
 
 
@@ -130,7 +217,19 @@ def xls2xform_convert(
     validate: bool = True,
     pretty_print: bool = True,
     enketo: bool = False,
+    itemsets_path: str | PathLike[str] | None = None,
 ) -> list[str]:
+    """
+    Convert the XLSForm file to an XForm file.
+
+    :param xlsform_path: The input XLSForm file path.
+    :param xform_path: The output XForm file path.
+    :param validate: If True, check the XForm with ODK Validate
+    :param pretty_print: If True, format the XForm with spaces, line breaks, etc.
+    :param enketo: If True, check the XForm with Enketo Validate.
+    :param itemsets_path: Where to write the external choices CSV, if any. Defaults to
+      "itemsets.csv" in the same directory as the XForm.
+    """
     warnings = []
     result = convert(
         xlsform=xlsform_path,
@@ -138,27 +237,195 @@ def xls2xform_convert(
         pretty_print=pretty_print,
         enketo=enketo,
         warnings=warnings,
+        stream_itemsets=True,
     )
-    with open(xform_path, mode="w", encoding="utf-8") as f:
-        f.write(result.xform)
-    if result.itemsets is not None:
-        itemsets_path = Path(xform_path).parent / "itemsets.csv"
-        with open(itemsets_path, mode="w", encoding="utf-8", newline="") as f:
-            f.write(result.itemsets)
-            logger.info("External choices csv is located at: %s", itemsets_path)
+    itemsets_csv = result.itemsets_csv
+    try:
+        with open(xform_path, mode="w", encoding="utf-8") as f:
+            f.write(result.xform)
+        if itemsets_csv is not None:
+            if itemsets_path is None:
+                itemsets_path = Path(xform_path).parent / "itemsets.csv"
+            else:
+                Path(itemsets_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(itemsets_path, mode="w", encoding="utf-8", newline="") as f:
+                itemsets_csv.write(sink=f)
+                logger.info("External choices csv is located at: %s", itemsets_path)
+    finally:
+        # Release the workbook if the CSV wasn't written, e.g. due to an OSError.
+        if itemsets_csv is not None:
+            itemsets_csv.close()
     return warnings
 
 
+@dataclass(slots=True)
+class ConvertManyResult:
+    """
+    Result data from one of the conversions run by `convert_many`.
+
+    :param index: The position of the XLSForm in the `convert_many` inputs.
+    :param result: The conversion result, or None if the conversion raised an error.
+    :param error: The error raised by the conversion, if any.
+    """
+
+    index: int
+    result: ConvertResult | None
+    error: Exception | None
+
+
+def _warm_up() -> None:
+    """
+    Do the one-off setup that is otherwise done by the first conversion.
+
+    For example the expression lexer and the IANA language subtags are loaded on first
+    use and then re-used, so that later conversions in the same process are faster.
+    """
+    parse_expression("1")
+    # An unknown code, so that both subtags files are read.
+    get_languages_with_bad_tags(["Unknown (zz-zz)"])
+
+
+def _convert_many_one(
+    index: int, xlsform, keep_survey: bool, **kwargs
+) -> ConvertManyResult:
+    """Run one conversion for `convert_many`, capturing the result or error."""
+    try:
+        result = convert(xlsform=xlsform, **kwargs)
+    except Exception as e:
+        return ConvertManyResult(index=index, result=None, error=e)
+    if not keep_survey:
+        result._survey = None
+    return ConvertManyResult(index=index, result=result, error=None)
+
+
+def convert_many(
+    xlsforms: Iterable[str | PathLike[str] | bytes | BytesIO | BinaryIO | dict],
+    workers: int | None = None,
+    executor: Literal["thread", "process"] | Executor = "process",
+    validate: bool = False,
+    pretty_print: bool = False,
+    enketo: bool = False,
+    default_language: str | None = None,
+    file_type: str | None = None,
+    validate_via_stdin: bool = False,
+    profile: bool = False,
+    max_pending: int | None = None,
+) -> Iterator[ConvertManyResult]:
+    """
+    Run the XLSForm to XForm conversion for many XLSForms, in parallel.
+
+    Each worker converts many XLSForms, so one-off setup costs (such as building the
+    expression lexer, and reading the IANA language subtags) are paid once per worker
+    rather than once per XLSForm. Results are yielded as each conversion completes, so
+    they may not be in the same order as the inputs; use `ConvertManyResult.index` to
+    match a result to its input. An error converting one XLSForm is captured in its
+    result, and does not stop the other conversions.
+
+    With a process pool, the inputs and results are copied between processes, so the
+    inputs must be picklable (e.g. a path or bytes, not an open file), and the
+    `ConvertResult._survey` is not included. Inputs are read from the iterable as
+    workers become available, so it can be a generator of many XLSForms.
+
+    :param xlsforms: The input XLSForm file paths or contents, as for `convert`.
+    :param workers: The maximum number of parallel conversions. Defaults to the executor
+      default, which is based on the number of CPUs.
+    :param executor: "process" to use a process pool, "thread" to use a thread pool, or
+      an existing Executor to use (which is not shut down afterwards).
+    :param validate: If True, check each XForm with ODK Validate
+    :param pretty_print: If True, format each XForm with spaces, line breaks, etc.
+    :param enketo: If True, check each XForm with Enketo Validate.
+    :param default_language: The name of the default language for the forms.
+    :param file_type: If provided, attempt parsing the data only as this type.
+    :param validate_via_stdin: If True, and the OS supports it, pipe each XForm to the
+      validators via stdin instead of writing it to a temporary file.
+    :param profile: If True, include measurements of each conversion stage in the
+      results. See `convert` for details.
+    :param max_pending: The maximum number of conversions submitted to the executor
+      but not yet yielded, which limits how far ahead the inputs are read. Defaults to
+      twice `workers`, or twice the number of CPUs if `workers` is not provided.
+    """
+    if workers is not None and workers < 1:
+        raise PyXFormError("The number of convert_many workers must be at least 1.")
+    if max_pending is None:
+        max_pending = 2 * (workers or cpu_count() or 1)
+    elif max_pending < 1:
+        raise PyXFormError("The convert_many max_pending must be at least 1.")
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_up)
+        keep_survey = False
+    elif executor == "thread":
+        # Threads share the warm state of this process.
+        _warm_up()
+        pool = ThreadPoolExecutor(max_workers=workers)
+        keep_survey = True
+    elif isinstance(executor, Executor):
+        pool = executor
+        keep_survey = not isinstance(executor, ProcessPoolExecutor)
+    else:
+        raise PyXFormError(
+            f"Unknown convert_many executor: '{executor}'. "
+            "Expected 'thread', 'process', or an Executor."
+        )
+    kwargs = {
+        "keep_survey": keep_survey,
+        "validate": validate,
+        "pretty_print": pretty_print,
+        "enketo": enketo,
+        "default_language": default_language,
+        "file_type": file_type,
+        "validate_via_stdin": validate_via_stdin,
+        "profile": profile,
+    }
+    pending: set[Future] = set()
+    try:
+        for index, xlsform in enumerate(xlsforms):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(pool.submit(_convert_many_one, index, xlsform, **kwargs))
+        for future in as_completed(pending):
+            yield future.result()
+        pending = set()
+    finally:
+        for future in pending:
+            future.cancel()
+        if pool is not executor:
+            pool.shutdown(wait=True)
+
+
 def _create_parser():
     """
     Parse command line arguments.
     """
     parser = argparse.ArgumentParser()
-    parser.add_argument(
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument(
         "path_to_XLSForm",
         help="Path to the Excel XLSX file with the XLSForm definition.",
+        nargs="?",
+    )
+    inputs.add_argument(
+        "--batch",
+        nargs="+",
+        metavar="PATH",
+        help="Convert many XLSForms. Each PATH is an XLSForm file, or a directory of "
+        "XLS/XLSX/XLSM files. Each XForm is saved next to its XLSForm (or in the "
+        "output_dir), with any itemsets.csv in a '[form name]-media' directory. "
+        "A JSON status line is printed for each XLSForm, as with --json.",
     )
     parser.add_argument("output_path", help="Path to save the output to.", nargs="?")
+    parser.add_argument(
+        "--output_dir",
+        help="With --batch, the directory to save the outputs to.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="With --batch, the number of XLSForms to convert in parallel. "
+        "Defaults to the number of CPUs.",
+    )
     parser.add_argument(
         "--json",
         action="store_true",
@@ -218,41 +485,180 @@ def _validator_args_logic(args):
     return args
 
 
-def main_cli():
-    parser = _create_parser()
-    raw_args = parser.parse_args()
-    args = _validator_args_logic(args=raw_args)
+def _convert_with_response(
+    xlsform_path: str | PathLike[str],
+    xform_path: str | PathLike[str],
+    validate: bool,
+    pretty_print: bool,
+    enketo: bool,
+    itemsets_path: str | PathLike[str] | None = None,
+) -> dict:
+    """Run xls2xform_convert and capture the result in the CLI JSON response format."""
+    # Store everything in a list just in case the user wants to output
+    # as a JSON encoded string.
+    response = {"code": None, "message": None, "warnings": []}
+
+    try:
+        response["warnings"] = xls2xform_convert(
+            xlsform_path=xlsform_path,
+            xform_path=xform_path,
+            validate=validate,
+            pretty_print=pretty_print,
+            enketo=enketo,
+            itemsets_path=itemsets_path,
+        )
+
+        response["code"] = 100
+        response["message"] = "Ok!"
+
+        if response["warnings"]:
+            response["code"] = 101
+            response["message"] = "Ok with warnings."
+
+    except Exception as e:
+        # Catch the exception by default.
+        response["code"] = 999
+        response["message"] = str(e)
+
+    return response
+
+
+def _get_batch_inputs(paths: Iterable[str]) -> list[Path]:
+    """
+    Get the XLSForm file paths to convert in batch mode.
 
-    # auto generate an output path if one was not given
-    if args.output_path is None:
-        args.output_path = get_xml_path(args.path_to_XLSForm)
+    Files are used as-is. Directories are searched (not recursively) for spreadsheets,
+    but not CSV or Markdown files since these are used for other things like itemsets.
+    """
+    spreadsheets = {
+        SupportedFileTypes.xlsx.value,
+        SupportedFileTypes.xlsm.value,
+        SupportedFileTypes.xls.value,
+    }
+    inputs = {}
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            for child in sorted(path.iterdir()):
+                if (
+                    child.is_file()
+                    and child.suffix.lower() in spreadsheets
+                    and not child.name.startswith("~$")  # Excel lock file
+                ):
+                    inputs[child] = None
+        else:
+            inputs[path] = None
+    return list(inputs)
 
-    if args.json:
-        # Store everything in a list just in case the user wants to output
-        # as a JSON encoded string.
-        response = {"code": None, "message": None, "warnings": []}
 
-        try:
-            response["warnings"] = xls2xform_convert(
-                xlsform_path=args.path_to_XLSForm,
-                xform_path=args.output_path,
+def _get_batch_xform_path(xlsform_path: Path, output_dir: str | None) -> Path:
+    if output_dir is None:
+        return xlsform_path.with_suffix(".xml")
+    else:
+        return Path(output_dir) / f"{xlsform_path.stem}.xml"
+
+
+def _batch_convert_one(
+    xlsform_path: Path,
+    xform_path: Path,
+    validate: bool,
+    pretty_print: bool,
+    enketo: bool,
+) -> dict:
+    """Convert one XLSForm in batch mode, returning the JSON response."""
+    itemsets_path = xform_path.parent / f"{xform_path.stem}-media" / "itemsets.csv"
+    response = {"path": str(xlsform_path)}
+    response.update(
+        _convert_with_response(
+            xlsform_path=xlsform_path,
+            xform_path=xform_path,
+            validate=validate,
+            pretty_print=pretty_print,
+            enketo=enketo,
+            itemsets_path=itemsets_path,
+        )
+    )
+    return response
+
+
+def _batch_cli(args) -> None:
+    """
+    Convert many XLSForms in parallel, printing a JSON status line for each.
+
+    Each worker process converts many XLSForms, so the interpreter start up and other
+    one-off setup costs (such as building the expression parser) are paid once per
+    worker rather than once per XLSForm.
+    """
+    inputs = _get_batch_inputs(args.batch)
+    if args.output_dir is not None:
+        Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    jobs = args.jobs
+    if jobs is not None and jobs < 1:
+        raise PyXFormError("The number of --jobs must be at least 1.")
+    if not inputs:
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_warm_up) as executor:
+        futures = {}
+        xform_paths = {}
+        for xlsform_path in inputs:
+            xform_path = _get_batch_xform_path(xlsform_path, args.output_dir)
+            prior = xform_paths.get(xform_path)
+            if prior is not None:
+                response = {
+                    "path": str(xlsform_path),
+                    "code": 999,
+                    "message": f"The output path '{xform_path}' is already used for "
+                    f"the XLSForm '{prior}'.",
+                    "warnings": [],
+                }
+                logger.info(json.dumps(response))
+                continue
+            xform_paths[xform_path] = xlsform_path
+            future = executor.submit(
+                _batch_convert_one,
+                xlsform_path=xlsform_path,
+                xform_path=xform_path,
                 validate=args.odk_validate,
                 pretty_print=args.pretty_print,
                 enketo=args.enketo_validate,
             )
+            futures[future] = xlsform_path
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                # e.g. BrokenProcessPool if a worker died, so report it for this file
+                # and carry on with the rest.
+                response = {
+                    "path": str(futures[future]),
+                    "code": 999,
+                    "message": str(e) or type(e).__name__,
+                    "warnings": [],
+                }
+            logger.info(json.dumps(response))
 
-            response["code"] = 100
-            response["message"] = "Ok!"
 
-            if response["warnings"]:
-                response["code"] = 101
-                response["message"] = "Ok with warnings."
+def main_cli():
+    parser = _create_parser()
+    raw_args = parser.parse_args()
+    args = _validator_args_logic(args=raw_args)
 
-        except Exception as e:
-            # Catch the exception by default.
-            response["code"] = 999
-            response["message"] = str(e)
+    if args.batch:
+        _batch_cli(args=args)
+        return
 
+    # auto generate an output path if one was not given
+    if args.output_path is None:
+        args.output_path = get_xml_path(args.path_to_XLSForm)
+
+    if args.json:
+        response = _convert_with_response(
+            xlsform_path=args.path_to_XLSForm,
+            xform_path=args.output_path,
+            validate=args.odk_validate,
+            pretty_print=args.pretty_print,
+            enketo=args.enketo_validate,
+        )
         logger.info(json.dumps(response))
     else:
         try:
@@ -0,0 +1,493 @@
+"""
+A streaming reader for the XLSX cell data used by pyxform.
+
+The sheet XML is parsed with expat handlers straight from the zip archive, so that only
+the cell values are created (not cell or element objects), and cells outside of the
+wanted columns are skipped. The results are the same as openpyxl in read-only and
+data-only mode (as previously used by pyxform), including the conversion of numbers
+with a date format to dates or times.
+"""
+
+import posixpath
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import IO, Any, BinaryIO
+from warnings import warn
+from xml.parsers import expat
+from zipfile import ZipFile
+
+from defusedxml import EntitiesForbidden, ExternalReferenceForbidden
+from defusedxml.ElementTree import fromstring
+from openpyxl.styles.numbers import (
+    builtin_format_code,
+    is_date_format,
+    is_timedelta_format,
+)
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import (
+    CALENDAR_MAC_1904,
+    WINDOWS_EPOCH,
+    from_excel,
+    from_ISO8601,
+)
+
+SHEET_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+CONTENT_TYPES_NS = "http://schemas.openxmlformats.org/package/2006/content-types"
+CONTENT_TYPES_PATH = "[Content_Types].xml"
+STYLES_PATH = "xl/styles.xml"
+SHARED_STRINGS_TYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+)
+WORKBOOK_TYPES = (
+    "application/vnd.ms-excel.template.macroEnabled.main+xml",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.template.main+xml",
+    "application/vnd.ms-excel.sheet.macroEnabled.main+xml",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml",
+)
+CHUNK_SIZE = 1 << 16
+
+# Element names as reported by expat with namespace_separator="}".
+_NS = SHEET_MAIN_NS + "}"
+_ROW = _NS + "row"
+_CELL = _NS + "c"
+_VALUE = _NS + "v"
+_INLINE_STRING = _NS + "is"
+_STRING_ITEM = _NS + "si"
+_TEXT = _NS + "t"
+_RUN = _NS + "r"
+_DIMENSION = _NS + "dimension"
+_DIGITS = "0123456789"
+
+
+def _create_parser() -> expat.XMLParserType:
+    """Create an expat parser that refuses entity declarations, as with defusedxml."""
+
+    def entity_decl(name, is_parameter_entity, value, base, sysid, pubid, notation_name):
+        raise EntitiesForbidden(name, value, base, sysid, pubid, notation_name)
+
+    def unparsed_entity_decl(name, base, sysid, pubid, notation_name):
+        raise EntitiesForbidden(name, None, base, sysid, pubid, notation_name)
+
+    def external_entity_ref(context, base, sysid, pubid):
+        raise ExternalReferenceForbidden(context, base, sysid, pubid)
+
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+    parser.EntityDeclHandler = entity_decl
+    parser.UnparsedEntityDeclHandler = unparsed_entity_decl
+    parser.ExternalEntityRefHandler = external_entity_ref
+    return parser
+
+
+def _parse_chunks(parser: expat.XMLParserType, source: IO[bytes]) -> Iterator[None]:
+    """Feed the source to the parser, yielding after each chunk."""
+    while chunk := source.read(CHUNK_SIZE):
+        parser.Parse(chunk, False)
+        yield
+    parser.Parse(b"", True)
+    yield
+
+
+@lru_cache(maxsize=1024)
+def _column_index(letters: str) -> int:
+    return column_index_from_string(letters.replace("$", ""))
+
+
+def _cast_number(value: str) -> int | float:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _is_true(value: str | None) -> bool:
+    return value is not None and value.lower() in {"1", "true"}
+
+
+class _TextCollector:
+    """
+    Collect the text content of a string item (<si> or <is>), ignoring formatting.
+
+    As with openpyxl, the content is the text of the last direct <t> child, then the
+    text of the last <t> in each rich text run (<r>). Phonetic text is ignored.
+    """
+
+    __slots__ = ("chunks", "depth", "in_run", "in_text", "plain", "run_text", "runs")
+
+    def __init__(self):
+        self.depth: int = 0  # Of the current element, relative to the string item.
+        self.in_run: bool = False
+        self.in_text: bool = False
+        self.chunks: list[str] = []
+        self.plain: str | None = None
+        self.run_text: str | None = None
+        self.runs: list[str] = []
+
+    def start(self, name: str) -> None:
+        self.depth += 1
+        if name == _TEXT and (self.depth == 1 or (self.depth == 2 and self.in_run)):
+            self.in_text = True
+            self.chunks = []
+        elif name == _RUN and self.depth == 1:
+            self.in_run = True
+            self.run_text = None
+
+    def end(self, name: str) -> None:
+        if self.in_text:
+            self.in_text = False
+            text = "".join(self.chunks) or None
+            if self.depth == 1:
+                self.plain = text
+            else:
+                self.run_text = text
+        elif self.in_run and self.depth == 1:
+            self.in_run = False
+            if self.run_text is not None:
+                self.runs.append(self.run_text)
+        self.depth -= 1
+
+    def data(self, text: str) -> None:
+        if self.in_text:
+            self.chunks.append(text)
+
+    def content(self) -> str:
+        if self.plain is None:
+            return "".join(self.runs)
+        return "".join((self.plain, *self.runs))
+
+
+def read_shared_strings(source: IO[bytes]) -> list[str]:
+    """Read the shared strings table, as plain text."""
+    strings = []
+    parser = _create_parser()
+    collector = None
+
+    def start(name, attrs):
+        nonlocal collector
+        if collector is not None:
+            collector.start(name)
+        elif name == _STRING_ITEM:
+            collector = _TextCollector()
+
+    def end(name):
+        nonlocal collector
+        if collector is None:
+            return
+        if name == _STRING_ITEM and collector.depth == 0:
+            strings.append(collector.content().replace("x005F_", ""))
+            collector = None
+        else:
+            collector.end(name)
+
+    def data(text):
+        if collector is not None:
+            collector.data(text)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = data
+    for _ in _parse_chunks(parser, source):
+        pass
+    return strings
+
+
+class XlsxSheet:
+    """
+    The rows of a worksheet, read on demand.
+
+    Iterating the sheet yields a list of (column index, value) pairs for each row,
+    starting from the first row, and including an empty list for each missing row. The
+    column index starts at 0, and values that are None are omitted. As with openpyxl,
+    rows and columns outside of the sheet dimensions (if specified) are not read.
+
+    The `columns` filter may be changed while iterating, e.g. to skip reading the
+    cells that don't have a column header.
+    """
+
+    def __init__(self, workbook: "XlsxWorkbook", name: str, path: str | None):
+        self.workbook: XlsxWorkbook = workbook
+        self.name: str = name
+        self.path: str | None = path
+        self.columns: dict[int, Any] | None = None
+
+    def __iter__(self) -> Iterator[list[tuple[int, Any]]]:
+        if self.path is None:  # Not a worksheet, e.g. a chartsheet.
+            return
+        with self.workbook.archive.open(self.path) as source:
+            yield from self._iter_rows(source)
+
+    def _iter_rows(self, source: IO[bytes]) -> Iterator[list[tuple[int, Any]]]:
+        workbook = self.workbook
+        shared_strings = workbook.shared_strings
+        date_formats = workbook.date_formats
+        timedelta_formats = workbook.timedelta_formats
+        epoch = workbook.epoch
+
+        # Rows parsed from the current chunk: (row number, cells, cells are in order).
+        parsed_rows = []
+        max_col = max_row = None
+        row_counter = col_counter = 0
+        row_cells = []
+        row_ordered = True
+        # The current cell: its column, type, style, whether it's wanted, and value.
+        cell_column = -1
+        cell_type = "n"
+        cell_style = 0
+        cell_wanted = False
+        cell_text = None
+        cell_has_text = False
+        value_chunks = None
+        inline = None
+
+        def start(name, attrs):
+            nonlocal max_col, max_row, row_counter, col_counter, row_cells, row_ordered
+            nonlocal cell_column, cell_type, cell_style, cell_wanted
+            nonlocal cell_text, cell_has_text, value_chunks, inline
+            if inline is not None:
+                inline.start(name)
+            elif name == _VALUE:
+                # Like openpyxl, use the first <v>, or the first <is> for inlineStr.
+                if cell_wanted and not cell_has_text and cell_type != "inlineStr":
+                    cell_has_text = True
+                    value_chunks = []
+            elif name == _CELL:
+                coordinate = attrs.get("r")
+                if coordinate:
+                    col_counter = _column_index(coordinate.rstrip(_DIGITS))
+                else:
+                    col_counter += 1
+                columns = self.columns
+                if columns is None:
+                    cell_wanted = max_col is None or col_counter <= max_col
+                else:
+                    cell_wanted = (col_counter - 1) in columns
+                if cell_wanted and col_counter - 1 <= cell_column:
+                    row_ordered = False
+                cell_column = col_counter - 1
+                cell_type = attrs.get("t", "n")
+                style = attrs.get("s")
+                cell_style = int(style) if style else 0
+                cell_text = None
+                cell_has_text = False
+            elif name == _INLINE_STRING:
+                if cell_wanted and not cell_has_text and cell_type == "inlineStr":
+                    cell_has_text = True
+                    inline = _TextCollector()
+            elif name == _ROW:
+                r = attrs.get("r")
+                if r is None:
+                    row_counter += 1
+                else:
+                    try:
+                        row_counter = int(r)
+                    except ValueError:
+                        number = float(r)
+                        if not number.is_integer():
+                            raise ValueError(f"{r} is not a valid row number") from None
+                        row_counter = int(number)
+                col_counter = 0
+                cell_column = -1
+                row_cells = []
+                row_ordered = True
+            elif name == _DIMENSION:
+                ref = attrs.get("ref")
+                if ref:
+                    _, _, max_col, max_row = range_boundaries(ref)
+
+        def end(name):
+            nonlocal cell_text, value_chunks, inline
+            if inline is not None:
+                if name == _INLINE_STRING and inline.depth == 0:
+                    cell_text = inline.content()
+                    inline = None
+                else:
+                    inline.end(name)
+            elif value_chunks is not None:
+                # The <v> element has no children.
+                cell_text = "".join(value_chunks) or None
+                value_chunks = None
+            elif name == _CELL:
+                if cell_text is not None:
+                    row_cells.append((cell_column, get_value(cell_text)))
+            elif name == _ROW:
+                parsed_rows.append((row_counter, row_cells, row_ordered))
+
+        def data(text):
+            if value_chunks is not None:
+                value_chunks.append(text)
+            elif inline is not None:
+                inline.data(text)
+
+        def get_value(text: str) -> Any:
+            if cell_type == "n":
+                value = _cast_number(text)
+                if cell_style in date_formats:
+                    try:
+                        return from_excel(
+                            value, epoch, timedelta=cell_style in timedelta_formats
+                        )
+                    except (OverflowError, ValueError):
+                        warn(
+                            f"Cell in row {row_counter}, column {cell_column + 1} is "
+                            f"marked as a date but the serial value {value} is outside "
+                            "the limits for dates. The cell will be treated as an error.",
+                            stacklevel=2,
+                        )
+                        return "#VALUE!"
+                return value
+            elif cell_type == "s":
+                return shared_strings[int(text)]
+            elif cell_type == "b":
+                return bool(int(text))
+            elif cell_type == "d":
+                return from_ISO8601(text)
+            else:  # "inlineStr", "str" (formula result), "e" (error), or unknown.
+                return text
+
+        parser = _create_parser()
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = data
+
+        counter = 1
+        for _ in _parse_chunks(parser, source):
+            for idx, cells, ordered in parsed_rows:
+                if max_row is not None and idx > max_row:
+                    return
+                # Some rows may be missing.
+                while counter < idx:
+                    counter += 1
+                    yield []
+                if counter <= idx:
+                    counter += 1
+                    if not ordered:
+                        # Out of order or repeated columns: the last cell wins.
+                        cells = sorted(dict(cells).items())
+                    yield cells
+            parsed_rows.clear()
+
+
+class XlsxWorkbook:
+    """
+    An XLSX workbook, with the sheets in workbook order.
+
+    Call `close` after use, or use as a context manager.
+    """
+
+    def __init__(self, data: BinaryIO):
+        """
+        :param data: The XLSX file content.
+        """
+        if not hasattr(data, "read"):
+            raise TypeError(f"Expected a file-like object, got {type(data).__name__}.")
+        self.archive: ZipFile = ZipFile(data)
+        try:
+            self._read()
+        except BaseException:
+            self.archive.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        self.archive.close()
+
+    def _read(self) -> None:
+        names = set(self.archive.namelist())
+        workbook_path, strings_path = self._read_content_types()
+
+        self.shared_strings: list[str] = []
+        if strings_path is not None:
+            with self.archive.open(strings_path) as source:
+                self.shared_strings = read_shared_strings(source)
+
+        self.date_formats: set[int] = set()
+        self.timedelta_formats: set[int] = set()
+        if STYLES_PATH in names:
+            self._read_styles()
+
+        workbook = fromstring(self.archive.read(workbook_path))
+        self.epoch = WINDOWS_EPOCH
+        properties = workbook.find(f"{{{SHEET_MAIN_NS}}}workbookPr")
+        if properties is not None and _is_true(properties.get("date1904")):
+            self.epoch = CALENDAR_MAC_1904
+
+        rels = self._read_rels(workbook_path)
+        self.sheets: list[XlsxSheet] = []
+        for sheet in workbook.iterfind(
+            f"{{{SHEET_MAIN_NS}}}sheets/{{{SHEET_MAIN_NS}}}sheet"
+        ):
+            rel_id = sheet.get(f"{{{REL_NS}}}id")
+            if not rel_id:
+                continue
+            target, rel_type = rels[rel_id]
+            if target not in names:
+                continue
+            path = None if "chartsheet" in rel_type else target
+            self.sheets.append(
+                XlsxSheet(workbook=self, name=sheet.get("name"), path=path)
+            )
+
+    def _read_content_types(self) -> tuple[str, str | None]:
+        """Find the workbook and shared strings paths."""
+        content_types = fromstring(self.archive.read(CONTENT_TYPES_PATH))
+        overrides = {}
+        for override in content_types.iterfind(f"{{{CONTENT_TYPES_NS}}}Override"):
+            overrides.setdefault(override.get("ContentType"), override.get("PartName"))
+        workbook_path = next(
+            (overrides[t] for t in WORKBOOK_TYPES if overrides.get(t)), None
+        )
+        if workbook_path is None:
+            defaults = {
+                d.get("ContentType")
+                for d in content_types.iterfind(f"{{{CONTENT_TYPES_NS}}}Default")
+            }
+            if not defaults.intersection(WORKBOOK_TYPES):
+                raise OSError("File contains no valid workbook part")
+            workbook_path = "/xl/workbook.xml"
+        strings_path = overrides.get(SHARED_STRINGS_TYPE)
+        return workbook_path[1:], strings_path[1:] if strings_path else None
+
+    def _read_rels(self, part_path: str) -> dict[str, tuple[str, str]]:
+        """Get the relationship targets (as archive paths) and types, by ID."""
+        folder, part_name = posixpath.split(part_path)
+        root = fromstring(
+            self.archive.read(posixpath.join(folder, "_rels", f"{part_name}.rels"))
+        )
+        rels = {}
+        for rel in root.iterfind(f"{{{PKG_REL_NS}}}Relationship"):
+            target = rel.get("Target")
+            if rel.get("TargetMode") != "External":
+                if target.startswith("/"):
+                    target = target[1:]
+                else:
+                    # Relative to the folder of the part (not the _rels folder).
+                    target = posixpath.normpath(posixpath.join(folder, target))
+            rels[rel.get("Id")] = (target, rel.get("Type") or "")
+        return rels
+
+    def _read_styles(self) -> None:
+        """Find the cell styles that have a date or time number format."""
+        styles = fromstring(self.archive.read(STYLES_PATH))
+        custom = {
+            int(f.get("numFmtId")): f.get("formatCode")
+            for f in styles.iterfind(
+                f"{{{SHEET_MAIN_NS}}}numFmts/{{{SHEET_MAIN_NS}}}numFmt"
+            )
+        }
+        cell_styles = styles.iterfind(f"{{{SHEET_MAIN_NS}}}cellXfs/{{{SHEET_MAIN_NS}}}xf")
+        for idx, xf in enumerate(cell_styles):
+            format_id = int(xf.get("numFmtId", 0))
+            if format_id in custom:
+                fmt = custom[format_id]
+            else:
+                fmt = builtin_format_code(format_id)
+            if is_date_format(fmt):
+                self.date_formats.add(idx)
+            if is_timedelta_format(fmt):
+                self.timedelta_formats.add(idx)
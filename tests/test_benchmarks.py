@@ -0,0 +1,111 @@
+"""
+Test the benchmarks package.
+"""
+
+import copy
+import json
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase
+
+from benchmarks.__main__ import main
+from benchmarks.compare import compare
+from benchmarks.generators import FormSpec, make_markdown, make_xlsx
+from benchmarks.runner import TOTAL, run_suite
+from pyxform.xls2json_backends import SupportedFileTypes
+from pyxform.xls2xform import convert
+
+from tests.utils import get_temp_dir
+
+SPEC = FormSpec(
+    questions=9, choice_lists=2, options=3, repeat_depth=2, languages=2, references=3
+)
+
+
+class TestGenerators(TestCase):
+    def test_make_markdown__ok(self):
+        """Should generate a valid form with the requested shape."""
+        result = convert(
+            xlsform=make_markdown(SPEC), file_type=SupportedFileTypes.md.value
+        )
+        self.assertEqual([], result.warnings)
+        xform = result.xform
+        self.assertEqual(9, xform.count("<input ") + xform.count("<select1 "))
+        self.assertEqual(5, xform.count("<select1 "))
+        self.assertEqual(2, xform.count("<repeat "))
+        self.assertIn('<repeat nodeset="/data/r1/r2">', xform)
+        self.assertIn('<translation lang="French (fr)">', xform)
+        self.assertIn(
+            '<bind nodeset="/data/r1/r2/q8" type="string" '
+            "relevant=\" ../../q5  != '' and  ../q6  != '' and  ../q7  != ''\"/>",
+            xform,
+        )
+
+    def test_make_xlsx__same_as_markdown(self):
+        """Should generate the same form in XLSX format."""
+        md = convert(xlsform=make_markdown(SPEC), file_type=SupportedFileTypes.md.value)
+        xlsx = convert(
+            xlsform=BytesIO(make_xlsx(SPEC)), file_type=SupportedFileTypes.xlsx.value
+        )
+        self.assertEqual(md.xform, xlsx.xform)
+
+    def test_form_spec__bad_args__raises(self):
+        """Should raise an error for unsupported languages or empty choice lists."""
+        with self.assertRaises(ValueError):
+            FormSpec(questions=1, languages=100)
+        with self.assertRaises(ValueError):
+            FormSpec(questions=1, choice_lists=1)
+
+
+class TestRunAndCompare(TestCase):
+    def test_run_suite__ok(self):
+        """Should report each stage for each case and format."""
+        results = run_suite(
+            cases={"small": SPEC}, formats=("md", "xlsx"), repeat=2, memory=True
+        )
+        self.assertEqual({"small[md]", "small[xlsx]"}, set(results["results"]))
+        stages = results["results"]["small[md]"]["stages"]
+        self.assertEqual(
+            {
+                "get_xlsform",
+                "workbook_to_json",
+                "create_survey_element_from_dict",
+                "to_xml",
+                TOTAL,
+            },
+            set(stages),
+        )
+        for stage in stages.values():
+            self.assertGreater(stage["wall_median"], 0)
+            self.assertGreater(stage["memory_peak"], 0)
+
+    def test_compare__regressions_and_improvements(self):
+        """Should report changes above the threshold and minimum, and missing results."""
+        baseline = run_suite(cases={"small": SPEC}, repeat=1)
+        current = copy.deepcopy(baseline)
+        stages = current["results"]["small[xlsx]"]["stages"]
+        stages["to_xml"]["wall_median"] += 1.0
+        stages["get_xlsform"]["wall_median"] = 0.0
+        baseline["results"]["other[xlsx]"] = {"stages": {}}
+
+        observed = compare(baseline=baseline, current=current, min_time=0.0)
+        self.assertEqual(["to_xml"], [c.stage for c in observed.regressions])
+        self.assertEqual(["get_xlsform"], [c.stage for c in observed.improvements])
+        self.assertEqual(["other[xlsx]"], observed.missing)
+
+        observed = compare(baseline=baseline, current=current, min_time=2.0)
+        self.assertEqual([], observed.regressions)
+
+    def test_cli__ok(self):
+        """Should save the results, and fail the comparison if there is a regression."""
+        with get_temp_dir() as td:
+            baseline_path = Path(td) / "baseline.json"
+            current_path = Path(td) / "current.json"
+            args = ["run", "--case", "questions", "--repeat", "1", "--scale", "0.01"]
+            self.assertEqual(0, main([*args, "--output", str(baseline_path)]))
+            self.assertEqual(0, main(["compare", str(baseline_path), str(baseline_path)]))
+
+            current = json.loads(baseline_path.read_text())
+            current["results"]["questions[xlsx]"]["stages"][TOTAL]["wall_median"] += 1.0
+            current_path.write_text(json.dumps(current))
+            self.assertEqual(1, main(["compare", str(baseline_path), str(current_path)]))
@@ -1,4 +1,7 @@
+from unittest import TestCase
+
 from pyxform.errors import ErrorCode
+from pyxform.question import Itemset, Option
 
 from tests.pyxform_test_case import PyxformTestCase
 from tests.xpath_helpers.choices import xpc
@@ -609,3 +612,50 @@ class TestChoicesSheet(PyxformTestCase):
             md=md,
             xml__xpath_match=[xpc.model_instance_choices_label("c1", ((".n", "N1"),))],
         )
+
+
+class TestItemset(TestCase):
+    def test_itemset__columns(self):
+        """Should store the choices by column, with unused columns as None."""
+        observed = Itemset(
+            name="c1",
+            choices=[
+                {"name": "a", "label": "A", "geo": "1", "area": "x"},
+                {"name": "b", "label": "B", "geo": "2", "area": "y"},
+                {"name": "c"},
+            ],
+        )
+        self.assertEqual(["a", "b", "c"], observed.names)
+        self.assertEqual(["A", "B", None], observed.labels)
+        self.assertIsNone(observed.media)
+        self.assertIsNone(observed.sms_options)
+        self.assertEqual(
+            [(("geo", "area"), ("1", "x")), (("geo", "area"), ("2", "y")), None],
+            observed.extra_data,
+        )
+        self.assertIs(observed.extra_data[0][0], observed.extra_data[1][0])
+        self.assertFalse(observed.requires_itext)
+
+    def test_itemset__options(self):
+        """Should create the same Options as from the choices, when iterated."""
+        choices = [
+            {"name": "a", "label": {"en": "A"}, "media": {"image": "a.png"}, "geo": "1"},
+            {"name": "b", "label": {"en": "B"}, "sms_option": "b"},
+        ]
+        observed = Itemset(name="c1", choices=choices)
+        self.assertTrue(observed.requires_itext)
+        self.assertEqual([Option(**c) for c in choices], list(observed))
+        self.assertEqual(
+            [o.to_json_dict() for o in observed.options],
+            [Option(**c).to_json_dict() for c in choices],
+        )
+
+    def test_itemset__options__created_once(self):
+        """Should keep the Options once created, so changes to them are kept."""
+        observed = Itemset(name="c1", choices=[{"name": "a", "label": "A"}])
+        self.assertIsNone(observed._options)
+        options = observed.options
+        options[0].label = "Changed"
+        self.assertIs(options, observed.options)
+        self.assertEqual(list(options), list(observed))
+        self.assertEqual("Changed", observed.options[0].label)
@@ -6,12 +6,18 @@ See also test_external_instances
 
 import os
 from dataclasses import dataclass, field
+from io import BytesIO, StringIO
+from unittest import mock
 
 from pyxform import aliases
 from pyxform import constants as co
 from pyxform.errors import ErrorCode, PyXFormError
-from pyxform.xls2json_backends import md_table_to_workbook
-from pyxform.xls2xform import get_xml_path, xls2xform_convert
+from pyxform.xls2json_backends import (
+    SheetLoader,
+    XlsxSheetLoader,
+    md_table_to_workbook,
+)
+from pyxform.xls2xform import convert, get_xml_path, xls2xform_convert
 
 from tests.pyxform_test_case import PyxformTestCase
 from tests.utils import get_temp_dir
@@ -460,6 +466,68 @@ class TestSelectOneExternal(PyxformTestCase):
             # Should have excluded column with "empty header" in the last row.
             self.assertEqual('"suburb","Footscray","vic","melbourne"\n', rows[-1])
 
+    def test_itemset_csv_streamed__same_as_string(self):
+        """Should write the same itemsets CSV, without loading the whole sheet."""
+        md = """
+        | survey |                            |        |        |                                 |
+        |        | type                       | name   | label  | choice_filter                   |
+        |        | select_one state           | state  | State  |                                 |
+        |        | select_one_external city   | city   | City   | state=${state}                  |
+        |        | select_one_external suburb | suburb | Suburb | state=${state} and city=${city} |
+        """
+        data = BytesIO()
+        md_table_to_workbook(md + self.all_choices).save(data)
+        expected = convert(xlsform=data.getvalue())
+        with (
+            mock.patch.object(
+                SheetLoader,
+                "read_sheet",
+                autospec=True,
+                side_effect=SheetLoader.read_sheet,
+            ) as read_sheet,
+            mock.patch.object(
+                XlsxSheetLoader,
+                "close",
+                autospec=True,
+                side_effect=XlsxSheetLoader.close,
+            ) as close,
+        ):
+            observed = convert(xlsform=data.getvalue(), stream_itemsets=True)
+            self.assertIsNone(observed.itemsets)
+            self.assertEqual(0, close.call_count)
+            sink = StringIO(newline="")
+            observed.itemsets_csv.write(sink=sink)
+            self.assertEqual(1, close.call_count)
+        self.assertEqual(expected.itemsets, sink.getvalue())
+        self.assertNotIn(
+            co.EXTERNAL_CHOICES,
+            [c.kwargs["sheet_name"] for c in read_sheet.call_args_list],
+        )
+        # The workbook is closed after writing, so it can't be written again.
+        with self.assertRaises(PyXFormError):
+            observed.itemsets_csv.getvalue()
+
+    def test_itemset_csv__workbook_closed(self):
+        """Should close the workbook once the external choices are read."""
+        md = """
+        | survey |                          |       |       |                |
+        |        | type                     | name  | label | choice_filter  |
+        |        | select_one state         | state | State |                |
+        |        | select_one_external city | city  | City  | state=${state} |
+        """
+        data = BytesIO()
+        md_table_to_workbook(md + self.all_choices).save(data)
+        with mock.patch.object(
+            XlsxSheetLoader, "close", autospec=True, side_effect=XlsxSheetLoader.close
+        ) as close:
+            observed = convert(xlsform=data.getvalue())
+            self.assertIsNotNone(observed.itemsets)
+            self.assertEqual(1, close.call_count)
+            close.reset_mock()
+            observed = convert(xlsform=data.getvalue(), stream_itemsets=True)
+            observed.itemsets_csv.close()
+            self.assertEqual(1, close.call_count)
+
     def test_empty_external_choices__errors(self):
         md = """
         | survey           |                          |       |       |               |
@@ -2,10 +2,13 @@
 Testing creation of Surveys using verbose methods
 """
 
+import pickle
 from collections.abc import Generator
 
 from pyxform import Survey
 from pyxform.builder import create_survey_element_from_dict
+from pyxform.question import Question
+from pyxform.question_type_dictionary import QUESTION_TYPE_DICT
 
 from tests.pyxform_test_case import PyxformTestCase
 from tests.utils import prep_class_config
@@ -210,12 +213,12 @@ class Json2XformQuestionValidationTests(PyxformTestCase):
         # Inspect XML Control
         observed = q.xml_control(survey=self.s)
         self.assertEqual("input", observed.nodeName)
-        self.assertEqual("/test/phone_number_q", observed.attributes["ref"].nodeValue)
+        self.assertEqual("/test/phone_number_q", observed.getAttribute("ref"))
         observed_label = observed.childNodes[0]
         self.assertEqual("label", observed_label.nodeName)
         self.assertEqual(
             "jr:itext('/test/phone_number_q:label')",
-            observed_label.attributes["ref"].nodeValue,
+            observed_label.getAttribute("ref"),
         )
         observed_hint = observed.childNodes[1]
         self.assertEqual("hint", observed_hint.nodeName)
@@ -228,8 +231,7 @@ class Json2XformQuestionValidationTests(PyxformTestCase):
             "constraint": r"regex(., '^\d*$')",
         }
         binding = next(q.xml_bindings(survey=self.s))
-        observed = {k: v for k, v in binding.attributes.items()}  # noqa: C416
-        self.assertDictEqual(expected, observed)
+        self.assertDictEqual(expected, binding.attributes)
 
     def test_simple_select_all_question_multilingual(self):
         """
@@ -294,3 +296,51 @@ class Json2XformQuestionValidationTests(PyxformTestCase):
         self.s.add_child(q)
         self.assertEqual(ctw(q.xml_control(survey=self.s)), expected_decimal_control_xml)
         self.assertEqual(ctw(q.xml_bindings(survey=self.s)), expected_decimal_binding_xml)
+
+    def test_question_type_defaults__shared_unless_overridden(self):
+        """Should share the type's default dicts, and merge any question values."""
+        q1 = create_survey_element_from_dict({"type": "text", "name": "q1"})
+        q2 = create_survey_element_from_dict(
+            {"type": "text", "name": "q2", "bind": {"required": "true()"}}
+        )
+        defaults = QUESTION_TYPE_DICT["text"]
+        self.assertNotIn("bind", q1.to_json_dict())
+        self.assertIs(defaults["bind"], q1._get_shared("bind"))
+        self.assertIs(defaults["control"], q1._get_shared("control"))
+        self.assertEqual({"type": "string", "required": "true()"}, q2.bind)
+        self.assertEqual({"type": "string"}, defaults["bind"])
+        self.assertEqual({"required": "true()"}, q2.to_json_dict()["bind"])
+
+    def test_question_type_defaults__modified_after_build(self):
+        """Should apply a change to a question's defaults only to that question."""
+        survey = create_survey_element_from_dict(
+            {
+                "type": "survey",
+                "name": "data",
+                "children": [
+                    {"type": "text", "name": "q1", "label": "Q1"},
+                    {"type": "text", "name": "q2", "label": "Q2"},
+                ],
+            }
+        )
+        q1, q2 = survey.children
+        survey.to_xml(validate=False)
+        self.assertIs(QUESTION_TYPE_DICT["text"]["bind"], q2._get_shared("bind"))
+        q1.bind["required"] = "true()"
+        q1.control.update({"appearance": "multiline"})
+        q1 = pickle.loads(pickle.dumps(q1))  # noqa: S301
+        self.assertEqual({"type": "string", "required": "true()"}, q1.bind)
+        self.assertEqual({"tag": "input", "appearance": "multiline"}, q1.control)
+        self.assertEqual({"type": "string"}, q2.bind)
+        self.assertEqual({"type": "string"}, QUESTION_TYPE_DICT["text"]["bind"])
+        xml = survey.to_xml(validate=False)
+        self.assertIn('<bind nodeset="/data/q1" type="string" required="true()"/>', xml)
+        self.assertIn('<bind nodeset="/data/q2" type="string"/>', xml)
+        self.assertIn('<input ref="/data/q1" appearance="multiline">', xml)
+
+    def test_question_type_defaults__custom_dict_not_shared(self):
+        """Should not share a custom question type dictionary's modifiable dicts."""
+        qtd = {"text": {"bind": {"type": "string"}}}
+        q1 = Question(name="q1", type="text", question_type_dictionary=qtd)
+        qtd["text"]["bind"]["required"] = "true()"
+        self.assertEqual({"type": "string"}, q1.bind)
@@ -6,10 +6,11 @@ from collections.abc import Container
 from dataclasses import dataclass
 from unittest import skip
 
-from pyxform import constants
+from pyxform import aliases, constants
 from pyxform.errors import ErrorCode, PyXFormError
 from pyxform.parsing.sheet_headers import (
     dealias_and_group_headers,
+    iter_dealias_and_group_headers,
     process_header,
     process_row,
     to_snake_case,
@@ -724,6 +725,38 @@ class TestHeaderProcessing(PyxformTestCase):
             err.exception.args[0],
         )
 
+    def test_process_row__grouped_headers(self):
+        """Should group the values for each header path, merging any conflicts."""
+        cases = (
+            # Translations added to an untranslated value, as the default language.
+            (
+                {"label": "A", "label::fr": "B", "label::en": "C"},
+                {"label": {"default": "A", "fr": "B", "en": "C"}},
+            ),
+            # Nested groups.
+            (
+                {"media::image::en": "a", "media::image::fr": "b", "media::audio": "c"},
+                {"media": {"image": {"en": "a", "fr": "b"}, "audio": "c"}},
+            ),
+            # An ungrouped value replaces the group.
+            ({"label::en": "A", "label::default": "B", "label": "C"}, {"label": "C"}),
+            # Merging replaces any empty values with None.
+            (
+                {"hint": "", "label::en": "A", "label::fr": "B"},
+                {"hint": None, "label": {"en": "A", "fr": "B"}},
+            ),
+        )
+        for row, expected in cases:
+            with self.subTest(row):
+                observed = process_row(
+                    sheet_name="survey",
+                    row=row,
+                    header_key={h: tuple(h.split("::")) for h in row},
+                    default_language=constants.DEFAULT_LANGUAGE_VALUE,
+                    row_number=2,
+                )
+                self.assertEqual(expected, observed)
+
     def test_process_row__bad_header_info__dict(self):
         """Should raise an error if incomplete header info is provided."""
         # For dict input, sheet_header guess takes first 100 rows, so additional keys in
@@ -773,3 +806,44 @@ class TestHeaderProcessing(PyxformTestCase):
         questions = "\n".join(question.format(i=i, e="") for i in range(100))
         md = "".join((header, questions, question.format(i=101, e="?")))
         self.assertPyxformXform(md=md)
+
+    def test_iter_dealias_and_group_headers__same_as_dealias_and_group_headers(self):
+        """Should find the same rows as the non-lazy version, with or without headers."""
+        data = [{"list name": "c1", "label::En": "l1"}, {}, {"list name": "c2"}]
+        expected = dealias_and_group_headers(
+            sheet_name="test",
+            sheet_data=data,
+            sheet_header=[dict.fromkeys(data[0])],
+            header_aliases=aliases.list_header,
+            header_columns={"name"},
+        )
+        for sheet_header in ([dict.fromkeys(data[0])], None):
+            with self.subTest(sheet_header):
+                observed = iter_dealias_and_group_headers(
+                    sheet_name="test",
+                    sheet_data=iter(data),
+                    sheet_header=sheet_header,
+                    header_aliases=aliases.list_header,
+                    header_columns={"name"},
+                )
+                self.assertEqual(expected.data, tuple(observed))
+
+    def test_iter_dealias_and_group_headers__no_data__headers_not_checked(self):
+        """Should not check the headers if there is no data, as for the non-lazy one."""
+        observed = iter_dealias_and_group_headers(
+            sheet_name="test",
+            sheet_data=(),
+            sheet_header=[{"list name": None, "list_name": None}],
+            header_aliases=aliases.list_header,
+            header_columns=set(),
+        )
+        self.assertEqual([], list(observed))
+        observed = iter_dealias_and_group_headers(
+            sheet_name="test",
+            sheet_data=({"list name": "c1"},),
+            sheet_header=[{"list name": None, "list_name": None}],
+            header_aliases=aliases.list_header,
+            header_columns=set(),
+        )
+        with self.assertRaises(PyXFormError):
+            list(observed)
@@ -3,10 +3,18 @@ Test pyxform.validators.utils module.
 """
 
 import os
-from unittest import TestCase
+from unittest import TestCase, skipIf
 
+from pyxform.errors import PyXFormError
 from pyxform.validators.error_cleaner import ErrorCleaner
-from pyxform.validators.util import XFORM_SPEC_PATH, check_readable
+from pyxform.validators.util import (
+    STDIN_PATH,
+    XFORM_SPEC_PATH,
+    WarmProcessPool,
+    check_readable,
+    run_popen_with_timeout,
+    stdin_path_supported,
+)
 
 from tests.utils import prep_class_config
 
@@ -69,6 +77,61 @@ class TestCheckReadable(TestCase):
             check_readable(file_path=fake_file, retry_limit=2, wait_seconds=0.1)
 
 
+class TestRunPopenWithTimeout(TestCase):
+    @skipIf(not stdin_path_supported(), "Requires reading stdin via a file path.")
+    def test_input_data__piped_to_stdin(self):
+        """Should find that the input data can be read by the process from stdin."""
+        observed = run_popen_with_timeout(["cat", "/dev/stdin"], 10, input_data=b"<x/>")
+        self.assertEqual(0, observed.return_code)
+        self.assertEqual("<x/>", observed.stdout)
+
+
+@skipIf(not stdin_path_supported(), "Requires reading stdin via a file path.")
+class TestWarmProcessPool(TestCase):
+    def test_run__ok(self):
+        """Should find that each request gets the result for its own input data."""
+        with WarmProcessPool(command=["cat", STDIN_PATH], size=2) as pool:
+            for i in range(5):
+                observed = pool.run(input_data=f"<x{i}/>".encode())
+                self.assertEqual(0, observed.return_code)
+                self.assertFalse(observed.timeout)
+                self.assertEqual(f"<x{i}/>", observed.stdout)
+
+    def test_run__process_exited_while_waiting__restarted(self):
+        """Should find that a process which exited before its request is replaced."""
+        with WarmProcessPool(command=["cat", STDIN_PATH], size=1) as pool:
+            waiting = pool._processes[0]
+            waiting.kill()
+            waiting.wait()
+            observed = pool.run(input_data=b"<x/>")
+            self.assertEqual(0, observed.return_code)
+            self.assertEqual("<x/>", observed.stdout)
+
+    def test_run__error_status_and_stderr(self):
+        """Should find the process exit status and stderr in the result."""
+        command = ["sh", "-c", "cat >&2; exit 3"]
+        with WarmProcessPool(command=command, size=1) as pool:
+            observed = pool.run(input_data=b"oops")
+            self.assertEqual(3, observed.return_code)
+            self.assertEqual("oops", observed.stderr)
+
+    def test_run__timeout(self):
+        """Should find that a request which takes too long is killed."""
+        with WarmProcessPool(command=["sleep", "10"], size=1, timeout=0.2) as pool:
+            observed = pool.run(input_data=b"")
+            self.assertTrue(observed.timeout)
+            observed = pool.run(input_data=b"", timeout=0.1)
+            self.assertTrue(observed.timeout)
+
+    def test_run__closed__raises(self):
+        """Should raise an error if the pool is used after it is closed."""
+        pool = WarmProcessPool(command=["cat", STDIN_PATH], size=1)
+        pool.close()
+        self.assertEqual(0, len(pool._processes))
+        with self.assertRaises(PyXFormError):
+            pool.run(input_data=b"<x/>")
+
+
 class TestErrorMessageCleaning(TestCase):
     def should_clean_odk_validate_stacktrace(self):
         message = """java.lang.NullPointerException Null Pointer\norg.javarosa.xform.parse.XFormParseException Parser"""
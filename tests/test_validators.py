@@ -2,10 +2,23 @@
 Test validators.
 """
 
-from unittest import TestCase
+import os
+import threading
+from pathlib import Path
+from unittest import TestCase, skipIf
 from unittest.mock import patch
 
-from pyxform.validators.odk_validate import check_java_available
+from pyxform.validators import check, odk_validate
+from pyxform.validators.cache import (
+    CacheEntry,
+    ValidationCache,
+    get_validator_version,
+)
+from pyxform.validators.enketo_validate import EnketoValidateError
+from pyxform.validators.odk_validate import ODKValidateError, check_java_available
+from pyxform.validators.util import WarmProcessPool, stdin_path_supported
+
+from tests.utils import get_temp_dir
 
 mock_func = "shutil.which"
 msg = "Form validation failed because Java (8+ required) could not be found."
@@ -27,3 +40,334 @@ class TestValidatorsUtil(TestCase):
             with self.assertRaises(EnvironmentError) as error:
                 check_java_available()
             self.assertIn(msg, str(error.exception))
+
+
+@skipIf(not stdin_path_supported(), "Requires reading stdin via a file path.")
+class TestODKValidateWorkerPool(TestCase):
+    """Test odk_validate.check_xform with a worker pool."""
+
+    def tearDown(self):
+        odk_validate.stop_worker_pool()
+
+    def test_check_xform__uses_pool(self):
+        """Should pass the XForm to a pool process, and keep the warning semantics."""
+        # Stand-in for ODK Validate: echo the XForm to stderr, which is a warning.
+        odk_validate._worker_pool = WarmProcessPool(command=["sh", "-c", "cat >&2"])
+        with patch(mock_func, return_value="/usr/bin/java"):
+            observed = odk_validate.check_xform(xform_data=b"<x/>")
+        self.assertEqual(["ODK Validate Warnings:\n<x/>"], observed)
+
+    def test_check_xform__uses_pool__error(self):
+        """Should raise an error if the pool process reports the XForm is invalid."""
+        odk_validate._worker_pool = WarmProcessPool(
+            command=["sh", "-c", "cat >&2; exit 1"]
+        )
+        with (
+            patch(mock_func, return_value="/usr/bin/java"),
+            self.assertRaises(odk_validate.ODKValidateError) as err,
+        ):
+            odk_validate.check_xform(xform_data=b"<x/>")
+        self.assertIn("ODK Validate Errors:", str(err.exception))
+
+    def test_stop_worker_pool(self):
+        """Should find that stopping the pool closes it and check_xform stops using it."""
+        pool = WarmProcessPool(command=["sh", "-c", "cat >&2"])
+        odk_validate._worker_pool = pool
+        odk_validate.stop_worker_pool()
+        self.assertIsNone(odk_validate._worker_pool)
+        self.assertEqual(0, len(pool._processes))
+
+
+class TestCheckXForm(TestCase):
+    """Test validators.check"""
+
+    def tearDown(self):
+        check.set_concurrency_limit(None)
+
+    def test_check_xform__both__run_concurrently(self):
+        """Should find that both validators are running at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def odk(**kwargs):
+            barrier.wait()
+            return ["odk"]
+
+        def enketo(**kwargs):
+            barrier.wait()
+            return ["enketo"]
+
+        with (
+            patch("pyxform.validators.odk_validate.check_xform", odk),
+            patch("pyxform.validators.enketo_validate.check_xform", enketo),
+        ):
+            observed = check.check_xform("form.xml", odk=True, enketo=True)
+        self.assertEqual(["odk", "enketo"], observed)
+
+    def test_check_xform__both__warnings_order(self):
+        """Should find ODK Validate warnings first, even if Enketo Validate is faster."""
+        enketo_done = threading.Event()
+
+        def odk(**kwargs):
+            enketo_done.wait(timeout=5)
+            return ["odk"]
+
+        def enketo(**kwargs):
+            enketo_done.set()
+            return ["enketo"]
+
+        with (
+            patch("pyxform.validators.odk_validate.check_xform", odk),
+            patch("pyxform.validators.enketo_validate.check_xform", enketo),
+        ):
+            observed = check.check_xform("form.xml", odk=True, enketo=True)
+        self.assertEqual(["odk", "enketo"], observed)
+
+    def test_check_xform__both__errors(self):
+        """Should raise the ODK Validate error first, otherwise the Enketo error."""
+        odk_error = ODKValidateError("ODK Validate Errors:\nbad")
+        enketo_error = EnketoValidateError("Enketo Validate Errors:\nbad")
+        cases = (
+            (odk_error, ["enketo"], ODKValidateError),
+            (odk_error, enketo_error, ODKValidateError),
+            (["odk"], enketo_error, EnketoValidateError),
+        )
+        for odk_result, enketo_result, expected in cases:
+            with (
+                self.subTest(expected=expected),
+                patch(
+                    "pyxform.validators.odk_validate.check_xform",
+                    side_effect=[odk_result],
+                ),
+                patch(
+                    "pyxform.validators.enketo_validate.check_xform",
+                    side_effect=[enketo_result],
+                ),
+                self.assertRaises(expected),
+            ):
+                check.check_xform("form.xml", odk=True, enketo=True)
+
+    def test_check_xform__one_or_none(self):
+        """Should only run the requested validators."""
+        cases = (
+            ((True, False), ["odk"]),
+            ((False, True), ["enketo"]),
+            ((False, False), []),
+        )
+        for (odk, enketo), expected in cases:
+            with (
+                self.subTest(odk=odk, enketo=enketo),
+                patch(
+                    "pyxform.validators.odk_validate.check_xform", return_value=["odk"]
+                ),
+                patch(
+                    "pyxform.validators.enketo_validate.check_xform",
+                    return_value=["enketo"],
+                ),
+            ):
+                observed = check.check_xform("form.xml", odk=odk, enketo=enketo)
+                self.assertEqual(expected, observed)
+
+    def test_set_concurrency_limit(self):
+        """Should find that no more than the limit of validators run at the same time."""
+        lock = threading.Lock()
+        running = [0]
+        max_running = [0]
+
+        def validator(**kwargs):
+            with lock:
+                running[0] += 1
+                max_running[0] = max(max_running[0], running[0])
+            threading.Event().wait(0.05)
+            with lock:
+                running[0] -= 1
+            return []
+
+        check.set_concurrency_limit(1)
+        with (
+            patch("pyxform.validators.odk_validate.check_xform", validator),
+            patch("pyxform.validators.enketo_validate.check_xform", validator),
+        ):
+            threads = [
+                threading.Thread(
+                    target=check.check_xform,
+                    kwargs={"path_to_xform": "form.xml", "odk": True, "enketo": True},
+                )
+                for _ in range(3)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(1, max_running[0])
+
+
+class TestValidationCache(TestCase):
+    """Test validators.cache"""
+
+    def tearDown(self):
+        check.set_cache(None)
+
+    def test_put_get(self):
+        """Should find the stored entry with the same key, and none for other keys."""
+        with get_temp_dir() as td:
+            cache = ValidationCache(directory=td)
+            key = cache.make_key("odk_validate", "v1", b"<x/>")
+            entry = CacheEntry(warnings=["w"], error=None)
+            cache.put(key=key, entry=entry)
+            self.assertEqual(entry, cache.get(key=key))
+            for other in (
+                cache.make_key("enketo_validate", "v1", b"<x/>"),
+                cache.make_key("odk_validate", "v2", b"<x/>"),
+                cache.make_key("odk_validate", "v1", b"<y/>"),
+            ):
+                self.assertIsNone(cache.get(key=other))
+
+    def test_evict__least_recently_used(self):
+        """Should remove the least recently used entries when over the max size."""
+        with get_temp_dir() as td:
+            cache = ValidationCache(directory=td, max_size=1 << 20)
+            keys = [cache.make_key("odk_validate", "v1", bytes([i])) for i in range(3)]
+            for i, key in enumerate(keys):
+                cache.put(key=key, entry=CacheEntry(warnings=[], error=None))
+                os.utime(cache._path(key), ns=(i, i))
+            cache.get(key=keys[0])  # Now the most recently used.
+            size = cache._path(keys[0]).stat().st_size
+            cache.max_size = size * 2
+            cache.evict()
+            self.assertIsNotNone(cache.get(key=keys[0]))
+            self.assertIsNone(cache.get(key=keys[1]))
+            self.assertIsNotNone(cache.get(key=keys[2]))
+
+    def test_put__evicts_only_when_total_over_max_size(self):
+        """Should scan the cache files only when the tracked total is over max size."""
+        with get_temp_dir() as td:
+            cache = ValidationCache(directory=td)
+            keys = [cache.make_key("odk_validate", "v1", bytes([i])) for i in range(3)]
+            entry = CacheEntry(warnings=[], error=None)
+            cache.put(key=keys[0], entry=entry)  # Total unknown, so scan.
+            size = cache._path(keys[0]).stat().st_size
+            self.assertEqual(size, cache._size)
+            cache.max_size = size * 2
+            with patch.object(cache, "evict", wraps=cache.evict) as evict:
+                cache.put(key=keys[0], entry=entry)  # Replaced, so same total.
+                cache.put(key=keys[1], entry=entry)
+                self.assertEqual(0, evict.call_count)
+                self.assertEqual(size * 2, cache._size)
+                os.utime(cache._path(keys[0]), ns=(0, 0))
+                cache.put(key=keys[2], entry=entry)
+                self.assertEqual(1, evict.call_count)
+            self.assertEqual(size * 2, cache._size)
+            self.assertIsNone(cache.get(key=keys[0]))
+            self.assertIsNotNone(cache.get(key=keys[1]))
+            self.assertIsNotNone(cache.get(key=keys[2]))
+
+    def test_get_validator_version(self):
+        """Should find the version changes with the validator file content."""
+        with get_temp_dir() as td:
+            path = Path(td) / "validator.jar"
+            self.assertIsNone(get_validator_version(bin_file_path=str(path)))
+            path.write_bytes(b"1")
+            v1 = get_validator_version(bin_file_path=str(path))
+            path.write_bytes(b"22")
+            v2 = get_validator_version(bin_file_path=str(path))
+            self.assertIsNotNone(v1)
+            self.assertNotEqual(v1, v2)
+
+    @patch("pyxform.validators.check.get_validator_version", return_value="v1")
+    def test_check_xform__cached(self, _):
+        """Should only run the validator once for identical XForm content."""
+        with (
+            get_temp_dir() as td,
+            patch(
+                "pyxform.validators.odk_validate.check_xform", return_value=["w"]
+            ) as odk_mock,
+        ):
+            check.set_cache(ValidationCache(directory=td))
+            for _ in range(2):
+                observed = check.check_xform(xform_data=b"<x/>", odk=True)
+                self.assertEqual(["w"], observed)
+            self.assertEqual(1, odk_mock.call_count)
+            # Different content is not a hit.
+            check.check_xform(xform_data=b"<y/>", odk=True)
+            self.assertEqual(2, odk_mock.call_count)
+            # Bypass the cache.
+            check.check_xform(xform_data=b"<x/>", odk=True, use_cache=False)
+            self.assertEqual(3, odk_mock.call_count)
+
+    @patch("pyxform.validators.check.get_validator_version", return_value="v1")
+    def test_check_xform__cached__from_path(self, _):
+        """Should cache by the file content, and still pass the path to the validator."""
+        with (
+            get_temp_dir() as td,
+            patch(
+                "pyxform.validators.odk_validate.check_xform", return_value=["w"]
+            ) as odk_mock,
+        ):
+            check.set_cache(ValidationCache(directory=Path(td) / "cache"))
+            xform_path = Path(td) / "form.xml"
+            xform_path.write_bytes(b"<x/>")
+            check.check_xform(path_to_xform=xform_path, odk=True)
+            check.check_xform(xform_data=b"<x/>", odk=True)
+            odk_mock.assert_called_once_with(path_to_xform=xform_path, xform_data=None)
+
+    @patch("pyxform.validators.check.get_validator_version", return_value="v1")
+    def test_check_xform__cached__error(self, _):
+        """Should raise the cached error without running the validator again."""
+        error = ODKValidateError("ODK Validate Errors:\nbad", return_code=1)
+        with (
+            get_temp_dir() as td,
+            patch(
+                "pyxform.validators.odk_validate.check_xform", side_effect=error
+            ) as odk_mock,
+        ):
+            check.set_cache(ValidationCache(directory=td))
+            for _ in range(2):
+                with self.assertRaises(ODKValidateError) as err:
+                    check.check_xform(xform_data=b"<x/>", odk=True)
+                self.assertEqual(str(error), str(err.exception))
+            self.assertEqual(1, odk_mock.call_count)
+
+    @patch("pyxform.validators.check.get_validator_version", return_value="v1")
+    def test_check_xform__timeout__not_cached(self, _):
+        """Should not cache a result that is about the validator run, not the XForm."""
+        with (
+            get_temp_dir() as td,
+            patch(
+                "pyxform.validators.odk_validate.check_xform",
+                return_value=["XForm took to long to completely validate."],
+            ) as odk_mock,
+        ):
+            check.set_cache(ValidationCache(directory=td))
+            for _ in range(2):
+                check.check_xform(xform_data=b"<x/>", odk=True)
+            self.assertEqual(2, odk_mock.call_count)
+
+    @patch("pyxform.validators.check.get_validator_version", return_value="v1")
+    def test_check_xform__process_failure__not_cached(self, _):
+        """Should not cache an error from the validator process failing."""
+        errors = (
+            ODKValidateError("ODK Validate Errors:\nbad"),
+            ODKValidateError("ODK Validate Errors:\nbad", return_code=134),
+            ODKValidateError("ODK Validate Errors:\n", return_code=1),
+            ODKValidateError(
+                "ODK Validate Errors:\nException in thread main "
+                "java.lang.OutOfMemoryError: Java heap space",
+                return_code=1,
+            ),
+            OSError(
+                "Form validation failed because Java (8+ required) could not be found."
+            ),
+        )
+        for error in errors:
+            with (
+                self.subTest(error=error),
+                get_temp_dir() as td,
+                patch(
+                    "pyxform.validators.odk_validate.check_xform", side_effect=error
+                ) as odk_mock,
+            ):
+                check.set_cache(ValidationCache(directory=td))
+                for _ in range(2):
+                    with self.assertRaises(type(error)):
+                        check.check_xform(xform_data=b"<x/>", odk=True)
+                self.assertEqual(2, odk_mock.call_count)
@@ -1,8 +1,10 @@
 import os
 
 import psutil
+from pyxform.errors import ErrorCode, PyXFormError, PyXFormWarning
+from pyxform.xls2json import _Warnings, _workbook_to_json, parse_row_type
 from pyxform.xls2json_backends import get_xlsform, md_table_to_workbook
-from pyxform.xls2xform import get_xml_path, xls2xform_convert
+from pyxform.xls2xform import convert, get_xml_path, xls2xform_convert
 
 from tests import example_xls, test_output
 from tests.pyxform_test_case import PyxformTestCase
@@ -620,3 +622,184 @@ class TestXLS2JSONSheetNameHeuristics(PyxformTestCase):
         self.assertIn("my_sheet", d.sheet_names)
         self.assertIn("stettings", d.sheet_names)
         self.assertIn("choices", d.sheet_names)
+
+
+class TestWorkbookToJsonParallelSheets(PyxformTestCase):
+    """Test reading and cleaning the independent sheets in parallel."""
+
+    def test_parallel_sheets__same_result(self):
+        """Should get the same XForm and warnings (in the same order) as one by one."""
+        md = """
+        | survey   |               |      |           |              |
+        |          | type          | name | label     | label::fr    |
+        |          | select_one l1 | q1   | Q1        | Q1           |
+        | choices  |               |      |           |              |
+        |          | list_name     | name | label     | invalid col  |
+        |          | l1            | 1    | C1        | x            |
+        |          | l1            | 2    | C2        |              |
+        | entitees |               |      |           |              |
+        |          | dataset       |      |           |              |
+        |          | trees         |      |           |              |
+        """
+        paths = [
+            os.path.join(example_xls.PATH, f)
+            for f in ("case_insensitivity.xls", "case_insensitivity.xlsx")
+        ]
+        for xlsform in (md, *paths):
+            with self.subTest(xlsform):
+                file_type = ".md" if xlsform == md else None
+                results = [
+                    convert(
+                        xlsform=xlsform, file_type=file_type, parallel_sheets=parallel
+                    )
+                    for parallel in (False, True)
+                ]
+                self.assertEqual(results[0].xform, results[1].xform)
+                self.assertEqual(results[0].warnings, results[1].warnings)
+                if file_type:
+                    observed = results[1].warnings
+                    self.assertEqual(2, len(observed))
+                    self.assertIn("'choices' sheet", observed[0])
+                    self.assertIn("'entitees'", observed[1])
+
+    def test_parallel_sheets__errors__first_sheet_error_raised(self):
+        """Should raise the error for the first sheet in order, as if one by one."""
+        md = """
+        | survey   |               |      |       |
+        |          | name          |      |       |
+        |          | q1            |      |       |
+        | choices  |               |      |       |
+        |          | list_name     |      |       |
+        |          | l1            |      |       |
+        """
+        for parallel in (False, True):
+            with self.subTest(parallel):
+                with self.assertRaises(PyXFormError) as err:
+                    convert(xlsform=md, file_type=".md", parallel_sheets=parallel)
+                self.assertIn("choices", str(err.exception))
+
+
+class TestWorkbookToJsonMaxWarnings(PyxformTestCase):
+    """Test limiting the number of warnings kept."""
+
+    md = """
+    | survey  |           |      |       |      |
+    |         | type      | name | label | hint |
+    |         | text      | q1   | Q1    |      |
+    |         |           |      |       | todo |
+    |         | simserial | q2   |       |      |
+    | choices |           |      |       |      |
+    |         | list_name | name | label |      |
+    |         | l1        | 1    |       |      |
+    """
+
+    def test_max_warnings__default__all_warnings(self):
+        """Should keep and format all warnings, by default."""
+        observed = convert(xlsform=self.md, file_type=".md").warnings
+        self.assertEqual(3, len(observed))
+        self.assertIn("[row : 2] On the 'choices' sheet, the 'label' value", observed[0])
+        self.assertEqual(
+            "[row : 3] Row without name, text, or label is being skipped:\n"
+            "{'hint': 'todo'}",
+            observed[1],
+        )
+        self.assertIn("[row : 4] simserial is no longer supported", observed[2])
+
+    def test_max_warnings__limit__some_warnings(self):
+        """Should keep the first warnings up to the limit, and count the rest."""
+        default = convert(xlsform=self.md, file_type=".md").warnings
+        observed = convert(xlsform=self.md, file_type=".md", max_warnings=1).warnings
+        self.assertEqual(
+            [default[0], "2 more warning(s) not shown, as the limit of 1 was reached."],
+            observed,
+        )
+
+    def test_max_warnings__zero__no_warnings(self):
+        """Should not keep any warnings, if the limit is 0."""
+        observed = convert(xlsform=self.md, file_type=".md", max_warnings=0).warnings
+        self.assertEqual([], observed)
+
+    def test_max_warnings__error__warnings_kept(self):
+        """Should keep the warnings found before an error is raised."""
+        md = """
+        | survey |      |      |       |      |
+        |        | type | name | label | hint |
+        |        |      |      |       | todo |
+        |        |      | q1   | Q1    |      |
+        """
+        warnings = []
+        with self.assertRaises(PyXFormError):
+            convert(xlsform=md, file_type=".md", warnings=warnings)
+        self.assertEqual(1, len(warnings))
+        self.assertIn("[row : 2] Row without name", warnings[0])
+
+    def test_warnings__structured(self):
+        """Should keep the code, row, sheet and column of each warning until rendered."""
+        md = (
+            self.md
+            + """
+        | settings |         |            |
+        |          | form_id | id_string  |
+        |          | f1      | f2         |
+        | setting  |         |            |
+        |          | x       |            |
+        """
+        )
+        warnings = _Warnings()
+        _workbook_to_json(
+            workbook_dict=get_xlsform(xlsform=md, file_type=".md"),
+            form_name=None,
+            fallback_form_name="data",
+            default_language=None,
+            warnings=warnings,
+            parallel_sheets=False,
+        )
+        observed = [(w.code, w.row, w.sheet, w.column) for w in warnings]
+        self.assertEqual(
+            [
+                (ErrorCode.HEADER_006, None, "settings", None),
+                (ErrorCode.LABEL_001, 2, "choices", "label"),
+                (ErrorCode.SURVEY_010, 3, "survey", None),
+                (ErrorCode.SURVEY_012, 4, "survey", "type"),
+            ],
+            observed,
+        )
+        self.assertTrue(all(isinstance(w, PyXFormWarning) for w in warnings))
+
+    def test_warnings__all_additions_limited(self):
+        """Should apply the limit to warnings added by append, extend, or +=."""
+        warnings = _Warnings(limit=2)
+        warnings.append("a")
+        warnings.extend(["b", "c"])
+        warnings += ["d"]
+        self.assertEqual(["a", "b"], list(warnings))
+        self.assertEqual(2, warnings.dropped)
+        for name in ("insert", "__setitem__"):
+            with self.subTest(name=name):
+                self.assertFalse(hasattr(warnings, name))
+
+
+class TestParseRowType(PyxformTestCase):
+    def test_parse_row_type(self):
+        """Should find the kind of row type, and its parts."""
+        cases = (
+            ("text", (None, None, None, None, None)),
+            ("form_id", ("id_string", None, None, None, None)),
+            ("begin repeat", (None, "repeat", None, None, None)),
+            ("end_group", (None, None, "group", None, None)),
+            ("select_one l1", (None, None, None, "l1", None)),
+            ("osm l1", (None, None, None, None, "l1")),
+        )
+        for question_type, expected in cases:
+            with self.subTest(question_type):
+                observed = parse_row_type(question_type)
+                self.assertEqual(
+                    expected,
+                    (
+                        observed.settings_type,
+                        observed.begin_control and observed.begin_control["type"],
+                        observed.end_control and observed.end_control["type"],
+                        observed.select and observed.select["list_name"],
+                        observed.osm and observed.osm["list_name"],
+                    ),
+                )
@@ -2,15 +2,28 @@
 Test xls2json_backends module functionality.
 """
 
+import dataclasses
 import datetime
 import os
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase, mock
 
 import openpyxl
 import xlrd
+from pyxform import aliases, constants
 from pyxform.builder import create_survey_element_from_dict
+from pyxform.parsing.sheet_headers import dealias_and_group_headers
 from pyxform.xls2json import workbook_to_json
 from pyxform.xls2json_backends import (
+    COLUMNAR_SHEET_NAMES,
+    ColumnarSheet,
+    DefinitionData,
+    SupportedFileTypes,
+    XlsSheetLoader,
     csv_to_dict,
+    definition_to_dict,
+    detect_file_types,
     get_xlsform,
     md_to_dict,
     xls_to_dict,
@@ -18,6 +31,7 @@ from pyxform.xls2json_backends import (
     xlsx_to_dict,
     xlsx_value_to_str,
 )
+from pyxform.xls2xform import convert
 
 from tests import bug_example_xls, utils
 from tests.pyxform_test_case import PyxformTestCase
@@ -110,8 +124,9 @@ class TestXLS2JSONBackends(PyxformTestCase):
                     xlsform=utils.path_to_text_fixture(f"case_insensitivity{file_type}"),
                 )
                 # All sheets recognised.
-                for attr in data.__slots__:
-                    self.assertIsNotNone(getattr(data, attr))
+                for sheet_name in constants.SUPPORTED_SHEET_NAMES:
+                    self.assertIsNotNone(getattr(data, sheet_name))
+                    self.assertIsNotNone(getattr(data, f"{sheet_name}_header"))
                 # Expected original sheet_names - needed for spellchecks.
                 self.assertEqual(
                     [
@@ -257,3 +272,241 @@ class TestXLS2JSONBackends(PyxformTestCase):
         self.assertTupleEqual((2, 2), (settings.max_row, settings.max_column))
 
         wb.close()
+
+    def test_excel__repeated_strings__interned(self):
+        """Should share one object for the repeated values and headers in a workbook."""
+        for fixture in ("case_insensitivity.xls", "case_insensitivity.xlsx"):
+            with self.subTest(fixture):
+                data = get_xlsform(xlsform=utils.path_to_text_fixture(fixture))
+                values = [
+                    r["LIST_NAME"]
+                    for sheet in (data.choices, data.external_choices, data.osm)
+                    for r in sheet
+                ]
+                self.assertGreater(len(values), 2)
+                self.assertTrue(all(v is values[0] for v in values))
+                headers = [
+                    next(k for k in h[0] if k == "NAME")
+                    for h in (data.survey_header, data.choices_header, data.osm_header)
+                ]
+                self.assertTrue(all(h is headers[0] for h in headers))
+
+
+class TestDefinitionFileTypeDetection(TestCase):
+    """
+    Test the file type detection for definitions without a file type hint.
+    """
+
+    def test_detect_file_types__fixtures(self):
+        """Should find the one file type for each fixture."""
+        cases = (
+            ("group.xlsx", SupportedFileTypes.xlsx),
+            ("group.xls", SupportedFileTypes.xls),
+            ("group.md", SupportedFileTypes.md),
+            ("group.csv", SupportedFileTypes.csv),
+        )
+        for fixture, expected in cases:
+            with self.subTest(fixture):
+                data = BytesIO(Path(utils.path_to_text_fixture(fixture)).read_bytes())
+                self.assertEqual([expected], detect_file_types(data=data))
+                self.assertEqual(0, data.tell())
+
+    def test_detect_file_types__unknown__all_types(self):
+        """Should return all the file types if the data is not recognised."""
+        self.assertEqual(
+            list(SupportedFileTypes), detect_file_types(data=BytesIO(b"unknown"))
+        )
+
+    def test_definition_to_dict__bytes__only_detected_type_parsed(self):
+        """Should parse the data with only the detected file type, and report it."""
+        fixtures = ("group.xlsx", "group.xls", "group.md", "group.csv")
+        processors = SupportedFileTypes.get_processors()
+        loaders = SupportedFileTypes.get_sheet_loaders()
+        for fixture in fixtures:
+            with self.subTest(fixture):
+                data = Path(utils.path_to_text_fixture(fixture)).read_bytes()
+                mocks = {
+                    ft: mock.Mock(side_effect=func) for ft, func in processors.items()
+                }
+                loader_mocks = {
+                    ft: mock.Mock(side_effect=cls) for ft, cls in loaders.items()
+                }
+                with (
+                    mock.patch.object(
+                        SupportedFileTypes, "get_processors", return_value=mocks
+                    ),
+                    mock.patch.object(
+                        SupportedFileTypes, "get_sheet_loaders", return_value=loader_mocks
+                    ),
+                ):
+                    observed = definition_to_dict(definition=data)
+                called = [ft for ft in SupportedFileTypes if mocks[ft].called] + [
+                    ft for ft, m in loader_mocks.items() if m.called
+                ]
+                self.assertEqual([observed.file_type], called)
+                self.assertEqual(Path(fixture).suffix, observed.file_type.value)
+                self.assertEqual("family_name", observed.survey[0]["name"])
+
+    def test_get_xlsform__path__file_type_from_suffix(self):
+        """Should report the file type from the path suffix."""
+        observed = get_xlsform(xlsform=utils.path_to_text_fixture("group.xlsx"))
+        self.assertEqual(SupportedFileTypes.xlsx, observed.file_type)
+
+
+class TestDefinitionDataSheetLoading(TestCase):
+    """
+    Test reading the workbook sheets when they're first needed.
+    """
+
+    def test_workbook__sheets_read_on_first_access(self):
+        """Should read each sheet only when it's first accessed, and only once."""
+        for fixture in ("case_insensitivity.xlsx", "case_insensitivity.xls"):
+            with self.subTest(fixture):
+                data = get_xlsform(xlsform=utils.path_to_text_fixture(fixture))
+                with mock.patch.object(
+                    data.loader, "read_sheet", wraps=data.loader.read_sheet
+                ) as read_sheet:
+                    self.assertEqual(6, len(data.sheet_names))
+                    read_sheet.assert_not_called()
+                    self.assertEqual("FORM_ID", list(data.settings_header[0])[1])
+                    self.assertEqual("YesNo", data.settings[0]["FORM_ID"])
+                    read_sheet.assert_called_once_with(sheet_name=constants.SETTINGS)
+
+    def test_workbook__release__sheet_read_again(self):
+        """Should drop the released sheets, and read them again if needed."""
+        data = get_xlsform(xlsform=utils.path_to_text_fixture("group.xlsx"))
+        survey = data.survey
+        choices_header = data.choices_header
+        data.release(constants.SURVEY, constants.CHOICES)
+        with mock.patch.object(
+            data.loader, "read_sheet", wraps=data.loader.read_sheet
+        ) as read_sheet:
+            self.assertIsNot(survey, data.survey)
+            self.assertEqual(survey, data.survey)
+            self.assertEqual(choices_header, data.choices_header)
+            self.assertEqual(
+                [
+                    mock.call(sheet_name=constants.SURVEY),
+                    mock.call(sheet_name=constants.CHOICES),
+                ],
+                read_sheet.call_args_list,
+            )
+
+    def test_xls__sheets_loaded_on_demand(self):
+        """Should only parse the XLSForm sheets, and unload each one after reading."""
+        path = Path(bug_example_xls.PATH) / "ict_survey_fails.xls"
+        with XlsSheetLoader(definition=path) as loader:
+            book = loader.workbook
+            self.assertTrue(book.on_demand)
+            self.assertEqual(["survey", "choices", "Sheet3"], loader.sheet_names)
+            self.assertFalse(any(book.sheet_loaded(n) for n in loader.sheet_names))
+            rows, _ = loader.iter_sheet(sheet_name=constants.SURVEY)
+            self.assertEqual("internet_teach", next(rows)["name"])
+            self.assertTrue(book.sheet_loaded(constants.SURVEY))
+            rows.close()
+            self.assertFalse(book.sheet_loaded(constants.SURVEY))
+            observed = loader.to_dict()
+            self.assertFalse(any(book.sheet_loaded(n) for n in loader.sheet_names))
+        self.assertEqual("internet_teach", observed["survey"][0]["name"])
+
+    def test_workbook__missing_sheet__none(self):
+        """Should find that sheets not in the workbook are None."""
+        data = get_xlsform(xlsform=utils.path_to_text_fixture("group.xlsx"))
+        self.assertIsNone(data.osm)
+        self.assertIsNone(data.osm_header)
+
+    def test_no_loader__release__data_kept(self):
+        """Should keep the data if it can't be read again."""
+        survey = [{"type": "text", "name": "q1"}]
+        data = get_xlsform(xlsform={"survey": survey, "sheet_names": ["survey"]})
+        self.assertIsNone(data.loader)
+        data.release(constants.SURVEY)
+        self.assertIs(survey, data.survey)
+        self.assertIsNone(data.choices)
+
+    def test_workbook__dataclass_functions__sheets_loaded(self):
+        """Should find that the dataclass functions work as they do for loaded data."""
+        path = utils.path_to_text_fixture("group.xlsx")
+        data = get_xlsform(xlsform=path)
+        try:
+            copied = dataclasses.replace(data)
+            self.assertIs(data.loader, copied.loader)
+            self.assertEqual(data.survey, copied.survey)
+            observed = dataclasses.asdict(data)
+        finally:
+            data.close()
+        self.assertEqual(data, copied)
+        self.assertEqual("father", observed["survey"][1]["name"])
+        self.assertIsNone(observed["osm"])
+        expected = DefinitionData(
+            **xlsx_to_dict(path),
+            fallback_form_name="group",
+            file_type=SupportedFileTypes.xlsx,
+        )
+        self.assertEqual(expected, data)
+
+
+class TestColumnarSheet(TestCase):
+    """
+    Test storing sheet data by column.
+    """
+
+    rows = (
+        {"list_name": "c1", "name": "n1", "label::En": "l1"},
+        {},
+        {"list_name": "c1", "name": "n2", "extra": "x"},
+        {"list_name": "c2", "name": "n3"},
+    )
+
+    def test_from_rows__same_as_rows(self):
+        """Should act as a sequence of the original row dicts."""
+        observed = ColumnarSheet.from_rows(
+            rows=self.rows, headers=("list_name", "name", "label::En")
+        )
+        self.assertEqual(("list_name", "name", "label::En", "extra"), observed.headers)
+        self.assertEqual([None, None, "x", None], observed.column("extra"))
+        self.assertIsNone(observed.column("other"))
+        self.assertEqual(4, len(observed))
+        self.assertEqual(list(self.rows), list(observed))
+        self.assertEqual(self.rows[2], observed[2])
+        self.assertEqual(self.rows[-1], observed[-1])
+        self.assertEqual(list(self.rows[1:3]), observed[1:3])
+        self.assertEqual(list(self.rows), observed)
+        with self.assertRaises(IndexError):
+            observed[4]
+
+    def test_dealias_and_group_headers__same_as_rows(self):
+        """Should process the columns into the same rows as for the row dicts."""
+        kwargs = {
+            "sheet_name": constants.CHOICES,
+            "sheet_header": [dict.fromkeys(("list_name", "name", "label::En", "extra"))],
+            "header_aliases": aliases.list_header,
+            "header_columns": {"list_name", "name", "label"},
+            "add_row_number": True,
+        }
+        expected = dealias_and_group_headers(sheet_data=self.rows, **kwargs)
+        observed = dealias_and_group_headers(
+            sheet_data=ColumnarSheet.from_rows(rows=self.rows), **kwargs
+        )
+        self.assertEqual(expected.headers, observed.headers)
+        self.assertEqual(expected.data, observed.data)
+
+    def test_get_xlsform__columnar__large_sheets_by_column(self):
+        """Should store only the large sheets by column, with the same data."""
+        for fixture in ("case_insensitivity.xlsx", "case_insensitivity.md"):
+            with self.subTest(fixture):
+                path = utils.path_to_text_fixture(fixture)
+                expected = get_xlsform(xlsform=path)
+                observed = get_xlsform(xlsform=path, columnar=True)
+                for sheet_name in constants.SUPPORTED_SHEET_NAMES:
+                    self.assertEqual(
+                        sheet_name in COLUMNAR_SHEET_NAMES,
+                        isinstance(getattr(observed, sheet_name), ColumnarSheet),
+                    )
+                    self.assertEqual(
+                        getattr(expected, sheet_name), getattr(observed, sheet_name)
+                    )
+                self.assertEqual(
+                    convert(xlsform=path).xform,
+                    convert(xlsform=path, columnar=True).xform,
+                )
@@ -6,18 +6,28 @@ Test xls2xform module.
 # pyxform.create_survey. We have a test here to make sure no one
 # breaks that function.
 import argparse
+import json
 import logging
+import shutil
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
 from itertools import product
 from pathlib import Path
 from unittest import TestCase, mock
 
 from pyxform.errors import PyXFormError
+from pyxform.profiling import StageProfile
 from pyxform.xls2xform import (
+    ConvertManyResult,
     ConvertResult,
+    _batch_cli,
+    _batch_convert_one,
     _create_parser,
     _validator_args_logic,
     convert,
+    convert_many,
     get_xml_path,
     main_cli,
     xls2xform_convert,
@@ -160,6 +170,7 @@ class XLS2XFormTests(TestCase):
             odk_validate=False,
             enketo_validate=False,
             pretty_print=False,
+            batch=None,
         ),
     )
     @mock.patch("pyxform.xls2xform.xls2xform_convert")
@@ -188,6 +199,7 @@ class XLS2XFormTests(TestCase):
             odk_validate=False,
             enketo_validate=False,
             pretty_print=False,
+            batch=None,
         ),
     )
     @mock.patch("pyxform.xls2xform.xls2xform_convert")
@@ -205,6 +217,7 @@ class XLS2XFormTests(TestCase):
             validate=False,
             pretty_print=False,
             enketo=False,
+            itemsets_path=None,
         )
 
     @mock.patch(
@@ -217,6 +230,7 @@ class XLS2XFormTests(TestCase):
             odk_validate=True,
             enketo_validate=True,
             pretty_print=True,
+            batch=None,
         ),
     )
     def test_xls2xform_convert_throwing_odk_error(self, parser_mock_args):
@@ -274,6 +288,249 @@ class TestXLS2XFormConvert(TestCase):
                                 (Path(xform).parent / "itemsets.csv").is_file()
                             )
 
+    def test_xls2xform_convert__write_error__itemsets_closed(self):
+        """Should close the external choices workbook if the XForm can't be written."""
+        results = []
+
+        def convert_spy(**kwargs):
+            result = convert(**kwargs)
+            results.append(result)
+            return result
+
+        xlsform = Path(example_xls.PATH) / "choice_name_as_type.xls"
+        with (
+            get_temp_dir() as td,
+            mock.patch("pyxform.xls2xform.convert", side_effect=convert_spy),
+        ):
+            with self.assertRaises(FileNotFoundError):
+                xls2xform_convert(
+                    xlsform_path=xlsform,
+                    xform_path=Path(td) / "missing" / "form.xml",
+                    validate=False,
+                )
+        self.assertIsNone(results[0].itemsets_csv.workbook_dict)
+
+
+class TestXLS2XFormBatch(TestCase):
+    """
+    Tests for the batch mode of `main_cli`.
+    """
+
+    @staticmethod
+    def _get_args(batch, output_dir=None, jobs=2):
+        return argparse.Namespace(
+            path_to_XLSForm=None,
+            batch=batch,
+            output_path=None,
+            output_dir=output_dir,
+            jobs=jobs,
+            json=False,
+            skip_validate=False,
+            odk_validate=False,
+            enketo_validate=False,
+            pretty_print=False,
+        )
+
+    def _run(self, args) -> dict[str, dict]:
+        with self.assertLogs("pyxform.xls2xform", level="INFO") as logs:
+            _batch_cli(args=args)
+        records = [json.loads(r.getMessage()) for r in logs.records]
+        return {Path(r["path"]).name: r for r in records}
+
+    def test_batch__directory__ok(self):
+        """Should convert the spreadsheets in the directory, with a status for each."""
+        names = ("group.xlsx", "choice_name_as_type.xls")
+        with get_temp_dir() as td:
+            for name in names:
+                shutil.copy(Path(example_xls.PATH) / name, td)
+            Path(td, "other.md").write_text("not included")
+            Path(td, "bad.xlsx").write_text("bad")
+            out = Path(td) / "out"
+            observed = self._run(self._get_args(batch=[td], output_dir=str(out)))
+
+            self.assertEqual({*names, "bad.xlsx"}, set(observed))
+            for name in names:
+                self.assertIn(observed[name]["code"], {100, 101})
+            self.assertEqual(999, observed["bad.xlsx"]["code"])
+            self.assertEqual(
+                {"code", "message", "warnings", "path"}, set(observed["group.xlsx"])
+            )
+            self.assertTrue((out / "group.xml").is_file())
+            self.assertTrue((out / "choice_name_as_type.xml").is_file())
+            self.assertTrue(
+                (out / "choice_name_as_type-media" / "itemsets.csv").is_file()
+            )
+            self.assertFalse((out / "group-media").exists())
+
+    def test_batch__same_output_path__error(self):
+        """Should report an error for an XLSForm with the same output path as another."""
+        with get_temp_dir() as td:
+            shutil.copy(Path(example_xls.PATH) / "group.xlsx", td)
+            shutil.copy(Path(example_xls.PATH) / "group.xls", td)
+            observed = self._run(self._get_args(batch=[td]))
+            self.assertEqual(100, observed["group.xls"]["code"])
+            self.assertEqual(999, observed["group.xlsx"]["code"])
+            self.assertIn("already used", observed["group.xlsx"]["message"])
+
+    def test_batch__files__output_next_to_input(self):
+        """Should save the XForm next to the XLSForm if no output_dir is provided."""
+        with get_temp_dir() as td:
+            xlsform = Path(td) / "group.xlsx"
+            shutil.copy(Path(example_xls.PATH) / "group.xlsx", xlsform)
+            observed = self._run(self._get_args(batch=[str(xlsform)], jobs=1))
+            self.assertEqual(100, observed["group.xlsx"]["code"])
+            self.assertTrue((Path(td) / "group.xml").is_file())
+
+    def test_batch__worker_error__reported_for_file(self):
+        """Should report an error from a worker for that file, and continue."""
+
+        def convert_one(xlsform_path, **kwargs):
+            if xlsform_path.name == "crash.xls":
+                raise BrokenProcessPool("A process in the process pool was terminated.")
+            return _batch_convert_one(xlsform_path=xlsform_path, **kwargs)
+
+        with (
+            get_temp_dir() as td,
+            mock.patch("pyxform.xls2xform.ProcessPoolExecutor", ThreadPoolExecutor),
+            mock.patch("pyxform.xls2xform._batch_convert_one", side_effect=convert_one),
+        ):
+            shutil.copy(Path(example_xls.PATH) / "group.xlsx", td)
+            shutil.copy(Path(example_xls.PATH) / "group.xls", Path(td) / "crash.xls")
+            observed = self._run(self._get_args(batch=[td], output_dir=f"{td}/out"))
+        self.assertEqual(100, observed["group.xlsx"]["code"])
+        self.assertEqual(999, observed["crash.xls"]["code"])
+        self.assertIn("terminated", observed["crash.xls"]["message"])
+
+    def test_batch__bad_jobs__raises(self):
+        """Should raise an error if the number of jobs is less than 1."""
+        with self.assertRaises(PyXFormError):
+            _batch_cli(args=self._get_args(batch=["x.xlsx"], jobs=0))
+
+
+class TestXLS2XFormConvertProfile(TestCase):
+    """
+    Tests for the stage measurements of the `convert` function.
+    """
+
+    stages = (
+        "get_xlsform",
+        "workbook_to_json",
+        "external_choices_to_csv",
+        "create_survey_element_from_dict",
+        "to_xml",
+    )
+    path = Path(example_xls.PATH) / "choice_name_as_type.xls"
+
+    def test_default__no_profile(self):
+        """Should not measure the stages by default."""
+        self.assertIsNone(convert(xlsform=self.path).profile)
+
+    def test_profile__ok(self):
+        """Should measure the time for each stage, but not the memory."""
+        observed = convert(xlsform=self.path, profile=True).profile
+        self.assertEqual(self.stages, tuple(p.name for p in observed))
+        for p in observed:
+            self.assertTrue(p.ok)
+            self.assertGreaterEqual(p.wall_time, 0)
+            self.assertGreaterEqual(p.cpu_time, 0)
+            self.assertIsNone(p.memory_peak)
+
+    def test_trace_memory__ok(self):
+        """Should measure the memory for each stage, and stop tracing afterwards."""
+        observed = convert(xlsform=self.path, trace_memory=True).profile
+        self.assertEqual(self.stages, tuple(p.name for p in observed))
+        self.assertTrue(all(p.memory_peak > 0 for p in observed))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_stage_hook__ok(self):
+        """Should call the hook at the end of each stage, including a failed stage."""
+        calls = []
+        convert(xlsform=self.path, stage_hook=calls.append)
+        self.assertEqual(self.stages, tuple(p.name for p in calls))
+
+        calls.clear()
+        with self.assertRaises(PyXFormError):
+            convert(xlsform=b"bad", stage_hook=calls.append)
+        self.assertEqual(1, len(calls))
+        self.assertIsInstance(calls[0], StageProfile)
+        self.assertEqual("get_xlsform", calls[0].name)
+        self.assertFalse(calls[0].ok)
+
+
+class TestXLS2XFormConvertMany(TestCase):
+    """
+    Tests for the `convert_many` function.
+    """
+
+    names = ("group.xlsx", "choice_name_as_type.xls", "bad.xlsx")
+
+    def _get_inputs(self):
+        return [
+            b"bad" if n == "bad.xlsx" else Path(example_xls.PATH) / n for n in self.names
+        ]
+
+    def _check(self, observed: list[ConvertManyResult], has_survey: bool):
+        self.assertEqual([0, 1, 2], sorted(r.index for r in observed))
+        by_name = {self.names[r.index]: r for r in observed}
+        for name in ("group.xlsx", "choice_name_as_type.xls"):
+            result = by_name[name]
+            self.assertIsNone(result.error)
+            self.assertIsInstance(result.result, ConvertResult)
+            self.assertIn("<h:html", result.result.xform)
+            self.assertEqual(has_survey, result.result._survey is not None)
+        self.assertIsNotNone(by_name["choice_name_as_type.xls"].result.itemsets)
+        self.assertIsNone(by_name["bad.xlsx"].result)
+        self.assertIsInstance(by_name["bad.xlsx"].error, PyXFormError)
+
+    def test_thread__ok(self):
+        """Should convert each input in a thread pool, capturing any errors."""
+        observed = list(convert_many(self._get_inputs(), workers=2, executor="thread"))
+        self._check(observed=observed, has_survey=True)
+
+    def test_process__ok(self):
+        """Should convert each input in a process pool, without the Survey."""
+        observed = list(convert_many(self._get_inputs(), workers=2, executor="process"))
+        self._check(observed=observed, has_survey=False)
+
+    def test_executor__ok__not_shut_down(self):
+        """Should use the provided executor, and leave it open for re-use."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            observed = list(convert_many(self._get_inputs(), executor=executor))
+            self._check(observed=observed, has_survey=True)
+            self.assertEqual(1, executor.submit(int, "1").result())
+
+    def test_generator_input__ok(self):
+        """Should accept a generator with more inputs than the pending limit."""
+        path = Path(example_xls.PATH) / "group.xlsx"
+        inputs = (path for _ in range(7))
+        observed = list(convert_many(inputs, workers=1, executor="thread"))
+        self.assertEqual(list(range(7)), sorted(r.index for r in observed))
+        self.assertTrue(all(r.error is None for r in observed))
+
+    def test_max_pending__limits_inputs_read(self):
+        """Should read only one input ahead of the results, with max_pending=1."""
+        path = Path(example_xls.PATH) / "group.xlsx"
+        read = []
+
+        def inputs():
+            for i in range(3):
+                read.append(i)
+                yield path
+
+        results = convert_many(inputs(), executor="thread", max_pending=1)
+        self.assertEqual(0, next(results).index)
+        self.assertEqual([0, 1], read)
+        self.assertEqual([1, 2], [r.index for r in results])
+
+    def test_bad_args__raises(self):
+        """Should raise an error for an unknown executor or bad number of workers."""
+        with self.assertRaises(PyXFormError):
+            list(convert_many([], executor="fibers"))
+        with self.assertRaises(PyXFormError):
+            list(convert_many([], workers=0))
+        with self.assertRaises(PyXFormError):
+            list(convert_many([], max_pending=0))
+
 
 class TestXLS2XFormConvertAPI(TestCase):
     """
@@ -406,3 +663,33 @@ class TestXLS2XFormConvertAPI(TestCase):
         observed = convert(xlsform=ss_structure)
         self.assertIsInstance(observed, ConvertResult)
         self.assertGreater(len(observed.xform), 0)
+
+    def test_no_validators__no_temp_file(self):
+        """Should find that no temporary file is written if no validators are run."""
+        xlsform = Path(example_xls.PATH) / "group.xlsx"
+        with mock.patch("pyxform.survey.tempfile.NamedTemporaryFile") as tmp_mock:
+            observed = convert(xlsform=xlsform, validate=False, enketo=False)
+        tmp_mock.assert_not_called()
+        self.assertGreater(len(observed.xform), 0)
+
+    @mock.patch("pyxform.survey.stdin_path_supported", return_value=True)
+    def test_validate_via_stdin__no_temp_file(self, _):
+        """Should find that the XForm is piped to the validators if requested."""
+        xlsform = Path(example_xls.PATH) / "group.xlsx"
+        with (
+            mock.patch("pyxform.survey.tempfile.NamedTemporaryFile") as tmp_mock,
+            mock.patch(
+                "pyxform.validators.odk_validate.check_xform", return_value=["odk"]
+            ) as odk_mock,
+            mock.patch(
+                "pyxform.validators.enketo_validate.check_xform", return_value=["enketo"]
+            ) as enketo_mock,
+        ):
+            observed = convert(
+                xlsform=xlsform, validate=True, enketo=True, validate_via_stdin=True
+            )
+        tmp_mock.assert_not_called()
+        xform_data = observed.xform.encode("utf-8")
+        odk_mock.assert_called_once_with(path_to_xform=None, xform_data=xform_data)
+        enketo_mock.assert_called_once_with(path_to_xform=None, xform_data=xform_data)
+        self.assertEqual(["odk", "enketo"], observed.warnings)
@@ -0,0 +1,148 @@
+"""
+Test the xlsx_reader module.
+"""
+
+import datetime
+from io import BytesIO
+from pathlib import Path
+from unittest import TestCase
+from zipfile import ZipFile
+
+import openpyxl
+from defusedxml import EntitiesForbidden
+from pyxform.xls2json_backends import xlsx_to_dict
+from pyxform.xlsx_reader import CHUNK_SIZE, XlsxWorkbook
+
+from tests import example_xls
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Override PartName="/xl/workbook.xml"
+ ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+</Types>"""
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="survey" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Target="worksheets/sheet1.xml"
+ Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>
+</Relationships>"""
+SHEET = """<?xml version="1.0" encoding="UTF-8"?>
+{doctype}<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+{dimension}<sheetData>{rows}</sheetData>
+</worksheet>"""
+
+
+def make_xlsx(rows: str, doctype: str = "", dimension: str = "") -> BytesIO:
+    """Make a minimal XLSX file with one sheet, containing the given sheetData XML."""
+    data = BytesIO()
+    with ZipFile(data, mode="w") as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("xl/workbook.xml", WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        archive.writestr(
+            "xl/worksheets/sheet1.xml",
+            SHEET.format(doctype=doctype, dimension=dimension, rows=rows),
+        )
+    data.seek(0)
+    return data
+
+
+def read_rows(data: BytesIO) -> list[list[tuple[int, object]]]:
+    with XlsxWorkbook(data=data) as wb:
+        return [list(r) for r in wb.sheets[0]]
+
+
+class TestXlsxReader(TestCase):
+    def test_same_as_openpyxl__fixtures(self):
+        """Should read the same sheets and values as openpyxl, for each fixture."""
+        for path in Path(example_xls.PATH).glob("*.xlsx"):
+            with self.subTest(msg=path.name):
+                expected = {}
+                wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+                try:
+                    for ws in wb.worksheets:
+                        expected[ws.title] = [
+                            [(i, v) for i, v in enumerate(r) if v is not None]
+                            for r in ws.iter_rows(values_only=True)
+                        ]
+                finally:
+                    wb.close()
+                with XlsxWorkbook(data=BytesIO(path.read_bytes())) as xwb:
+                    observed = {s.name: [list(r) for r in s] for s in xwb.sheets}
+                self.assertEqual(expected, observed)
+
+    def test_cell_types(self):
+        """Should read inline strings, booleans, numbers, ISO dates, and formula text."""
+        rows = """
+        <row r="1">
+          <c r="A1" t="inlineStr"><is><r><t>a</t></r><r><t>b</t></r></is></c>
+          <c r="B1" t="b"><v>1</v></c>
+          <c r="C1"><v>3</v></c>
+          <c r="D1"><v>2.5</v></c>
+          <c r="E1" t="d"><v>2024-01-02T03:04:05</v></c>
+          <c r="F1" t="str"><f>1+1</f><v>two</v></c>
+          <c r="G1"/>
+        </row>"""
+        self.assertEqual(
+            [
+                [
+                    (0, "ab"),
+                    (1, True),
+                    (2, 3),
+                    (3, 2.5),
+                    (4, datetime.datetime(2024, 1, 2, 3, 4, 5)),
+                    (5, "two"),
+                ]
+            ],
+            read_rows(make_xlsx(rows)),
+        )
+
+    def test_missing_and_unordered(self):
+        """Should yield empty missing rows, and sort out of order cells."""
+        rows = """
+        <row r="2"><c r="C2"><v>1</v></c><c r="A2"><v>2</v></c><c r="C2"><v>3</v></c></row>
+        <row r="4"><c><v>4</v></c><c><v>5</v></c></row>"""
+        self.assertEqual(
+            [[], [(0, 2), (2, 3)], [], [(0, 4), (1, 5)]],
+            read_rows(make_xlsx(rows)),
+        )
+
+    def test_columns_filter(self):
+        """Should skip the cells outside of the columns filter, once it is set."""
+        rows = "".join(
+            f'<row r="{i}"><c r="A{i}"><v>{i}</v></c><c r="B{i}"><v>{i}</v></c></row>'
+            for i in range(1, 4)
+        )
+        with XlsxWorkbook(data=make_xlsx(rows)) as wb:
+            sheet = wb.sheets[0]
+            sheet.columns = {1: "b"}
+            self.assertEqual([[(1, 1)], [(1, 2)], [(1, 3)]], list(sheet))
+
+    def test_entities__raises(self):
+        """Should not expand entity declarations."""
+        doctype = '<!DOCTYPE worksheet [<!ENTITY a "aaaa">]>'
+        rows = '<row r="1"><c r="A1" t="inlineStr"><is><t>&a;</t></is></c></row>'
+        with self.assertRaises(EntitiesForbidden):
+            read_rows(make_xlsx(rows, doctype=doctype))
+
+    def test_formatted_empty_rows__reading_stops(self):
+        """Should stop reading the sheet after a run of empty rows, even if formatted."""
+        rows = [
+            '<row r="1"><c r="A1" t="inlineStr"><is><t>type</t></is></c></row>',
+            '<row r="2"><c r="A2" t="inlineStr"><is><t>text</t></is></c></row>',
+        ]
+        cells = "".join(f'<c r="{c}{{i}}" s="1"/>' for c in "BCDEFGHI")
+        rows.extend(
+            f'<row r="{i}" s="1" customFormat="1">{cells.format(i=i)}</row>'
+            for i in range(3, 3000)
+        )
+        self.assertGreater(len("".join(rows)), CHUNK_SIZE * 2)
+        # The sheet is not valid XML from here, so it's an error if this is read.
+        rows.append("<row")
+        data = make_xlsx(rows="".join(rows), dimension='<dimension ref="A1:XFD1048576"/>')
+        observed = xlsx_to_dict(data)
+        self.assertEqual([{"type": "text"}], observed["survey"])
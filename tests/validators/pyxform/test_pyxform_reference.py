@@ -123,3 +123,38 @@ class TestPyxformReference(PyxformTestCase):
                     ErrorCode.PYREF_001.value.format(sheet="test", column="label", row=2),
                     msg=case,
                 )
+
+    def test_reference_collector__errors_in_cell_order(self):
+        """Should raise the first error in cell order, skipping unchecked columns."""
+        data = (
+            {"label": "${a}", "hint": "${a", "extra": "${"},
+            {"label": "${x}", "hint": "${b}"},
+        )
+        references = pr.ReferenceCollector(sheet_name="test")
+        for row_number, row in enumerate(data, start=2):
+            for column, value in row.items():
+                references.visit(row_number=row_number, column=column, value=value)
+        cases = (
+            ({"label", "hint"}, ErrorCode.PYREF_001, {"column": "hint", "row": 2}),
+            ({"label"}, ErrorCode.PYREF_003, {"column": "label", "row": 3, "q": "x"}),
+        )
+        for limit_to_columns, code, context in cases:
+            with self.subTest(limit_to_columns):
+                with self.assertRaises(PyXFormError) as err:
+                    pr.validate_pyxform_reference_syntax(
+                        sheet_name="test",
+                        sheet_data=data,
+                        element_names=ELEMENT_NAMES,
+                        limit_to_columns=limit_to_columns,
+                        references=references,
+                    )
+                self.assertEqual(
+                    str(err.exception), code.value.format(sheet="test", **context)
+                )
+        pr.validate_pyxform_reference_syntax(
+            sheet_name="test",
+            sheet_data=data,
+            element_names=ELEMENT_NAMES,
+            limit_to_columns={"label", "hint"},
+            references=pr.ReferenceCollector(sheet_name="test"),
+        )
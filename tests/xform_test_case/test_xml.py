@@ -2,12 +2,13 @@
 Test XForm XML syntax.
 """
 
+from io import StringIO
 from sys import version_info
 from unittest import TestCase
 from xml.dom.minidom import getDOMImplementation
 
 from pyxform import create_survey_from_xls
-from pyxform.utils import node
+from pyxform.utils import PatchedText, node
 
 from tests.utils import path_to_text_fixture
 from tests.xform_test_case.base import XFormTestCase
@@ -114,3 +115,50 @@ class MinidomTextWriterMonkeyPatchTest(TestCase):
             # Prior to 3.13 " was escaped in text unnecessarily, and \r\n\t not escaped in attrs.
             expected = """<root attr="' &quot; &amp; &lt; &gt; \r \n \t">' &quot; &amp; &lt; &gt; \r \n \t</root>"""
             self.assertEqual(expected, observed)
+
+
+class StreamingWriterTest(TestCase):
+    maxDiff = None
+
+    def test_generator_children_are_created_when_written(self):
+        """Should only create generator child elements when the parent is written."""
+        created = []
+
+        def children():
+            for i in range(3):
+                created.append(i)
+                yield node("item", str(i))
+
+        root = node("root", node("first"), children(), id="r")
+        self.assertEqual([], created)
+        observed = root.toprettyxml(indent="  ")
+        self.assertEqual([0, 1, 2], created)
+        expected = """<root id="r">\n  <first/>\n  <item>0</item>\n  <item>1</item>\n  <item>2</item>\n</root>\n"""
+        self.assertEqual(expected, observed)
+
+    def test_empty_generator_children_writes_empty_element(self):
+        """Should write a self-closing element if the generator has no children."""
+        root = node("root", (x for x in ()))
+        self.assertEqual("<root/>", root.toxml())
+
+    def test_generator_children_with_text_writes_mixed_content(self):
+        """Should write text from generator children the same as eager children."""
+        eager = node("a", PatchedText("hi"), node("b"))
+        lazy = node("a", (n for n in [PatchedText("hi"), node("b")]))
+        expected = "<a> hi<b/> </a>\n"
+        self.assertEqual(expected, eager.toprettyxml(indent="  "))
+        self.assertEqual(expected, lazy.toprettyxml(indent="  "))
+
+    def test_write_xml_matches_to_xml(self):
+        """Should find that writing to a sink gives the same XForm as to_xml."""
+        survey = create_survey_from_xls(
+            path_to_text_fixture("yes_or_no_question.xls"), "yes_or_no_question"
+        )
+        for pretty_print in (True, False):
+            with self.subTest(pretty_print=pretty_print):
+                writer = StringIO()
+                survey.write_xml(writer=writer, pretty_print=pretty_print)
+                self.assertEqual(
+                    survey.to_xml(validate=False, pretty_print=pretty_print),
+                    writer.getvalue(),
+                )